@@ -1,15 +1,27 @@
 # app.py
 # -*- coding: utf-8 -*-
+import functools
 import streamlit as st
 import traceback
 
 # ---- Utils & Components ----
 from utils.theme import set_base_page_config, inject_global_css, get_plotly_template
-from utils.data import load_all_data, load_geojson
+from utils.data import (
+    load_catalog, load_district_geojson, load_districts, load_geojson, load_geojson_url, load_year,
+)
+from utils.geo import level_for_zoom
+from utils.settings import DIAGNOSTICS, LAZY_TABS, WARMUP
+from utils.warmup import warmup_once
+from utils.fragments import view_fragment
+from utils.readonly import dataset_fingerprint, assert_unmodified
+from utils.profiler import profile_span
+from utils.metrics import note_rerun, start_exporter
 
 from components.sidebar import render_sidebar
 from components.kpi_card import render_kpis
-from components.mapbox import render_thailand_map
+from components.mapbox import render_thailand_map, MAP_ZOOM
+from components.drilldown import render_district_drilldown
+from components.diagnostics import render_diagnostics_panel
 
 from components.charts import (
     render_time_kind_controls,
@@ -26,144 +38,203 @@ from components.charts import (
 )
 
 # -------------------------------------------------
-# Main
+# Fragments (ตัวคุมเปลี่ยน -> rerun เฉพาะส่วนที่ขึ้นกับตัวคุมนั้น)
 # -------------------------------------------------
-def main() -> None:
-    # 0) Base setup (พื้นหลังขาวตลอด)
-    set_base_page_config()
-    inject_global_css()  # CSS กลาง (KPI 4 กล่อง/บรรทัด, Night เฉพาะ KPI)
+@view_fragment("main", reads=("time_range", "bar_kind"))
+def render_main_row(cube, selected_month, selected_province) -> None:
+    render_time_kind_controls(prefix="main", months=cube.months)
+    render_main_row_charts(
+        cube=cube,
+        selected_month=selected_month,
+        selected_province=selected_province,
+        plotly_template=get_plotly_template(),
+        key_prefix="main",
+    )
 
-    # 1) Data
-    df1, df2, df3, df1_melted, national_avg, month_cols = load_all_data()
-    th_geo = load_geojson()
 
-    # 2) Sidebar (โลโก้ + Night/Day toggle + ฟิลเตอร์)
-    sidebar_state = render_sidebar(df1, df2, df3)
-    selected_month     = sidebar_state.get("selected_month")
-    selected_province  = sidebar_state.get("selected_province", "ภาพรวม")
-    channel_filter     = sidebar_state.get("channel_filter", None)  # เผื่อมีใช้ภายหน้า
-    product_filter     = sidebar_state.get("product_filter", None)  # เผื่อมีใช้ภายหน้า
+# กราฟฝั่งวิเคราะห์ไม่อ่าน time_range/bar_kind — เปลี่ยนค่าแล้ว set_state จะ rerun ทั้งแอปให้แถวหลักเอง
+@view_fragment("deep")
+def render_deep_controls(months) -> None:
+    render_time_kind_controls(prefix="deep", months=months)
 
-    # 3) Title (ตามฟอร์แมตที่กำหนด)
-    st.title("Dashboard สรุปผลการจำหน่ายสินค้า OTOP (ชุดเติบโต)")
-    st.caption(
-        f"ข้อมูลประจำเดือน **{selected_month}** • หน่วยเป็นบาท (฿) • แหล่งข้อมูล: otop_r04, otop_r05, otop_r06 (ดูท้ายหน้า)"
-    )
 
-    # 4) KPI (4 กล่องแนวนอน บนบรรทัดเดียว)
-    render_kpis(df1, df2, df3, selected_month)
-    st.markdown("")
+# -------------------------------------------------
+# Sections (แท็บ)
+# -------------------------------------------------
+SECTIONS = ["🗺️ ภาพรวมรายจังหวัด", "🔎 วิเคราะห์เชิงลึก"]
 
-    # 5) Global controls + Main charts (ซ้าย-ขวา)
-    render_time_kind_controls(prefix="main")
-    render_main_row_charts(
-        df1=df1,
-        df2=df2,
+# 6.1 Tab 1 — แผนที่ + Revenue Sources + CDD
+def render_overview_section(cube, th_geo, selected_month, selected_province, fiscal_year, district_loader) -> None:
+    # แผนที่ประเทศไทย (Mapbox โทนสว่างเสมอ / OTOP_MAP_ENGINE=geo = ไม่ใช้ tile)
+    render_thailand_map(cube, th_geo, selected_month)
+
+    # Drill-down ภาค -> จังหวัด -> อำเภอ (ข้อมูล/ขอบเขตอำเภอโหลดเฉพาะจังหวัดที่เลือก)
+    render_district_drilldown(
+        cube, fiscal_year, selected_month, selected_province,
+        district_loader, load_district_geojson, plotly_template=get_plotly_template(),
+    )
+
+    st.markdown("---")
+    # Revenue Sources (เดือนเดียว)
+    render_revenue_sources(
+        cube=cube,
         selected_month=selected_month,
-        month_cols=month_cols,
-        selected_province=selected_province,
         plotly_template=get_plotly_template(),
-        key_prefix="main",
+        key_prefix="tab1"
     )
 
     st.markdown("---")
+    # CDD embeds (เลือกหน้าได้ 3 เว็บ)
+    render_cdd_sources_embeds(key_prefix="tab1")
 
-    # 6) Tabs
-    tab1, tab2 = st.tabs(["🗺️ ภาพรวมรายจังหวัด", "🔎 วิเคราะห์เชิงลึก"])
 
-    # 6.1 Tab 1 — แผนที่ + Revenue Sources + CDD
-    with tab1:
-        # แผนที่ประเทศไทย (Mapbox โทนสว่างเสมอ)
-        render_thailand_map(df1, df1_melted, th_geo, selected_month)
-
-        st.markdown("---")
-        # Revenue Sources (เดือนเดียว)
-        render_revenue_sources(
-            df2=df2,
-            selected_month=selected_month,
-            plotly_template=get_plotly_template(),
-            key_prefix="tab1"
-        )
+# 6.2 Tab 2 — วิเคราะห์เชิงลึก + Revenue Sources + CDD
+def render_deep_section(cube, selected_month, selected_province) -> None:
+    # ตัวคุม (ช่วงเวลา/ชนิดกราฟ) สำหรับฝั่งวิเคราะห์
+    render_deep_controls(cube.months)
 
-        st.markdown("---")
-        # CDD embeds (เลือกหน้าได้ 3 เว็บ)
-        render_cdd_sources_embeds(key_prefix="tab1")
+    # Regional Growth (ไฮไลต์ region ของจังหวัดที่เลือก)
+    render_regional_growth(
+        cube=cube,
+        selected_month=selected_month,
+        selected_province=selected_province,
+        plotly_template=get_plotly_template(),
+        key_prefix="deep"
+    )
 
-    # 6.2 Tab 2 — วิเคราะห์เชิงลึก + Revenue Sources + CDD
-    with tab2:
-        # ตัวคุม (ช่วงเวลา/ชนิดกราฟ) สำหรับฝั่งวิเคราะห์
-        render_time_kind_controls(prefix="deep")
+    # Product Category (แสดงระดับประเทศ พร้อมแจ้งเตือนเมื่อเลือกจังหวัด)
+    render_product_category_performance(
+        cube=cube,
+        selected_month=selected_month,
+        selected_province=selected_province,
+        plotly_template=get_plotly_template(),
+        key_prefix="deep"
+    )
 
-        # Regional Growth (ไฮไลต์ region ของจังหวัดที่เลือก)
-        render_regional_growth(
-            df1=df1,
-            month_cols=month_cols,
+    # ---- NEW: 4 charts (2 แถว x 2 คอลัมน์) ----
+    st.markdown("---")
+    st.subheader("มุมมองเพิ่มเติม (ปรับตามเดือน/จังหวัดที่เลือก)")
+    c1, c2 = st.columns(2, gap="large")
+    with c1:
+        render_province_vs_avg_trend(
+            cube=cube,
+            selected_province=selected_province,
+            plotly_template=get_plotly_template(),
+            key_prefix="extra_row1_left",
+        )
+    with c2:
+        render_mom_change_by_province(
+            cube=cube,
             selected_month=selected_month,
             selected_province=selected_province,
             plotly_template=get_plotly_template(),
-            key_prefix="deep"
+            key_prefix="extra_row1_right",
         )
 
-        # Product Category (แสดงระดับประเทศ พร้อมแจ้งเตือนเมื่อเลือกจังหวัด)
-        render_product_category_performance(
-            df3=df3,
+    c3, c4 = st.columns(2, gap="large")
+    with c3:
+        render_monthly_heatmap_selected(
+            cube=cube,
             selected_month=selected_month,
             selected_province=selected_province,
             plotly_template=get_plotly_template(),
-            key_prefix="deep"
+            key_prefix="extra_row2_left",
         )
-
-        # ---- NEW: 4 charts (2 แถว x 2 คอลัมน์) ----
-        st.markdown("---")
-        st.subheader("มุมมองเพิ่มเติม (ปรับตามเดือน/จังหวัดที่เลือก)")
-        c1, c2 = st.columns(2, gap="large")
-        with c1:
-            render_province_vs_avg_trend(
-                df1=df1,
-                month_cols=month_cols,
-                selected_province=selected_province,
-                plotly_template=get_plotly_template(),
-                key_prefix="extra_row1_left",
-            )
-        with c2:
-            render_mom_change_by_province(
-                df1=df1,
-                month_cols=month_cols,
-                selected_month=selected_month,
-                selected_province=selected_province,
-                plotly_template=get_plotly_template(),
-                key_prefix="extra_row1_right",
-            )
-
-        c3, c4 = st.columns(2, gap="large")
-        with c3:
-            render_monthly_heatmap_selected(
-                df1=df1,
-                month_cols=month_cols,
-                selected_month=selected_month,
-                selected_province=selected_province,
-                plotly_template=get_plotly_template(),
-                key_prefix="extra_row2_left",
-            )
-        with c4:
-            render_channel_cumulative_ytd(
-                df2=df2,
-                month_cols=month_cols,
-                selected_month=selected_month,
-                plotly_template=get_plotly_template(),
-                key_prefix="extra_row2_right",
-            )
-
-        st.markdown("---")
-        # Revenue Sources & CDD (แสดงใน Tab นี้ด้วย ตามที่ขอ)
-        render_revenue_sources(
-            df2=df2,
+    with c4:
+        render_channel_cumulative_ytd(
+            cube=cube,
             selected_month=selected_month,
             plotly_template=get_plotly_template(),
-            key_prefix="tab2"
+            key_prefix="extra_row2_right",
         )
-        st.markdown("---")
-        render_cdd_sources_embeds(key_prefix="tab2")
+
+    st.markdown("---")
+    # Revenue Sources & CDD (แสดงใน Tab นี้ด้วย ตามที่ขอ)
+    render_revenue_sources(
+        cube=cube,
+        selected_month=selected_month,
+        plotly_template=get_plotly_template(),
+        key_prefix="tab2"
+    )
+    st.markdown("---")
+    render_cdd_sources_embeds(key_prefix="tab2")
+
+
+# สลับส่วน (โหมด lazy) ไม่ต้อง rerun KPI / แถวหลัก
+@view_fragment("sections")
+def render_active_section(cube, th_geo, selected_month, selected_province, fiscal_year, district_loader) -> None:
+    active = st.radio(
+        "ส่วนที่แสดง", options=SECTIONS, horizontal=True,
+        key="active_section", label_visibility="collapsed",
+    )
+    if active == SECTIONS[0]:
+        render_overview_section(cube, th_geo, selected_month, selected_province, fiscal_year, district_loader)
+    else:
+        render_deep_section(cube, selected_month, selected_province)
+
+
+# -------------------------------------------------
+# Main
+# -------------------------------------------------
+def main() -> None:
+    # 0) Base setup (พื้นหลังขาวตลอด)
+    set_base_page_config()
+    inject_global_css()  # CSS กลาง (KPI 4 กล่อง/บรรทัด, Night เฉพาะ KPI)
+    start_exporter()     # metrics ระดับโปรเซส (OTOP_METRICS_FILE / OTOP_METRICS_PORT) ครั้งเดียวต่อโปรเซส
+    note_rerun()
+
+    # 1) Data: manifest ของคลังข้อมูล (ปีงบที่มี) — ตารางของปีงบโหลดเมื่อถูกเลือกเท่านั้น
+    #    snapshot เดียวตลอด rerun (ingest ใหม่ระหว่าง rerun มีผลรอบถัดไป)
+    with profile_span("data.catalog", cached=True):
+        catalog = load_catalog()
+    year_loader = functools.partial(load_year, snapshot=catalog)
+    district_loader = functools.partial(load_districts, snapshot=catalog)  # fragment rerun ใช้ snapshot เดียวกับ cube
+    geo_level = level_for_zoom(MAP_ZOOM)  # level เบาสุดที่ยังดูดีที่ zoom ของแผนที่
+    # ทุก engine: อ้าง geometry ด้วย URL static ถ้าเสิร์ฟได้ (browser โหลดครั้งเดียว รูปในแคชไม่ถือ geometry
+    # และเปลี่ยนเดือนไม่ส่งซ้ำ) ไม่งั้นฝัง dict
+    with profile_span("data.geojson", cached=True):
+        th_geo = load_geojson_url(geo_level) or load_geojson(geo_level)
+
+    # 2) Sidebar (โลโก้ + Night/Day toggle + ปีงบ + ฟิลเตอร์)
+    sidebar_state = render_sidebar(catalog.fiscal_years, year_loader)
+    dataset = sidebar_state["dataset"]  # แชร์ทุก session (อ่านอย่างเดียว)
+    cube = dataset.cube
+    dataset_fp = dataset_fingerprint(dataset)
+    fiscal_year        = sidebar_state["fiscal_year"]
+    selected_month     = sidebar_state.get("selected_month")
+    selected_province  = sidebar_state.get("selected_province", "ภาพรวม")
+
+    # 2.1) Warm-up แคชรูปกราฟ (ครั้งแรกของโปรเซสเท่านั้น, ทำงานเบื้องหลัง)
+    if WARMUP:
+        latest = year_loader(catalog.fiscal_years[-1]).cube  # อุ่นเฉพาะปีงบล่าสุด
+        warm = warmup_once(latest, latest.data_version, th_geo, get_plotly_template())
+        if warm.state == "running":
+            st.sidebar.caption(f"กำลังอุ่นแคช {warm.done:,}/{warm.total:,} มุมมอง")
+
+    # 3) Title (ตามฟอร์แมตที่กำหนด)
+    st.title("Dashboard สรุปผลการจำหน่ายสินค้า OTOP (ชุดเติบโต)")
+    st.caption(
+        f"ข้อมูลประจำเดือน **{selected_month}** • หน่วยเป็นบาท (฿) • แหล่งข้อมูล: otop_r04, otop_r05, otop_r06 (ดูท้ายหน้า)"
+    )
+
+    # 4) KPI (4 กล่องแนวนอน บนบรรทัดเดียว)
+    render_kpis(cube, selected_month)
+    st.markdown("")
+
+    # 5) Global controls + Main charts (ซ้าย-ขวา)
+    render_main_row(cube, selected_month, selected_province)
+
+    st.markdown("---")
+
+    # 6) Tabs — โหมด lazy: สร้าง/ส่งเฉพาะส่วนที่กำลังดู (st.tabs จะสร้างทุกแท็บแล้วซ่อนฝั่ง client)
+    if LAZY_TABS:
+        render_active_section(cube, th_geo, selected_month, selected_province, fiscal_year, district_loader)
+    else:
+        tab1, tab2 = st.tabs(SECTIONS)
+        with tab1:
+            render_overview_section(cube, th_geo, selected_month, selected_province, fiscal_year, district_loader)
+        with tab2:
+            render_deep_section(cube, selected_month, selected_province)
 
     # 7) Data sources (ท้ายหน้า)
     st.markdown("---")
@@ -174,13 +245,21 @@ def main() -> None:
         "[otop_r06](https://logi.cdd.go.th/otop/cdd_report/otop_r06.php)"
     )
 
+    # 8) Guard: ห้ามคอมโพเนนต์ใดแก้ไขชุดข้อมูลที่แชร์ข้าม session
+    assert_unmodified(dataset, dataset_fp)
+
+    # 9) แผงวินิจฉัย (เวลา/payload/cache ต่อคอมโพเนนต์ — utils/profiler.py)
+    if DIAGNOSTICS:
+        render_diagnostics_panel()
+
 
 # -------------------------------------------------
 # Entrypoint (แสดง traceback เมื่อมี error)
 # -------------------------------------------------
 if __name__ == "__main__":
     try:
-        main()
+        with profile_span("rerun"):
+            main()
     except Exception:
         st.set_page_config(page_title="OTOP Sales Dashboard", page_icon="🛍️", layout="wide")
         st.error("เกิดข้อผิดพลาดในแอป (รายละเอียดด้านล่าง)")
@@ -0,0 +1,24 @@
+# bench/__init__.py
+# -*- coding: utf-8 -*-
+"""
+ชุดวัดประสิทธิภาพ (benchmark) ของการโหลดข้อมูลและคอมโพเนนต์ render_* ทุกตัว
+
+    python -m bench.run                                  # ขนาดข้อมูลจริง เทียบกับ bench/baseline.json
+    python -m bench.run --scales real 1000x24 10000x240  # เพิ่มขนาดสังเคราะห์ (จังหวัด x เดือน)
+    python -m bench.run --save-baseline                  # บันทึกผลเป็น baseline ใหม่
+    python -m bench.soak --reruns 3000                   # soak: หน่วยความจำของ session คงที่
+    python -m bench.concurrency --sessions 16 --compare  # session พร้อมกัน: รวมงานสร้างรูปที่ซ้ำกัน
+    python -m bench.shared --workers 8                   # หลายโปรเซส: หน่วยความจำต่อ worker เมื่อแชร์ชุดข้อมูล
+    python -m bench.labels                               # ป้ายตัวเลขแบบ vectorized ตรงกับ f-string ทุกค่า
+
+- bench/harness.py: การวัด (เวลา, หน่วยความจำสูงสุด, ขนาด payload) + เทียบ baseline
+- bench/scale.py  : ขนาดข้อมูล -> ตารางสังเคราะห์จาก utils/synth.py
+- bench/run.py    : รายการสิ่งที่วัด (loader + คอมโพเนนต์ใต้ AppTest) และ CLI
+- bench/soak.py   : session เดียว rerun หลายพันรอบ — session state / heap ต้องไม่โตตามจำนวนรอบ
+- bench/concurrency.py: N session พร้อมกันบนแคชรูปว่าง — รูปเดียวกันต้องถูกสร้างครั้งเดียว
+- bench/shared.py : N โปรเซส (OTOP_SHARED_DIR) — array ของชุดข้อมูลต้องไม่ถูก copy ต่อโปรเซส
+- bench/labels.py : pct_labels / baht_labels เทียบ f-string บนค่าสุ่ม (กรณีครึ่งทาง, เกิน int64, NaN)
+
+เวลาขึ้นกับเครื่อง: baseline.json ควรบันทึกบนเครื่องเดียวกับที่ใช้เทียบ (เช่น runner ของ CI)
+ส่วน payload เทียบข้ามเครื่องได้ตรง ๆ
+"""
@@ -0,0 +1,115 @@
+# bench/concurrency.py
+# -*- coding: utf-8 -*-
+"""
+Concurrency: N session เปิดแดชบอร์ดพร้อมกันตอนแคชรูปยังว่าง (เหมือนวันเผยแพร่เดือนใหม่)
+
+    python -m bench.concurrency [--sessions 16] [--compare]
+
+ทุก session รันแอปเต็มรอบใต้ AppTest ใน thread ของตัวเอง ปล่อยพร้อมกันด้วย barrier
+- builds    : จำนวนรูปที่สร้างจริง (miss ของ FIGURE_CACHE) — ต้องไม่เกินจำนวนรูปของ session เดียว
+- coalesced : คำขอที่รอรูปเดียวกันที่ session อื่นกำลังสร้าง (utils/singleflight.py)
+- cpu s     : เวลา CPU ของโปรเซสช่วงที่ทุก session ทำงาน
+--compare รันซ้ำแบบปิดการรวมงาน (FIGURE_CACHE.coalesce = False) เพื่อเทียบ
+
+คืน exit code 1 เมื่อโหมดรวมงานสร้างรูปเกินจำนวนรูปของ session เดียว
+"""
+import os
+
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+import argparse
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+from utils.figcache import FIGURE_CACHE
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+
+
+@dataclass
+class Burst:
+    sessions: int
+    coalesce: bool
+    builds: int
+    coalesced: int
+    wall_s: float
+    cpu_s: float
+
+
+def _app(timeout: float):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(str(APP), default_timeout=timeout)
+
+
+def single_session_figures(timeout: float = 300) -> int:
+    """จำนวนรูปที่ session เดียวสร้างจากแคชว่าง (ข้อมูลปีงบโหลดค้างไว้แล้ว)"""
+    _app(timeout).run()                 # โหลดข้อมูล / import ครั้งแรก
+    FIGURE_CACHE.clear()
+    before = FIGURE_CACHE.stats()["misses"]
+    _app(timeout).run()
+    return FIGURE_CACHE.stats()["misses"] - before
+
+
+def burst(sessions: int, coalesce: bool, timeout: float = 300) -> Burst:
+    apps = [_app(timeout) for _ in range(sessions)]
+    gate = threading.Barrier(sessions + 1)
+    errors: List[str] = []
+
+    def one(at) -> None:
+        gate.wait()
+        at.run()
+        if at.exception:
+            errors.append(at.exception[0].message)
+
+    FIGURE_CACHE.clear()
+    FIGURE_CACHE.coalesce = coalesce
+    before = FIGURE_CACHE.stats()
+    threads = [threading.Thread(target=one, args=(at,), name=f"otop-session-{i}") for i, at in enumerate(apps)]
+    for t in threads:
+        t.start()
+    try:
+        gate.wait()
+        t0, c0 = time.perf_counter(), time.process_time()
+        for t in threads:
+            t.join()
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+    finally:
+        FIGURE_CACHE.coalesce = True
+    if errors:
+        raise RuntimeError(f"session ล้มระหว่างทดสอบ: {errors[0]}")
+    after = FIGURE_CACHE.stats()
+    return Burst(
+        sessions=sessions, coalesce=coalesce,
+        builds=after["misses"] - before["misses"], coalesced=after["coalesced"] - before["coalesced"],
+        wall_s=wall, cpu_s=cpu,
+    )
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="N session พร้อมกันบนแคชรูปว่าง")
+    ap.add_argument("--sessions", type=int, default=16)
+    ap.add_argument("--compare", action="store_true", help="รันแบบปิดการรวมงานด้วยเพื่อเทียบ")
+    args = ap.parse_args(argv)
+
+    figures = single_session_figures()
+    print(f"session เดียวสร้าง {figures} รูป")
+    modes = [True, False] if args.compare else [True]
+    results = [burst(args.sessions, mode) for mode in modes]
+
+    print(f"{'mode':<12}{'sessions':>9}{'builds':>8}{'coalesced':>11}{'wall s':>9}{'cpu s':>8}")
+    for r in results:
+        mode = "coalesce" if r.coalesce else "no-coalesce"
+        print(f"{mode:<12}{r.sessions:>9}{r.builds:>8}{r.coalesced:>11}{r.wall_s:>9.2f}{r.cpu_s:>8.2f}")
+    if results[0].builds > figures:
+        print(f"สร้างซ้ำ: {results[0].builds} รูป > {figures} รูปของ session เดียว")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
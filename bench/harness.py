@@ -0,0 +1,176 @@
+# bench/harness.py
+# -*- coding: utf-8 -*-
+"""
+เครื่องมือวัด: เวลา (median ของหลายรอบ), หน่วยความจำสูงสุด (tracemalloc) และขนาด payload ที่ส่งให้ browser
+
+- measure(fn): วัดฟังก์ชันธรรมดา (loader / builder)
+- measure_component(render, kwargs): รันคอมโพเนนต์ใต้ streamlit AppTest
+  รอบ cold = ล้างแคชรูปก่อน, รอบ warm = rerun ซ้ำ (แคชรูปอุ่นแล้ว)
+  payload = ผลรวมขนาด protobuf ของทุก element ที่คอมโพเนนต์ส่งออก (รวม spec ของกราฟ)
+- compare(): ผลลัพธ์ใหม่ vs baseline -> รายการที่ช้าลง/ใหญ่ขึ้นเกินเกณฑ์
+
+เวลาและหน่วยความจำวัดแยกรอบกัน (tracemalloc ทำให้โค้ดช้าลง จึงไม่ใช้ตอนจับเวลา)
+"""
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.figcache import FIGURE_CACHE
+
+
+@dataclass
+class Measurement:
+    name: str
+    wall_ms: float                   # median ของรอบ cold
+    peak_kb: float                   # หน่วยความจำ Python ที่จองเพิ่มสูงสุดระหว่างรอบ cold
+    payload_bytes: int = 0           # เฉพาะคอมโพเนนต์
+    warm_ms: Optional[float] = None  # เฉพาะคอมโพเนนต์: rerun ที่แคชรูปอุ่นแล้ว
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[float, Any]:
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000.0, out
+
+
+def _peak_kb(fn: Callable[[], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024.0
+
+
+def measure(name: str, fn: Callable[[], Any], repeat: int = 3, setup: Callable[[], None] = lambda: None) -> Measurement:
+    """setup ถูกเรียกก่อนทุกรอบ (เช่น ล้างแคช) และไม่นับเวลา"""
+    times = []
+    for _ in range(max(1, repeat)):
+        setup()
+        ms, _ = _timed(fn)
+        times.append(ms)
+    setup()
+    return Measurement(name=name, wall_ms=statistics.median(times), peak_kb=_peak_kb(fn))
+
+
+# ------------------------------
+# คอมโพเนนต์ใต้ AppTest
+# ------------------------------
+def _component_script(render, kwargs):
+    render(**kwargs)
+
+
+def payload_bytes(node) -> int:
+    """ขนาด protobuf รวมของ element ทั้งหมดใต้ node ของ AppTest (block นับเฉพาะลูก)"""
+    children = getattr(node, "children", None)
+    if children:
+        return sum(payload_bytes(c) for c in children.values())
+    proto = getattr(node, "proto", None)
+    return proto.ByteSize() if proto is not None else 0
+
+
+def _app(render: Callable, kwargs: Dict[str, Any], timeout: float):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_function(_component_script, default_timeout=timeout, args=(render, kwargs))
+
+
+def _run(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"คอมโพเนนต์ล้มระหว่าง benchmark: {at.exception[0].message}")
+    return at
+
+
+def measure_component(
+    name: str, render: Callable, kwargs: Dict[str, Any], repeat: int = 3, timeout: float = 120
+) -> Measurement:
+    cold, warm = [], []
+    payload = 0
+    for _ in range(max(1, repeat)):
+        FIGURE_CACHE.clear()
+        at = _app(render, kwargs, timeout)
+        ms, at = _timed(lambda: _run(at))
+        cold.append(ms)
+        payload = payload_bytes(at._tree)
+        ms, _ = _timed(lambda: _run(at))
+        warm.append(ms)
+    FIGURE_CACHE.clear()
+    at = _app(render, kwargs, timeout)
+    peak = _peak_kb(lambda: _run(at))
+    return Measurement(
+        name=name, wall_ms=statistics.median(cold), peak_kb=peak,
+        payload_bytes=payload, warm_ms=statistics.median(warm),
+    )
+
+
+# ------------------------------
+# Baseline
+# ------------------------------
+# เกณฑ์ถดถอย: ต้องเกินทั้งสัดส่วนและค่าขั้นต่ำ (กันเสียงรบกวนของงานที่เร็วมาก)
+TIME_TOLERANCE = 1.30
+TIME_SLACK_MS = 5.0
+PAYLOAD_TOLERANCE = 1.05
+PAYLOAD_SLACK_BYTES = 512
+MEMORY_TOLERANCE = 1.30
+MEMORY_SLACK_KB = 256.0
+
+
+def to_json(results: Dict[str, List[Measurement]]) -> dict:
+    return {scale: {m.name: asdict(m) for m in ms} for scale, ms in results.items()}
+
+
+def save_baseline(results: Dict[str, List[Measurement]], path: Path) -> None:
+    path.write_text(json.dumps(to_json(results), ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _worse(new: float, old: float, ratio: float, slack: float) -> bool:
+    return new > old * ratio and new - old > slack
+
+
+def compare(results: Dict[str, List[Measurement]], baseline: dict, time_tolerance: float = TIME_TOLERANCE) -> List[str]:
+    """ข้อความของทุกรายการที่ถดถอยเทียบ baseline (ไม่มีใน baseline = ข้าม)"""
+    problems = []
+    for scale, ms in results.items():
+        base = baseline.get(scale, {})
+        for m in ms:
+            b = base.get(m.name)
+            if b is None:
+                continue
+            label = f"{scale}/{m.name}"
+            if _worse(m.wall_ms, b["wall_ms"], time_tolerance, TIME_SLACK_MS):
+                problems.append(f"{label}: เวลา {b['wall_ms']:.1f} -> {m.wall_ms:.1f} ms")
+            if m.warm_ms is not None and b.get("warm_ms") is not None \
+                    and _worse(m.warm_ms, b["warm_ms"], time_tolerance, TIME_SLACK_MS):
+                problems.append(f"{label}: เวลา (warm) {b['warm_ms']:.1f} -> {m.warm_ms:.1f} ms")
+            if _worse(m.payload_bytes, b["payload_bytes"], PAYLOAD_TOLERANCE, PAYLOAD_SLACK_BYTES):
+                problems.append(f"{label}: payload {b['payload_bytes']:,} -> {m.payload_bytes:,} B")
+            if _worse(m.peak_kb, b["peak_kb"], MEMORY_TOLERANCE, MEMORY_SLACK_KB):
+                problems.append(f"{label}: หน่วยความจำ {b['peak_kb']:,.0f} -> {m.peak_kb:,.0f} KB")
+    return problems
+
+
+def report(results: Dict[str, List[Measurement]]) -> str:
+    lines = []
+    for scale, ms in results.items():
+        lines.append(f"== {scale}")
+        lines.append(f"{'name':<38}{'cold ms':>10}{'warm ms':>10}{'peak KB':>11}{'payload B':>12}")
+        for m in ms:
+            warm = "" if m.warm_ms is None else f"{m.warm_ms:.1f}"
+            payload = f"{m.payload_bytes:,}" if m.payload_bytes else ""
+            lines.append(f"{m.name:<38}{m.wall_ms:>10.1f}{warm:>10}{m.peak_kb:>11,.0f}{payload:>12}")
+    return "\n".join(lines)
@@ -0,0 +1,64 @@
+# bench/labels.py
+# -*- coding: utf-8 -*-
+"""
+ตรวจป้ายตัวเลขแบบ vectorized (utils/formatters.py) เทียบกับ f-string ทีละค่าบนค่าสุ่ม
+
+    python -m bench.labels [--n 200000] [--seed 0]
+
+- pct_labels  เทียบ f"{v:.2f}%"  (ค่าทศนิยม 3 ตำแหน่ง = กรณีครึ่งทางของการปัดเยอะที่สุด)
+- baht_labels เทียบ f"{v:,.0f}" (รวมค่าที่เกินช่วง int64 และ .5 พอดี)
+ค่า NaN / inf ต้องเป็น "-" ทั้งคู่ — ต่างกันแม้ค่าเดียวคืน exit code 1
+"""
+import argparse
+import math
+import sys
+from typing import Callable, List
+
+import numpy as np
+
+from utils.formatters import baht_labels, pct_labels
+
+
+def _reference(fmt: Callable[[float], str]) -> Callable[[float], str]:
+    return lambda x: fmt(x) if math.isfinite(x) else "-"
+
+
+def _inputs(rng: np.random.Generator, n: int) -> dict:
+    special = np.array([np.nan, np.inf, -np.inf, 0.0, -0.0, 0.5, -0.5, 2.5, -2.5, 1e19, -2.5e20, 2.0 ** 63])
+    return {
+        "pct": np.concatenate([np.round(rng.uniform(-1000, 1000, n), 3), rng.normal(0, 50, n // 4), special]),
+        "baht": np.concatenate([np.round(rng.uniform(-1e9, 1e9, n), 1), rng.lognormal(10, 4, n // 4),
+                                np.round(rng.uniform(0, 1e6, n // 4)) + 0.5, special]),
+    }
+
+
+def check(n: int, seed: int = 0) -> List[str]:
+    rng = np.random.default_rng(seed)
+    inputs = _inputs(rng, n)
+    cases = [
+        ("pct_labels", pct_labels, inputs["pct"], _reference(lambda x: f"{x:.2f}%")),
+        ("baht_labels", baht_labels, inputs["baht"], _reference(lambda x: f"{x:,.0f}")),
+    ]
+    problems = []
+    for name, fn, values, ref in cases:
+        got = fn(values)
+        bad = [(v, str(g), ref(v)) for v, g in zip(values.tolist(), got) if str(g) != ref(v)]
+        print(f"{name:<12}{len(values):>10,} ค่า  ต่าง {len(bad):,}")
+        problems += [f"{name}({v!r}) = {g!r} แต่ f-string = {r!r}" for v, g, r in bad[:5]]
+    return problems
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ป้ายตัวเลขแบบ vectorized ต้องตรงกับ f-string")
+    ap.add_argument("--n", type=int, default=200_000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    problems = check(args.n, args.seed)
+    for p in problems:
+        print(p)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
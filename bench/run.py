@@ -0,0 +1,203 @@
+# bench/run.py
+# -*- coding: utf-8 -*-
+"""
+รัน benchmark ของการโหลดข้อมูลและคอมโพเนนต์ทุกตัว แล้วเทียบกับ baseline
+
+    python -m bench.run [--scales real 1000x24 10000x240] [--only charts.] [--repeat 3]
+                        [--baseline bench/baseline.json] [--save-baseline] [--json out.json]
+
+ขนาด "real" = คลังข้อมูลจริง (data/store), "PxM" = จังหวัด P แถว x เดือน M งวด (bench/scale.py)
+คืน exit code 1 เมื่อมีรายการถดถอยเกินเกณฑ์ (bench/harness.py: compare) — ใช้ใน CI ก่อน deploy ได้
+"""
+import os
+
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")   # คำเตือน deprecation ของ streamlit ทุกรอบ AppTest
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from bench.harness import (
+    TIME_TOLERANCE, Measurement, compare, load_baseline, measure, measure_component, report, save_baseline, to_json,
+)
+from bench.scale import REAL, parse_scale, scale_tables
+from utils.cube import SalesCube, build_cube
+from utils.data import PROVINCE_NAME_MAP, build_dataset, load_geojson
+from utils.geo import build_levels, level_for_zoom
+from utils.hierarchy import compile_all, load_hierarchy_specs
+from utils.readonly import freeze_cube
+from utils.store import open_store, write_store
+from utils.synth import real_tables
+from utils.timedim import month_columns
+
+from components.charts import (
+    render_cdd_sources_embeds,
+    render_channel_cumulative_ytd,
+    render_main_row_charts,
+    render_mom_change_by_province,
+    render_monthly_heatmap_selected,
+    render_product_category_performance,
+    render_province_vs_avg_trend,
+    render_regional_growth,
+    render_revenue_sources,
+    render_time_kind_controls,
+)
+from components.kpi_card import render_kpis
+from components.mapbox import MAP_ZOOM, render_thailand_map
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+TEMPLATE = "plotly_white"
+FIXTURE_VERTICES = 1500   # จุดต่อจังหวัดของ GeoJSON fixture (ใกล้เคียงไฟล์จริงที่ level 0)
+
+
+# ------------------------------
+# ข้อมูลของแต่ละขนาด
+# ------------------------------
+def full_cube(tables: Dict[str, pd.DataFrame], data_version: str) -> SalesCube:
+    """คิวบ์ของทุกเดือนในตาราง (ไม่แบ่งปีงบ) — คอมโพเนนต์จึงเห็นแกนเวลายาวเต็มขนาดที่วัด"""
+    df1, df2, df3 = tables["province"], tables["channel"], tables["product_type"]
+    default_scheme, specs = load_hierarchy_specs()
+    return freeze_cube(build_cube(
+        df1, df2, df3, month_columns(df1.columns), compile_all(specs, df1.index), default_scheme,
+        PROVINCE_NAME_MAP, data_version=data_version,
+    ))
+
+
+def geo_fixture(out_dir: Path, vertices: int = FIXTURE_VERTICES) -> Path:
+    """GeoJSON สังเคราะห์ (วงกลมหลายเหลี่ยมต่อจังหวัด บนตาราง) -> ไฟล์ทุก level ใน out_dir"""
+    import numpy as np
+
+    t = np.linspace(0.0, 2.0 * np.pi, vertices, endpoint=False)
+    features = []
+    for i, name in enumerate(sorted(PROVINCE_NAME_MAP.values())):
+        cx, cy = 97.5 + (i % 9) * 0.8, 6.0 + (i // 9) * 1.6
+        r = 0.35 * (1.0 + 0.05 * np.sin(7 * t))
+        ring = np.column_stack([cx + r * np.cos(t), cy + r * np.sin(t)]).round(6).tolist()
+        features.append({
+            "type": "Feature", "properties": {"name": name},
+            "geometry": {"type": "Polygon", "coordinates": [ring + ring[:1]]},
+        })
+    build_levels({"type": "FeatureCollection", "features": features}, out_dir)
+    return out_dir
+
+
+@dataclass
+class Context:
+    cube: SalesCube
+    month: str
+    province: str
+    geojson: Any
+
+
+# ------------------------------
+# รายการคอมโพเนนต์ (ชื่อ, render_*, kwargs จาก Context)
+# ------------------------------
+COMPONENTS: Tuple[Tuple[str, Callable, Callable[[Context], Dict[str, Any]]], ...] = (
+    ("kpi_card.render_kpis", render_kpis,
+     lambda c: dict(cube=c.cube, selected_month=c.month)),
+    ("charts.render_time_kind_controls", render_time_kind_controls,
+     lambda c: dict(prefix="main", months=c.cube.months)),
+    ("charts.render_main_row_charts", render_main_row_charts,
+     lambda c: dict(cube=c.cube, selected_month=c.month, selected_province=c.province, plotly_template=TEMPLATE)),
+    ("charts.render_revenue_sources", render_revenue_sources,
+     lambda c: dict(cube=c.cube, selected_month=c.month, plotly_template=TEMPLATE)),
+    ("charts.render_cdd_sources_embeds", render_cdd_sources_embeds,
+     lambda c: dict(key_prefix="bench")),
+    ("charts.render_regional_growth", render_regional_growth,
+     lambda c: dict(cube=c.cube, selected_month=c.month, selected_province=c.province, plotly_template=TEMPLATE)),
+    ("charts.render_product_category_performance", render_product_category_performance,
+     lambda c: dict(cube=c.cube, selected_month=c.month, plotly_template=TEMPLATE)),
+    ("charts.render_province_vs_avg_trend", render_province_vs_avg_trend,
+     lambda c: dict(cube=c.cube, selected_province=c.province, plotly_template=TEMPLATE)),
+    ("charts.render_mom_change_by_province", render_mom_change_by_province,
+     lambda c: dict(cube=c.cube, selected_month=c.month, selected_province=c.province, plotly_template=TEMPLATE)),
+    ("charts.render_monthly_heatmap_selected", render_monthly_heatmap_selected,
+     lambda c: dict(cube=c.cube, selected_month=c.month, selected_province=c.province, plotly_template=TEMPLATE)),
+    ("charts.render_channel_cumulative_ytd", render_channel_cumulative_ytd,
+     lambda c: dict(cube=c.cube, selected_month=c.month, plotly_template=TEMPLATE)),
+    ("mapbox.render_thailand_map", render_thailand_map,
+     lambda c: dict(cube=c.cube, thailand_geojson=c.geojson, selected_month=c.month, engine="mapbox")),
+    ("mapbox.render_thailand_map[geo]", render_thailand_map,
+     lambda c: dict(cube=c.cube, thailand_geojson=c.geojson, selected_month=c.month, engine="geo")),
+)
+
+
+def bench_scale(scale: str, work: Path, repeat: int, only: str) -> List[Measurement]:
+    tables = real_tables()
+    if scale != REAL:
+        tables = scale_tables(tables, *parse_scale(scale))
+    n_prov, n_month = tables["province"].shape
+    out: List[Measurement] = []
+    wanted = lambda name: not only or only in name
+
+    # ---- การโหลดข้อมูล ----
+    root = work / f"store-{scale}"
+    if wanted("store.write"):
+        out.append(measure("store.write", lambda: write_store(tables, root), repeat=1))
+    else:
+        write_store(tables, root)
+    snapshot = open_store(root)
+    latest = snapshot.fiscal_years[-1]
+    if wanted("store.open"):
+        out.append(measure("store.open", lambda: open_store(root), repeat))
+    if wanted("data.build_dataset"):
+        out.append(measure("data.build_dataset", lambda: build_dataset(snapshot, latest), repeat))
+    if wanted("cube.all_periods"):
+        out.append(measure("cube.all_periods", lambda: full_cube(tables, f"bench-{scale}"), repeat))
+
+    level = level_for_zoom(MAP_ZOOM)
+    if wanted("geo.load_geojson"):
+        out.append(measure("geo.load_geojson", lambda: load_geojson(level), repeat, setup=load_geojson.clear))
+    geojson = load_geojson(level)
+
+    # ---- คอมโพเนนต์ ----
+    cube = full_cube(tables, f"bench-{scale}")
+    month = cube.months[-1]
+    ctx = Context(cube=cube, month=month, province=cube.provinces[int(cube.order_desc[-1, 0])], geojson=geojson)
+    for name, render, kwargs in COMPONENTS:
+        if wanted(name):
+            out.append(measure_component(name, render, kwargs(ctx), repeat))
+    for m in out:
+        m.extra.update(provinces=n_prov, months=n_month)
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="benchmark การโหลดข้อมูลและคอมโพเนนต์ของแดชบอร์ด")
+    ap.add_argument("--scales", nargs="+", default=[REAL], help='"real" และ/หรือ "จังหวัดxเดือน" เช่น 10000x240')
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", default="", help="วัดเฉพาะรายการที่ชื่อมีข้อความนี้")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=TIME_TOLERANCE, help="เวลาใหม่/เวลา baseline ที่ถือว่าถดถอย")
+    ap.add_argument("--json", type=Path, default=None, help="เขียนผลทั้งหมดเป็น JSON")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="otop-bench-") as tmp:
+        work = Path(tmp)
+        os.environ["OTOP_GEO_CACHE"] = str(geo_fixture(work / "geo"))   # ไม่พึ่งเครือข่าย
+        results = {scale: bench_scale(scale, work, args.repeat, args.only) for scale in args.scales}
+
+    print(report(results))
+    if args.json:
+        args.json.write_text(json.dumps(to_json(results), ensure_ascii=False, indent=1), encoding="utf-8")
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"บันทึก baseline: {args.baseline}")
+        return 0
+    problems = compare(results, load_baseline(args.baseline), args.tolerance)
+    for p in problems:
+        print(f"ถดถอย: {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
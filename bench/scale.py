@@ -0,0 +1,31 @@
+# bench/scale.py
+# -*- coding: utf-8 -*-
+"""
+ขนาดข้อมูลของ benchmark: "real" หรือ "จังหวัดxเดือน" -> ตารางจาก utils/synth.py
+
+ตารางสังเคราะห์เรียนรูปร่างจากข้อมูลจริง (ขนาดหางยาว, ฤดูกาล, สัดส่วนช่องทาง/สินค้า)
+77 แถวแรกคือชื่อจังหวัดจริง (แผนที่ยังจับคู่ได้); ผลลัพธ์ deterministic ตาม seed
+"""
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from utils.synth import fit_shapes, generate
+
+REAL = "real"
+
+
+def parse_scale(text: str) -> Tuple[int, int]:
+    """"10000x240" -> (10000, 240)"""
+    p, _, m = text.lower().partition("x")
+    n_entities, n_periods = int(p), int(m)
+    if n_entities < 1 or n_periods < 1:
+        raise ValueError(f"ขนาดไม่ถูกต้อง: {text}")
+    return n_entities, n_periods
+
+
+def scale_tables(
+    tables: Dict[str, pd.DataFrame], n_entities: int, n_periods: int, seed: int = 0, growth: float = 0.05
+) -> Dict[str, pd.DataFrame]:
+    """{"province", "channel", "product_type"} จริง -> ขนาด n_entities จังหวัด x n_periods เดือน"""
+    return generate(fit_shapes(tables), n_entities, n_periods, seed=seed, growth=growth)
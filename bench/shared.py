@@ -0,0 +1,131 @@
+# bench/shared.py
+# -*- coding: utf-8 -*-
+"""
+หลายโปรเซสบนเครื่องเดียว: หน่วยความจำต่อ worker เมื่อแชร์ชุดข้อมูลที่คำนวณแล้ว (OTOP_SHARED_DIR) เทียบกับสร้างเอง
+
+    python -m bench.shared [--workers 4] [--scale 20000x24]
+
+แต่ละ worker เป็นโปรเซสใหม่ (spawn เหมือนโปรเซส Streamlit แยกกัน) เรียก load_year() ปีล่าสุด
+อ่านทุก array ให้ครบหนึ่งรอบ แล้ววัดพร้อมกัน (ทุก worker ยังถือชุดข้อมูลอยู่):
+- private MB: หน่วยความจำส่วนตัวที่เพิ่มขึ้นหลังโหลด (Private_Clean + Private_Dirty ของ /proc/self/smaps_rollup)
+              โหมดแชร์เหลือแค่อ็อบเจ็กต์ Python (ป้าย / dict ตำแหน่ง) — array ทุกตัวอยู่ใน page cache ที่แชร์
+- pss MB    : ส่วนแบ่งตามสัดส่วน (Pss) ที่เพิ่มขึ้น — หน้าที่แชร์ N โปรเซสนับ 1/N ต่อโปรเซส
+ผลรวม pss ของโหมดแชร์ต้องแทบไม่โตตามจำนวน worker
+
+คืน exit code 1 เมื่อ private ต่อ worker (median) ของโหมดแชร์เกิน SHARED_PRIVATE_RATIO ของโหมดสร้างเอง
+(ต้องใช้ Linux: อ่าน /proc/self/smaps_rollup)
+"""
+import os
+
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+import argparse
+import dataclasses
+import logging
+import multiprocessing as mp
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+SHARED_PRIVATE_RATIO = 0.5
+
+
+def _smaps_mb() -> Dict[str, float]:
+    out = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Pss", "Private_Clean", "Private_Dirty"):
+                out[key] = int(rest.split()[0]) / 1024
+    return {"pss": out["Pss"], "private": out["Private_Clean"] + out["Private_Dirty"]}
+
+
+def _touch(obj) -> float:
+    """อ่านทุก array ในชุดข้อมูล (ให้หน้าของ mmap ถูกโหลดจริงเหมือนตอนคอมโพเนนต์ใช้)"""
+    if isinstance(obj, np.ndarray):
+        return float(obj.sum()) if obj.dtype.kind in "biuf" and obj.size else 0.0
+    if isinstance(obj, pd.DataFrame):
+        return sum(_touch(obj[c]) for c in obj.columns)
+    if isinstance(obj, pd.Series):
+        return _touch((obj.cat.codes if isinstance(obj.dtype, pd.CategoricalDtype) else obj).to_numpy())
+    if dataclasses.is_dataclass(obj):
+        return sum(_touch(getattr(obj, f.name)) for f in dataclasses.fields(obj))
+    if isinstance(obj, tuple):
+        return sum(_touch(x) for x in obj)
+    if isinstance(obj, Mapping):
+        return sum(_touch(x) for x in obj.values())
+    return 0.0
+
+
+def _worker(loaded, measured, results) -> None:
+    from utils.data import load_catalog, load_year
+
+    # ตารางดิบจากคลังข้อมูลเป็น mmap ทั้งสองโหมด — เปิดก่อนวัด (รวม import แบบ lazy ของ index สตริง) ไม่นับเป็นของชุดข้อมูล
+    snapshot = load_catalog()
+    snapshot.tables(snapshot.fiscal_years[-1])
+    before = _smaps_mb()
+    dataset = load_year()
+    _touch(dataset)
+    loaded.wait()                     # ทุก worker โหลดครบก่อน -> Pss แบ่งหน้าที่แชร์ตามจำนวนโปรเซสจริง
+    after = _smaps_mb()
+    results.put({k: after[k] - before[k] for k in after})
+    measured.wait()                   # ถือชุดข้อมูลไว้จนทุก worker วัดเสร็จ
+
+
+def run_workers(workers: int, store: Path, shared_dir: str) -> List[Dict[str, float]]:
+    ctx = mp.get_context("spawn")
+    loaded, measured, results = ctx.Barrier(workers), ctx.Barrier(workers), ctx.Queue()
+    os.environ["OTOP_STORE_DIR"] = str(store)
+    os.environ["OTOP_SHARED_DIR"] = shared_dir
+    procs = [ctx.Process(target=_worker, args=(loaded, measured, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    out = [results.get(timeout=600) for _ in procs]
+    for p in procs:
+        p.join()
+        if p.exitcode:
+            raise RuntimeError(f"worker ล้ม (exit {p.exitcode})")
+    return out
+
+
+def main(argv=None) -> int:
+    from bench.scale import REAL, parse_scale, scale_tables
+    from utils.store import open_store, write_store
+    from utils.synth import real_tables
+
+    ap = argparse.ArgumentParser(description="หน่วยความจำต่อ worker: แชร์ชุดข้อมูล vs สร้างเอง")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--scale", default="20000x24", help='"real" หรือ จังหวัดxเดือน')
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    tables = real_tables(open_store())
+    if args.scale != REAL:
+        tables = scale_tables(tables, *parse_scale(args.scale))
+    with tempfile.TemporaryDirectory(prefix="otop-shared-") as tmp:
+        store = Path(tmp) / "store"
+        write_store(tables, store)
+        modes = {"own": run_workers(args.workers, store, ""),
+                 "shared": run_workers(args.workers, store, str(Path(tmp) / "shared"))}
+
+    print(f"{'mode':<8}{'workers':>8}{'private MB (median)':>21}{'(max)':>8}{'pss MB total':>14}")
+    for mode, rows in modes.items():
+        private = [r["private"] for r in rows]
+        print(f"{mode:<8}{len(rows):>8}{statistics.median(private):>21.1f}{max(private):>8.1f}"
+              f"{sum(r['pss'] for r in rows):>14.1f}")
+    # median = worker ที่ attach (โปรเซสเดียวที่ publish ยังมีเศษจากการ build ค้างใน heap -> เห็นใน max)
+    own = statistics.median(r["private"] for r in modes["own"])
+    shared = statistics.median(r["private"] for r in modes["shared"])
+    if shared > own * SHARED_PRIVATE_RATIO:
+        print(f"แชร์ไม่ได้ผล: private {shared:.1f} MB/worker > {SHARED_PRIVATE_RATIO:.0%} ของ {own:.1f} MB")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
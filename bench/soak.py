@@ -0,0 +1,136 @@
+# bench/soak.py
+# -*- coding: utf-8 -*-
+"""
+Soak: session เดียว rerun ทั้งแอปหลายพันรอบ (เหมือนจอ kiosk ที่เปิดทิ้งไว้) แล้วตรวจว่าไม่โตตามจำนวนรอบ
+
+    python -m bench.soak [--reruns 3000] [--warmup 600] [--every 250]
+
+แต่ละรอบสลับการใช้งาน: rerun เฉย ๆ / เลื่อนช่วงเวลา / เปลี่ยนชนิดกราฟ / เปลี่ยนเดือน / สลับส่วนที่แสดง
+วัดทุก --every รอบ:
+- keys    : จำนวน key ใน session state (รวม state ภายในของ widget)
+- state KB: ขนาด pickle ของค่าใน session state ที่ผู้ใช้เห็น
+- heap MB : หน่วยความจำ Python ที่จองอยู่ของทั้งโปรเซส (tracemalloc)
+
+หลังช่วง warm-up (แคชรูปของมุมมองที่สลับไปมา + ring buffer ของ utils/profiler.py เต็มแล้ว)
+ทุกค่าต้องคงที่ภายในเกณฑ์ — เกินคืน exit code 1
+"""
+import os
+
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+import argparse
+import pickle
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+from utils.chart_data import TIME_RANGE_MONTHS
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+
+# เกณฑ์ (จุดวัดสุดท้ายเทียบจุดแรกหลัง warm-up)
+STATE_SLACK_BYTES = 1024
+HEAP_TOLERANCE = 1.10
+HEAP_SLACK_MB = 8.0
+
+
+@dataclass
+class Checkpoint:
+    rerun: int
+    keys: int
+    state_bytes: int
+    heap_mb: float
+    ms_per_rerun: float
+
+
+def _state_size(at) -> tuple:
+    state = at.session_state._state._state    # SessionState ของ AppTest (รวม state ภายในของ widget)
+    size = 0
+    for value in state.filtered_state.values():
+        try:
+            size += len(pickle.dumps(value))
+        except Exception:
+            pass
+    return len(list(state._keys())), size
+
+
+def _interact(at, i: int) -> None:
+    """การใช้งานของรอบที่ i (วนซ้ำชุดเดิม -> มุมมองจำกัด แคชรูปอิ่มในช่วง warm-up)"""
+    step = i % 10
+    if step == 3:
+        presets = ["ALL", *TIME_RANGE_MONTHS]
+        at.select_slider(key="time_range_slider_main").set_value(presets[(i // 10) % len(presets)])
+    elif step == 5:
+        at.select_slider(key="bar_kind_slider_main").set_value("Clustered" if (i // 10) % 2 else "Stacked")
+    elif step == 7:
+        month = at.sidebar.selectbox[1]
+        month.select(month.options[-1 - (i // 10) % 3])
+    elif step == 9:
+        section = at.radio(key="active_section")
+        section.set_value(section.options[(i // 10) % 2])
+
+
+def soak(reruns: int, warmup: int, every: int, timeout: float = 300) -> List[Checkpoint]:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP), default_timeout=timeout)
+    at.run()
+    tracemalloc.start()
+    out: List[Checkpoint] = []
+    t0, last = time.perf_counter(), 0
+    for i in range(1, reruns + 1):
+        _interact(at, i)
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"แอปล้มที่รอบ {i}: {at.exception[0].message}")
+        if i % every == 0 or i == reruns:
+            keys, size = _state_size(at)
+            heap, _ = tracemalloc.get_traced_memory()
+            ms = (time.perf_counter() - t0) * 1000.0 / (i - last)
+            out.append(Checkpoint(i, keys, size, heap / 2**20, ms))
+            print(f"{i:>7,}{keys:>7}{size / 1024:>11.1f}{heap / 2**20:>10.1f}{ms:>10.1f}", flush=True)
+            t0, last = time.perf_counter(), i
+    tracemalloc.stop()
+    return out
+
+
+def check(points: List[Checkpoint], warmup: int) -> List[str]:
+    steady = [p for p in points if p.rerun >= warmup]
+    if len(steady) < 2:
+        return [f"จุดวัดหลัง warm-up ({warmup} รอบ) น้อยเกินไป — เพิ่ม --reruns หรือลด --every"]
+    first, last = steady[0], steady[-1]
+    half = len(steady) // 2
+    # จำนวน key ขึ้นกับส่วนที่แสดงอยู่ (widget ของแต่ละส่วนต่างกัน) -> เทียบค่าสูงสุดของครึ่งแรก/ครึ่งหลัง
+    early, late = max(p.keys for p in steady[:half]), max(p.keys for p in steady[half:])
+    problems = []
+    if late > early:
+        problems.append(f"key ใน session state โต {early} -> {late}")
+    if last.state_bytes - first.state_bytes > STATE_SLACK_BYTES:
+        problems.append(f"session state โต {first.state_bytes:,} -> {last.state_bytes:,} B")
+    if last.heap_mb > first.heap_mb * HEAP_TOLERANCE and last.heap_mb - first.heap_mb > HEAP_SLACK_MB:
+        problems.append(f"heap โต {first.heap_mb:.1f} -> {last.heap_mb:.1f} MB")
+    return problems
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="soak test: session เดียว rerun หลายพันรอบ")
+    ap.add_argument("--reruns", type=int, default=3000)
+    ap.add_argument("--warmup", type=int, default=600, help="รอบก่อนเริ่มเทียบ (ควร >= ring buffer ของ profiler)")
+    ap.add_argument("--every", type=int, default=250)
+    args = ap.parse_args(argv)
+
+    print(f"{'rerun':>7}{'keys':>7}{'state KB':>11}{'heap MB':>10}{'ms/rerun':>10}")
+    points = soak(args.reruns, args.warmup, args.every)
+    problems = check(points, args.warmup)
+    for p in problems:
+        print(f"โต: {p}")
+    if not problems:
+        print("คงที่")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,520 +1,625 @@
-# components/charts.py
-# -*- coding: utf-8 -*-
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
-from typing import List
-from plotly.subplots import make_subplots
-
-# ------------------------------
-# Controls (ช่วงเวลา / ชนิดกราฟ)
-# ------------------------------
-def _unique_suffix(prefix: str) -> str:
-    if "_ctrl_counts" not in st.session_state:
-        st.session_state._ctrl_counts = {}
-    cnt = st.session_state._ctrl_counts.get(prefix, 0) + 1
-    st.session_state._ctrl_counts[prefix] = cnt
-    return f"{prefix}_{cnt}"
-
-def render_time_kind_controls(prefix="main"):
-    if "time_range" not in st.session_state:
-        st.session_state.time_range = "ALL"
-    if "bar_kind" not in st.session_state:
-        st.session_state.bar_kind = "Stacked"
-
-    suffix = _unique_suffix(prefix)
-    c1, c2 = st.columns([1, 1], gap="small")
-    with c1:
-        st.caption("ช่วงเวลา")
-        st.session_state.time_range = st.select_slider(
-            label="",
-            options=["ALL", "1M", "6M", "1Y"],
-            value=st.session_state.time_range,
-            key=f"time_range_slider_{suffix}",
-        )
-    with c2:
-        st.caption("ชนิดกราฟ")
-        st.session_state.bar_kind = st.select_slider(
-            label="",
-            options=["Stacked", "Clustered"],
-            value=st.session_state.bar_kind,
-            key=f"bar_kind_slider_{suffix}",
-        )
-
-# ------------------------------
-# กราฟหลักแถวแรก (ปรับตามจังหวัด)
-# ------------------------------
-def render_main_row_charts(
-    df1: pd.DataFrame,
-    df2: pd.DataFrame,
-    selected_month: str,
-    month_cols: List[str],
-    selected_province: str,
-    plotly_template: str = "plotly_white",
-    key_prefix: str = "main",
-):
-    tail_map = {"ALL": len(df2), "1M": 1, "6M": 6, "1Y": 12}
-    n_tail = tail_map.get(st.session_state.get("time_range", "ALL"), len(df2))
-    barmode = "stack" if st.session_state.get("bar_kind", "Stacked") == "Stacked" else "group"
-
-    # เตรียมข้อมูลกราฟแท่ง (ช่องทางระดับประเทศ)
-    d2 = df2.reset_index().tail(n_tail)
-    long_df = d2.melt(id_vars="เดือน", var_name="ช่องทาง", value_name="value")
-    channels = long_df["ช่องทาง"].unique().tolist()
-    months_tail = d2["เดือน"].tolist()
-
-    left, right = st.columns([3, 2], gap="large")
-
-    # ---------- ซ้าย: ช่องทาง + เส้นจังหวัด ----------
-    with left:
-        st.subheader("โครงสร้างช่องทางตามช่วงเวลา")
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        # Bars ต่อช่องทาง
-        for ch in channels:
-            df_ch = long_df[long_df["ช่องทาง"] == ch]
-            fig.add_trace(
-                go.Bar(
-                    x=df_ch["เดือน"],
-                    y=df_ch["value"],
-                    name=ch,
-                    text=[f"{v:,.0f}" for v in df_ch["value"]],
-                    textposition="outside",
-                ),
-                secondary_y=False,
-            )
-        # เส้นจังหวัด (secondary axis)
-        if selected_province and selected_province != "ภาพรวม" and selected_province in df1.index:
-            ser = df1.loc[selected_province, month_cols]
-            ser = ser[ser.index.isin(months_tail)]
-            fig.add_trace(
-                go.Scatter(
-                    x=ser.index.tolist(),
-                    y=ser.values.tolist(),
-                    mode="lines+markers",
-                    name=f"แนวโน้มจังหวัด: {selected_province}",
-                    line=dict(width=4, color="#111827"),
-                    marker=dict(size=8),
-                    hovertemplate="%{x}<br>%{y:,.0f} บาท",
-                ),
-                secondary_y=True,
-            )
-        fig.update_layout(
-            barmode="stack" if barmode == "stack" else "group",
-            template=plotly_template,
-            margin=dict(l=0, r=0, b=0, t=10),
-            legend_title_text="",
-            xaxis=dict(tickangle=-30),
-        )
-        fig.update_yaxes(title_text="บาท (฿) — ช่องทางระดับประเทศ", secondary_y=False)
-        fig.update_yaxes(title_text="บาท (฿) — จังหวัดที่เลือก", secondary_y=True)
-        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"main_mix_{key_prefix}")
-
-    # ---------- ขวา: Top 20 จังหวัดของเดือน ----------
-    with right:
-        st.subheader(f"20 จังหวัดยอดขายสูงสุด ({selected_month})")
-        monthly_data = df1[[selected_month]].sort_values(by=selected_month, ascending=False).reset_index()
-        bar = px.bar(
-            monthly_data.head(20).sort_values(by=selected_month, ascending=True),
-            x=selected_month, y="จังหวัด", orientation="h",
-            template=plotly_template, labels={"จังหวัด": "", selected_month: "ยอดขาย (บาท)"},
-            height=600
-        )
-        bar.update_layout(yaxis={'categoryorder': 'total ascending'}, margin=dict(l=0, r=0, b=0, t=10))
-        st.plotly_chart(bar, use_container_width=True, config={"displayModeBar": False}, key=f"top20_{key_prefix}")
-
-# ------------------------------
-# Revenue Sources (เดือนเดียว)
-# ------------------------------
-def render_revenue_sources(df2: pd.DataFrame, selected_month: str, plotly_template: str = "plotly_white", key_prefix: str = "revsrc"):
-    st.markdown("#### Revenue Sources (เดือนเดียว)")
-    month_key = selected_month.split(" ")[0]
-    idx = next((i for i in df2.index if str(i).startswith(month_key)), None)
-    if idx is None:
-        st.info("ไม่พบข้อมูลสำหรับเดือนนี้", icon="ℹ️")
-        return
-    s = df2.loc[idx]
-    fig = px.pie(values=s.values, names=s.index, hole=.45, template=plotly_template)
-    fig.update_layout(margin=dict(l=0, r=0, b=0, t=0), legend_title_text="")
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"pie_{key_prefix}")
-
-# ------------------------------
-# ฝังหน้าเว็บ CDD (ไม่รองรับ key ใน iframe)
-# ------------------------------
-def render_cdd_sources_embeds(key_prefix: str = "cdd"):
-    st.markdown("#### แหล่งข้อมูลที่ใช้สร้าง Dashboard (ฝังจาก CDD)")
-    url_map = {
-        "otop_r06": "https://logi.cdd.go.th/otop/cdd_report/otop_r06.php?year=2567",
-        "otop_r05": "https://logi.cdd.go.th/otop/cdd_report/otop_r05.php?year=2567",
-        "otop_r04": "https://logi.cdd.go.th/otop/cdd_report/otop_r04.php?year=2567&org_group=0",
-    }
-    key = st.selectbox(
-        "เลือกหน้า",
-        options=list(url_map.keys()),
-        format_func=lambda k: k.upper(),
-        key=f"cdd_select_{key_prefix}",
-    )
-    st.components.v1.iframe(url_map[key], height=420, scrolling=True)
-
-# ======================================================
-# Regional Growth Trend & Product Category Charts
-# ======================================================
-
-_REGION_MAP = {
-    "ภาคเหนือ": [
-        "เชียงใหม่","เชียงราย","ลำพูน","ลำปาง","แพร่","น่าน","พะเยา","แม่ฮ่องสอน","อุตรดิตถ์","ตาก","สุโขทัย","พิษณุโลก","พิจิตร","เพชรบูรณ์"
-    ],
-    "ภาคตะวันออกเฉียงเหนือ": [
-        "ขอนแก่น","อุดรธานี","เลย","หนองคาย","หนองบัวลำภู","ชัยภูมิ","นครราชสีมา","บุรีรัมย์","สุรินทร์","ศรีสะเกษ",
-        "อุบลราชธานี","ยโสธร","อำนาจเจริญ","มหาสารคาม","ร้อยเอ็ด","กาฬสินธุ์","สกลนคร","นครพนม","มุกดาหาร","บึงกาฬ"
-    ],
-    "ภาคกลาง": [
-        "นนทบุรี","ปทุมธานี","พระนครศรีอยุธยา","สระบุรี","อ่างทอง","ลพบุรี","สิงห์บุรี","ชัยนาท",
-        "นครสวรรค์","อุทัยธานี","กำแพงเพชร"
-    ],
-    "ภาคตะวันออก": ["ชลบุรี","ระยอง","จันทบุรี","ตราด","ฉะเชิงเทรา","ปราจีนบุรี","นครนายก","สระแก้ว"],
-    "ภาคตะวันตก": ["ราชบุรี","กาญจนบุรี","สุพรรณบุรี","นครปฐม","สมุทรสาคร","สมุทรสงคราม","เพชรบุรี","ประจวบคีรีขันธ์"],
-    "ภาคใต้": [
-        "นครศรีธรรมราช","สุราษฎร์ธานี","ชุมพร","ระนอง","พังงา","ภูเก็ต","กระบี่","ตรัง","พัทลุง","สงขลา","สตูล","ปัตตานี","ยะลา","นราธิวาส"
-    ],
-}
-
-def _build_regional_df(df1: pd.DataFrame, month_cols: List[str]) -> pd.DataFrame:
-    frames = []
-    for region, provs in _REGION_MAP.items():
-        prov_in_df = [p for p in provs if p in df1.index]
-        if not prov_in_df:
-            continue
-        s = df1.loc[prov_in_df, month_cols].sum()
-        frames.append(pd.DataFrame({"ภูมิภาค": region, "เดือน": month_cols, "ยอดขาย": s.values}))
-    if not frames:
-        return pd.DataFrame(columns=["ภูมิภาค","เดือน","ยอดขาย"])
-    return pd.concat(frames, ignore_index=True)
-
-def _region_of_province(province: str) -> str:
-    for r, provs in _REGION_MAP.items():
-        if province in provs:
-            return r
-    return ""
-
-def render_regional_growth(
-    df1: pd.DataFrame,
-    month_cols: List[str],
-    selected_month: str,
-    selected_province: str = "ภาพรวม",
-    plotly_template: str = "plotly_white",
-    key_prefix: str = "regional",
-):
-    st.subheader("การเติบโตยอดขายตามภูมิภาค (Regional Growth)")
-    reg = _build_regional_df(df1, month_cols)
-    if reg.empty:
-        st.info("ไม่มีข้อมูลภูมิภาคเพียงพอ", icon="ℹ️")
-        return
-
-    # เดือนปัจจุบัน/ก่อนหน้า
-    try:
-        m_idx = month_cols.index(selected_month)
-    except ValueError:
-        m_idx = len(month_cols) - 1
-    prev_idx = max(0, m_idx - 1)
-    month_now, month_prev = month_cols[m_idx], month_cols[prev_idx]
-
-    cur = reg[reg["เดือน"] == month_now].set_index("ภูมิภาค")["ยอดขาย"]
-    prev = reg[reg["เดือน"] == month_prev].set_index("ภูมิภาค")["ยอดขาย"]
-    mom = ((cur - prev) / prev.replace(0, np.nan) * 100).fillna(0)
-
-    # ผู้ชนะ MoM
-    top_region = mom.sort_values(ascending=False).index[0]
-    # ภูมิภาคของจังหวัดที่เลือก
-    sel_region = _region_of_province(selected_province) if selected_province and selected_province != "ภาพรวม" else ""
-
-    fig = go.Figure()
-    palette = {
-        "ภาคเหนือ": "#636EFA", "ภาคตะวันออกเฉียงเหนือ": "#EF553B", "ภาคกลาง": "#00CC96",
-        "ภาคตะวันออก": "#AB63FA", "ภาคตะวันตก": "#FFA15A", "ภาคใต้": "#19D3F3",
-    }
-    for region in reg["ภูมิภาค"].unique():
-        y = reg[reg["ภูมิภาค"] == region]["ยอดขาย"].values
-        # เน้นเส้น: ชนะ MoM = หนา / ภูมิภาคของจังหวัดที่เลือก = หนาที่สุด
-        if sel_region and region == sel_region:
-            line_w, marker_s, line_color = 5, 9, "#111827"
-        elif region == top_region:
-            line_w, marker_s, line_color = 4, 8, palette.get(region)
-        else:
-            line_w, marker_s, line_color = 2, 5, palette.get(region)
-        fig.add_trace(go.Scatter(
-            x=month_cols, y=y, mode="lines+markers", name=region,
-            line=dict(width=line_w, color=line_color),
-            marker=dict(size=marker_s)
-        ))
-
-    # Annotation
-    y_top = reg[(reg["ภูมิภาค"] == top_region) & (reg["เดือน"] == month_now)]["ยอดขาย"].values[0]
-    fig.add_annotation(
-        x=month_now, y=y_top, text=f"แชมป์ MoM: {top_region} (+{mom[top_region]:.2f}%)",
-        showarrow=True, arrowhead=2, ax=30, ay=-40, bgcolor="rgba(255,255,255,.9)",
-        bordercolor="#111", borderwidth=1
-    )
-    if sel_region:
-        y_sel = reg[(reg["ภูมิภาค"] == sel_region) & (reg["เดือน"] == month_now)]["ยอดขาย"].values[0]
-        fig.add_annotation(
-            x=month_now, y=y_sel, text=f"จังหวัดที่เลือกอยู่ใน: {sel_region}",
-            showarrow=True, arrowhead=2, ax=-40, ay=-10, bgcolor="rgba(255,255,255,.9)",
-            bordercolor="#111", borderwidth=1
-        )
-
-    fig.update_layout(
-        template=plotly_template, margin=dict(l=10, r=10, t=40, b=10),
-        yaxis_title="ยอดขาย (บาท)", xaxis_title="เดือน",
-        legend_title_text="", height=420,
-        title=dict(text="แนวโน้มยอดขายรายภูมิภาค (ไฮไลต์จังหวัดที่เลือก)", font=dict(size=20)),
-        xaxis=dict(tickangle=-30, tickfont=dict(size=12)),
-        yaxis=dict(tickfont=dict(size=12)),
-        legend=dict(font=dict(size=12))
-    )
-    fig.update_traces(hovertemplate="%{x}<br>%{y:,.0f} บาท")
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"regional_{key_prefix}")
-
-def render_product_category_performance(
-    df3: pd.DataFrame,
-    selected_month: str,
-    selected_province: str = "ภาพรวม",
-    plotly_template: str = "plotly_white",
-    key_prefix: str = "prodcat",
-):
-    # แจ้งว่าข้อมูลหมวดสินค้าระดับจังหวัดยังไม่มี
-    title_suffix = f" — {selected_month}"
-    if selected_province and selected_province != "ภาพรวม":
-        st.info(f"ยังไม่มีข้อมูลสัดส่วนหมวดสินค้าแยกตามจังหวัด • แสดงภาพรวมทั้งประเทศแทน ({selected_month})", icon="ℹ️")
-        title_suffix = f" — {selected_month} (ภาพรวมประเทศ)"
-
-    # หาเดือนใน df3
-    month_key = selected_month.split(" ")[0]
-    idx_match = next((idx for idx in df3.index if str(idx).startswith(month_key)), None)
-    if idx_match is None:
-        st.info("ไม่พบข้อมูลประเภทสินค้าสำหรับเดือนนี้", icon="ℹ️")
-        return
-    s = df3.loc[idx_match].sort_values(ascending=True)
-    top_name = s.idxmax()
-    top_val = s.max()
-
-    colors = ["#D1D5DB"] * len(s)
-    colors[list(s.index).index(top_name)] = "#2563EB"
-
-    fig = go.Figure(go.Bar(
-        x=s.values, y=s.index, orientation="h",
-        marker=dict(color=colors),
-        text=[f"{v:,.0f}" for v in s.values],
-        textposition="outside",
-    ))
-    fig.update_layout(
-        template=plotly_template, margin=dict(l=10, r=10, t=40, b=10),
-        xaxis_title="ยอดขาย (บาท)", yaxis_title="",
-        height=420,
-        title=dict(text=f"Top ประเภทสินค้า OTOP ขายดี{title_suffix}", font=dict(size=20)),
-        xaxis=dict(tickfont=dict(size=12)), yaxis=dict(tickfont=dict(size=12)),
-    )
-    fig.add_annotation(
-        x=top_val, y=top_name, text=f"แชมป์: {top_name} (฿{top_val:,.0f})",
-        showarrow=True, arrowhead=2, ax=40, ay=-10,
-        bgcolor="rgba(255,255,255,.9)", bordercolor="#111", borderwidth=1
-    )
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"prodcat_{key_prefix}")
-
-# ================================
-# NEW 4 CHARTS (responsive to month & province)
-# ================================
-def render_province_vs_avg_trend(
-    df1: pd.DataFrame,
-    month_cols: List[str],
-    selected_province: str,
-    plotly_template: str = "plotly_white",
-    key_prefix: str = "pvsavg",
-):
-    """แนวโน้มจังหวัดที่เลือก เทียบค่าเฉลี่ยประเทศ (เส้นใหญ่/ไฮไลต์ชัดเจน)"""
-    st.subheader("แนวโน้มจังหวัดที่เลือกเทียบค่าเฉลี่ยประเทศ")
-    nat_avg = df1[month_cols].mean()
-
-    fig = go.Figure()
-
-    # เส้นค่าเฉลี่ยประเทศ
-    fig.add_trace(
-        go.Scatter(
-            x=month_cols,
-            y=nat_avg.values,
-            mode="lines+markers",
-            name="ค่าเฉลี่ยทั้งประเทศ",
-            line=dict(width=3, dash="dash", color="#7C3AED"),
-            marker=dict(size=6),
-            hovertemplate="%{x}<br>%{y:,.0f} บาท",
-        )
-    )
-
-    # เส้นจังหวัด
-    if selected_province and selected_province != "ภาพรวม" and selected_province in df1.index:
-        y = df1.loc[selected_province, month_cols].values
-        fig.add_trace(
-            go.Scatter(
-                x=month_cols,
-                y=y,
-                mode="lines+markers",
-                name=f"{selected_province}",
-                line=dict(width=5, color="#111827"),
-                marker=dict(size=8),
-                hovertemplate="%{x}<br>%{y:,.0f} บาท",
-            )
-        )
-    else:
-        fig.add_annotation(
-            x=month_cols[-1], y=nat_avg.values[-1],
-            text="เลือกจังหวัดทางซ้ายเพื่อเทียบแนวโน้ม",
-            showarrow=True, arrowhead=2, ax=-40, ay=-40,
-            bgcolor="rgba(255,255,255,.9)", bordercolor="#111", borderwidth=1
-        )
-
-    fig.update_layout(
-        template=plotly_template,
-        margin=dict(l=10, r=10, t=40, b=10),
-        yaxis_title="ยอดขาย (บาท)", xaxis_title="เดือน",
-        legend_title_text="",
-        height=420,
-        title=dict(text="Province vs National Average (Trend)", font=dict(size=20)),
-        xaxis=dict(tickangle=-30, tickfont=dict(size=12)),
-        yaxis=dict(tickfont=dict(size=12)),
-        legend=dict(font=dict(size=12)),
-    )
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"pvsavg_{key_prefix}")
-
-def render_mom_change_by_province(
-    df1: pd.DataFrame,
-    month_cols: List[str],
-    selected_month: str,
-    selected_province: str,
-    plotly_template: str = "plotly_white",
-    key_prefix: str = "momprov",
-):
-    """การเปลี่ยนแปลง MoM ตามจังหวัดสำหรับเดือนที่เลือก (ไฮไลต์จังหวัดที่เลือก)"""
-    st.subheader("การเปลี่ยนแปลง MoM ตามจังหวัด (เดือนที่เลือก)")
-
-    try:
-        m_idx = month_cols.index(selected_month)
-    except ValueError:
-        m_idx = len(month_cols) - 1
-    prev_idx = max(0, m_idx - 1)
-    cur_col, prev_col = month_cols[m_idx], month_cols[prev_idx]
-
-    cur = df1[cur_col]
-    prev = df1[prev_col].replace(0, np.nan)
-    mom_pct = ((cur - prev) / prev * 100).fillna(0).sort_values(ascending=True)
-
-    colors = []
-    for prov in mom_pct.index:
-        if selected_province and selected_province != "ภาพรวม" and prov == selected_province:
-            colors.append("#111827")  # ไฮไลต์จังหวัดที่เลือก
-        else:
-            colors.append("#60A5FA" if mom_pct.loc[prov] >= 0 else "#F87171")
-
-    fig = go.Figure(go.Bar(
-        x=mom_pct.values,
-        y=mom_pct.index,
-        orientation="h",
-        marker=dict(color=colors),
-        text=[f"{v:.2f}%" for v in mom_pct.values],
-        textposition="outside",
-    ))
-    fig.update_layout(
-        template=plotly_template,
-        margin=dict(l=10, r=10, t=40, b=10),
-        xaxis_title="เปอร์เซ็นต์เปลี่ยนแปลง MoM (%)",
-        yaxis_title="",
-        height=600,
-        title=dict(text=f"MoM Change by Province — {selected_month}", font=dict(size=20)),
-        xaxis=dict(tickfont=dict(size=12)), yaxis=dict(tickfont=dict(size=12)),
-    )
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"momprov_{key_prefix}")
-
-def render_monthly_heatmap_selected(
-    df1: pd.DataFrame,
-    month_cols: List[str],
-    selected_month: str,
-    selected_province: str,
-    plotly_template: str = "plotly_white",
-    key_prefix: str = "heat",
-):
-    """Heatmap: Top 15 จังหวัด (ตามยอดของเดือนที่เลือก) x ทุกเดือน — ไฟอ่านชัดเจน"""
-    st.subheader("Heatmap จังหวัดยอดนิยม (Top 15) ตามเดือน")
-
-    if selected_month not in df1.columns:
-        st.info("ไม่พบข้อมูลเดือนที่เลือกใน df1", icon="ℹ️")
-        return
-    top15 = df1[selected_month].sort_values(ascending=False).head(15).index.tolist()
-    sub = df1.loc[top15, month_cols]
-
-    fig = px.imshow(
-        sub.values,
-        x=month_cols,
-        y=top15,
-        labels=dict(color="ยอดขาย (บาท)"),
-        color_continuous_scale="YlGnBu",
-        aspect="auto",
-    )
-    fig.update_layout(
-        template=plotly_template,
-        margin=dict(l=10, r=10, t=40, b=10),
-        height=520,
-        title=dict(text=f"Heatmap — Top 15 จังหวัด (อิง {selected_month})", font=dict(size=20)),
-        xaxis=dict(tickangle=-30),
-        coloraxis_colorbar=dict(title="บาท"),
-    )
-
-    if selected_province and selected_province in top15:
-        sel_idx = top15.index(selected_province)
-        fig.add_annotation(
-            x=month_cols[-1],
-            y=sel_idx,
-            text=f"เลือก: {selected_province}",
-            showarrow=True, arrowhead=2, ax=40, ay=0,
-            bgcolor="rgba(255,255,255,.95)", bordercolor="#111", borderwidth=1
-        )
-
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"heat_{key_prefix}")
-
-def render_channel_cumulative_ytd(
-    df2: pd.DataFrame,
-    month_cols: List[str],
-    selected_month: str,
-    plotly_template: str = "plotly_white",
-    key_prefix: str = "cumch",
-):
-    """กราฟเส้นสะสม (YTD) ของช่องทาง — คำนวณตั้งแต่ต้นปีงบจนถึงเดือนที่เลือก"""
-    st.subheader("Channel YTD (สะสมจนถึงเดือนที่เลือก)")
-
-    month_key = selected_month.split(" ")[0]
-    idx_match = next((i for i in df2.index if str(i).startswith(month_key)), None)
-    if idx_match is None:
-        st.info("ไม่พบเดือนที่เลือกในตารางช่องทาง", icon="ℹ️")
-        return
-    pos = df2.index.tolist().index(idx_match)
-    d2 = df2.iloc[: pos + 1].copy()
-
-    cum = d2.cumsum()
-    cum["เดือน"] = d2.index
-    long_df = cum.reset_index(drop=True).melt(id_vars="เดือน", var_name="ช่องทาง", value_name="สะสมบาท")
-
-    fig = px.line(
-        long_df, x="เดือน", y="สะสมบาท", color="ช่องทาง",
-        template=plotly_template
-    )
-    fig.update_traces(mode="lines+markers", hovertemplate="%{x}<br>%{y:,.0f} บาท")
-    fig.update_layout(
-        margin=dict(l=10, r=10, t=40, b=10),
-        yaxis_title="ยอดสะสม (บาท)",
-        xaxis_title="เดือน",
-        title=dict(text=f"ยอดสะสม YTD ตามช่องทาง — ถึง {selected_month}", font=dict(size=20)),
-        xaxis=dict(tickangle=-30, tickfont=dict(size=12)),
-        yaxis=dict(tickfont=dict(size=12)),
-        legend=dict(font=dict(size=12)),
-        height=420
-    )
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"cumch_{key_prefix}")
+# components/charts.py
+# -*- coding: utf-8 -*-
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import numpy as np
+from plotly.subplots import make_subplots
+
+from utils.cube import SalesCube, SALES, MOM, SUB_SALES
+from utils.figcache import cached_figure
+from utils.fragments import set_state, view_fragment
+from utils.chart_data import RANGE_SEP, TIME_RANGE_MONTHS, custom_range, ranked_bar, wide_traces, window_rows
+from utils.formatters import fmt_baht, pct_labels
+from utils.frames import long_frame
+from utils.money import to_baht
+from utils.profiler import profiled
+from utils.widgets import bind, bind_default, widget_key
+
+# ------------------------------
+# Controls (ช่วงเวลา / ชนิดกราฟ)
+# ------------------------------
+CUSTOM_RANGE = "กำหนดเอง"
+
+@profiled("time_controls")
+def render_time_kind_controls(prefix="main", months=()):
+    """prefix = ชื่อ fragment ที่ตัวคุมชุดนี้อยู่ (ใช้ตัดสินว่าต้อง rerun ทั้งแอปหรือไม่)
+    months = เดือนที่เลือกเป็นช่วงกำหนดเองได้ (ว่าง = มีแค่ช่วงสำเร็จรูป)"""
+    if "time_range" not in st.session_state:
+        st.session_state.time_range = "ALL"
+    if "bar_kind" not in st.session_state:
+        st.session_state.bar_kind = "Stacked"
+
+    months = list(months)
+    presets = ["ALL", *TIME_RANGE_MONTHS] + ([CUSTOM_RANGE] if len(months) > 1 else [])
+    current = st.session_state.time_range
+    if RANGE_SEP in current:
+        current = CUSTOM_RANGE
+    if current not in presets:
+        current = "ALL"
+
+    c1, c2 = st.columns([1, 1], gap="small")
+    with c1:
+        st.caption("ช่วงเวลา")
+        key = widget_key(prefix, "time_range_slider")
+        bind(key, current)
+        preset = st.select_slider(
+            label="",
+            options=presets,
+            key=key,
+        )
+        if preset != CUSTOM_RANGE:
+            set_state("time_range", preset, origin=prefix)
+        else:
+            start, end = months[0], months[-1]
+            if RANGE_SEP in st.session_state.time_range:
+                a, b = st.session_state.time_range.split(RANGE_SEP, 1)
+                if a in months and b in months:
+                    start, end = a, b
+            key = widget_key(prefix, "month_range_slider")
+            bind_default(key, (start, end))
+            start, end = st.select_slider(
+                label="ช่วงเดือน",
+                options=months,
+                value=(start, end),   # บอกว่าเป็นแบบช่วง (ไม่ใช้ bind: ดู utils/widgets.py)
+                key=key,
+                label_visibility="collapsed",
+            )
+            set_state("time_range", custom_range(start, end), origin=prefix)
+    with c2:
+        st.caption("ชนิดกราฟ")
+        key = widget_key(prefix, "bar_kind_slider")
+        bind(key, st.session_state.bar_kind)
+        set_state("bar_kind", st.select_slider(
+            label="",
+            options=["Stacked", "Clustered"],
+            key=key,
+        ), origin=prefix)
+
+# ------------------------------
+# กราฟหลักแถวแรก (ปรับตามจังหวัด)
+# ------------------------------
+@cached_figure("channel_mix")
+def build_channel_mix_figure(cube: SalesCube, *, province: str, time_range: str, bar_kind: str, template: str):
+    ch = cube.channels
+    barmode = "stack" if bar_kind == "Stacked" else "group"
+
+    # เตรียมข้อมูลกราฟแท่ง (ช่องทางระดับประเทศ) — slice ช่วงที่เลือกจาก sub-cube
+    tail = window_rows(ch.time, time_range)
+    months_tail = list(ch.months[tail])
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    # Bars ต่อช่องทาง (ป้ายของทั้งเมทริกซ์สร้างครั้งเดียว)
+    for trace in wide_traces(months_tail, ch.values[tail, :, SUB_SALES], ch.columns):
+        fig.add_trace(go.Bar(**trace, textposition="outside"), secondary_y=False)
+    # เส้นจังหวัด (secondary axis)
+    ser = cube.series(province) if province != "ภาพรวม" else None
+    if ser is not None:
+        pos = [i for i in map(cube.time.index, months_tail) if i is not None]
+        fig.add_trace(
+            go.Scatter(
+                x=[cube.months[i] for i in pos],
+                y=ser[pos].tolist(),
+                mode="lines+markers",
+                name=f"แนวโน้มจังหวัด: {province}",
+                line=dict(width=4, color="#111827"),
+                marker=dict(size=8),
+                hovertemplate="%{x}<br>%{y:,.0f} บาท",
+            ),
+            secondary_y=True,
+        )
+    fig.update_layout(
+        barmode=barmode,
+        template=template,
+        margin=dict(l=0, r=0, b=0, t=10),
+        legend_title_text="",
+        xaxis=dict(tickangle=-30),
+    )
+    fig.update_yaxes(title_text="บาท (฿) — ช่องทางระดับประเทศ", secondary_y=False)
+    fig.update_yaxes(title_text="บาท (฿) — จังหวัดที่เลือก", secondary_y=True)
+    return fig
+
+@cached_figure("top20")
+def build_top20_figure(cube: SalesCube, *, month: str, template: str):
+    m = cube.month_index(month)
+    top20 = cube.order_desc[m, :20][::-1]
+    monthly_data = pd.DataFrame({
+        "จังหวัด": [cube.provinces[i] for i in top20],
+        month: cube.values[top20, m, SALES],
+    })
+    bar = px.bar(
+        monthly_data,
+        x=month, y="จังหวัด", orientation="h",
+        template=template, labels={"จังหวัด": "", month: "ยอดขาย (บาท)"},
+        height=600
+    )
+    bar.update_layout(yaxis={'categoryorder': 'total ascending'}, margin=dict(l=0, r=0, b=0, t=10))
+    return bar
+
+@profiled("main_row")
+def render_main_row_charts(
+    cube: SalesCube,
+    selected_month: str,
+    selected_province: str,
+    plotly_template: str = "plotly_white",
+    key_prefix: str = "main",
+):
+    left, right = st.columns([3, 2], gap="large")
+
+    # ---------- ซ้าย: ช่องทาง + เส้นจังหวัด ----------
+    with left:
+        st.subheader("โครงสร้างช่องทางตามช่วงเวลา")
+        fig = build_channel_mix_figure(
+            cube,
+            province=selected_province,
+            time_range=st.session_state.get("time_range", "ALL"),
+            bar_kind=st.session_state.get("bar_kind", "Stacked"),
+            template=plotly_template,
+        )
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"main_mix_{key_prefix}")
+        st.caption(range_summary(cube, st.session_state.get("time_range", "ALL")))
+
+    # ---------- ขวา: Top 20 จังหวัดของเดือน ----------
+    with right:
+        st.subheader(f"20 จังหวัดยอดขายสูงสุด ({selected_month})")
+        bar = build_top20_figure(cube, month=selected_month, template=plotly_template)
+        st.plotly_chart(bar, use_container_width=True, config={"displayModeBar": False}, key=f"top20_{key_prefix}")
+
+def range_summary(cube: SalesCube, time_range: str) -> str:
+    """ยอดรวม / เฉลี่ยต่อเดือน / การเติบโตเทียบช่วงก่อน ของทุกช่องทางในช่วงที่เลือก (O(1) จาก prefix sum)"""
+    ch = cube.channels
+    w = window_rows(ch.time, time_range)
+    n = w.stop - w.start
+    if n <= 0:
+        return ""
+    total = int(ch.sums.total(w.start, w.stop).sum())      # สตางค์
+    text = (f"{ch.months[w.start]} – {ch.months[w.stop - 1]}: "
+            f"รวม {fmt_baht(to_baht(total))} • เฉลี่ย {fmt_baht(to_baht(total) / n)}/เดือน")
+    if w.start - n >= 0:
+        prev = int(ch.sums.total(w.start - n, w.start).sum())
+        if prev:
+            text += f" • เทียบ {n} เดือนก่อนหน้า {(total - prev) / prev * 100:+.2f}%"
+    return text
+
+# ------------------------------
+# Revenue Sources (เดือนเดียว)
+# ------------------------------
+@cached_figure("revenue_pie")
+def build_revenue_pie(cube: SalesCube, *, month: str, template: str):
+    s = cube.channels.row(month)
+    fig = px.pie(values=s, names=list(cube.channels.columns), hole=.45, template=template)
+    fig.update_layout(margin=dict(l=0, r=0, b=0, t=0), legend_title_text="")
+    return fig
+
+@profiled("revenue_sources")
+def render_revenue_sources(cube: SalesCube, selected_month: str, plotly_template: str = "plotly_white", key_prefix: str = "revsrc"):
+    st.markdown("#### Revenue Sources (เดือนเดียว)")
+    if cube.channels.row_index(selected_month) is None:
+        st.info("ไม่พบข้อมูลสำหรับเดือนนี้", icon="ℹ️")
+        return
+    fig = build_revenue_pie(cube, month=selected_month, template=plotly_template)
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"pie_{key_prefix}")
+
+# ------------------------------
+# ฝังหน้าเว็บ CDD (ไม่รองรับ key ใน iframe)
+# ------------------------------
+@view_fragment("cdd")
+@profiled("cdd_embeds")
+def render_cdd_sources_embeds(key_prefix: str = "cdd"):
+    st.markdown("#### แหล่งข้อมูลที่ใช้สร้าง Dashboard (ฝังจาก CDD)")
+    url_map = {
+        "otop_r06": "https://logi.cdd.go.th/otop/cdd_report/otop_r06.php?year=2567",
+        "otop_r05": "https://logi.cdd.go.th/otop/cdd_report/otop_r05.php?year=2567",
+        "otop_r04": "https://logi.cdd.go.th/otop/cdd_report/otop_r04.php?year=2567&org_group=0",
+    }
+    key = st.selectbox(
+        "เลือกหน้า",
+        options=list(url_map.keys()),
+        format_func=lambda k: k.upper(),
+        key=f"cdd_select_{key_prefix}",
+    )
+    st.components.v1.iframe(url_map[key], height=420, scrolling=True)
+
+# ======================================================
+# Regional Growth Trend & Product Category Charts
+# ======================================================
+
+@cached_figure("regional")
+def build_regional_figure(cube: SalesCube, *, month: str, province: str, variant: str, template: str):
+    """variant = ชื่อแบบการแบ่งภาค (data/hierarchies.json)"""
+    roll = cube.rollup(variant)
+    # เดือนปัจจุบัน
+    month_cols = list(cube.months)
+    m_idx = cube.month_index(month)
+    month_now = month_cols[m_idx]
+    mom = np.nan_to_num(roll.mom[:, m_idx], nan=0.0)
+
+    # ผู้ชนะ MoM
+    top_r = int(np.argmax(mom))
+    top_region = roll.regions[top_r]
+    # ภูมิภาคของจังหวัดที่เลือก
+    sel_region = roll.hierarchy.group_of(province) if province != "ภาพรวม" else ""
+
+    fig = go.Figure()
+    palette = {
+        "ภาคเหนือ": "#636EFA", "ภาคตะวันออกเฉียงเหนือ": "#EF553B", "ภาคกลาง": "#00CC96",
+        "ภาคตะวันออก": "#AB63FA", "ภาคตะวันตก": "#FFA15A", "ภาคใต้": "#19D3F3",
+    }
+    for r, region in enumerate(roll.regions):
+        y = to_baht(roll.sales[r])
+        # เน้นเส้น: ชนะ MoM = หนา / ภูมิภาคของจังหวัดที่เลือก = หนาที่สุด
+        if sel_region and region == sel_region:
+            line_w, marker_s, line_color = 5, 9, "#111827"
+        elif region == top_region:
+            line_w, marker_s, line_color = 4, 8, palette.get(region)
+        else:
+            line_w, marker_s, line_color = 2, 5, palette.get(region)
+        fig.add_trace(go.Scatter(
+            x=month_cols, y=y, mode="lines+markers", name=region,
+            line=dict(width=line_w, color=line_color),
+            marker=dict(size=marker_s)
+        ))
+
+    # Annotation
+    y_top = to_baht(roll.sales[top_r, m_idx])
+    fig.add_annotation(
+        x=month_now, y=y_top, text=f"แชมป์ MoM: {top_region} (+{mom[top_r]:.2f}%)",
+        showarrow=True, arrowhead=2, ax=30, ay=-40, bgcolor="rgba(255,255,255,.9)",
+        bordercolor="#111", borderwidth=1
+    )
+    if sel_region:
+        y_sel = to_baht(roll.sales[roll.hierarchy.group_pos[sel_region], m_idx])
+        fig.add_annotation(
+            x=month_now, y=y_sel, text=f"จังหวัดที่เลือกอยู่ใน: {sel_region}",
+            showarrow=True, arrowhead=2, ax=-40, ay=-10, bgcolor="rgba(255,255,255,.9)",
+            bordercolor="#111", borderwidth=1
+        )
+
+    fig.update_layout(
+        template=template, margin=dict(l=10, r=10, t=40, b=10),
+        yaxis_title="ยอดขาย (บาท)", xaxis_title="เดือน",
+        legend_title_text="", height=420,
+        title=dict(text="แนวโน้มยอดขายรายภูมิภาค (ไฮไลต์จังหวัดที่เลือก)", font=dict(size=20)),
+        xaxis=dict(tickangle=-30, tickfont=dict(size=12)),
+        yaxis=dict(tickfont=dict(size=12)),
+        legend=dict(font=dict(size=12))
+    )
+    fig.update_traces(hovertemplate="%{x}<br>%{y:,.0f} บาท")
+    return fig
+
+@view_fragment("regional")
+@profiled("regional")
+def render_regional_growth(
+    cube: SalesCube,
+    selected_month: str,
+    selected_province: str = "ภาพรวม",
+    plotly_template: str = "plotly_white",
+    key_prefix: str = "regional",
+):
+    st.subheader("การเติบโตยอดขายตามภูมิภาค (Regional Growth)")
+    scheme = cube.default_scheme
+    if len(cube.region_schemes) > 1:
+        scheme = st.radio(
+            "การแบ่งภาค",
+            options=list(cube.region_schemes),
+            format_func=lambda k: cube.region_schemes[k].hierarchy.label,
+            horizontal=True,
+            key=f"region_scheme_{key_prefix}",
+        )
+    if not cube.rollup(scheme).regions:
+        st.info("ไม่มีข้อมูลภูมิภาคเพียงพอ", icon="ℹ️")
+        return
+    fig = build_regional_figure(cube, month=selected_month, province=selected_province,
+                                variant=scheme, template=plotly_template)
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"regional_{key_prefix}")
+
+@cached_figure("product_category")
+def build_product_category_figure(cube: SalesCube, *, month: str, variant: str, template: str):
+    """variant = "national" เมื่อเลือกจังหวัด (ข้อมูลหมวดสินค้ามีแค่ระดับประเทศ)"""
+    title_suffix = f" — {month} (ภาพรวมประเทศ)" if variant == "national" else f" — {month}"
+    prod = cube.products
+    row = prod.row_index(month)
+    bars = ranked_bar(prod.values[row, :, SUB_SALES], prod.columns, prod.order_asc[row])
+    values, names = bars["values"], bars["names"]
+    top_name = names[-1]
+    top_val = values[-1]
+
+    colors = ["#D1D5DB"] * len(values)
+    colors[-1] = "#2563EB"
+
+    fig = go.Figure(go.Bar(
+        x=values, y=names, orientation="h",
+        marker=dict(color=colors),
+        text=bars["text"],
+        textposition="outside",
+    ))
+    fig.update_layout(
+        template=template, margin=dict(l=10, r=10, t=40, b=10),
+        xaxis_title="ยอดขาย (บาท)", yaxis_title="",
+        height=420,
+        title=dict(text=f"Top ประเภทสินค้า OTOP ขายดี{title_suffix}", font=dict(size=20)),
+        xaxis=dict(tickfont=dict(size=12)), yaxis=dict(tickfont=dict(size=12)),
+    )
+    fig.add_annotation(
+        x=top_val, y=top_name, text=f"แชมป์: {top_name} (฿{top_val:,.0f})",
+        showarrow=True, arrowhead=2, ax=40, ay=-10,
+        bgcolor="rgba(255,255,255,.9)", bordercolor="#111", borderwidth=1
+    )
+    return fig
+
+@profiled("product_category")
+def render_product_category_performance(
+    cube: SalesCube,
+    selected_month: str,
+    selected_province: str = "ภาพรวม",
+    plotly_template: str = "plotly_white",
+    key_prefix: str = "prodcat",
+):
+    # แจ้งว่าข้อมูลหมวดสินค้าระดับจังหวัดยังไม่มี
+    variant = ""
+    if selected_province and selected_province != "ภาพรวม":
+        st.info(f"ยังไม่มีข้อมูลสัดส่วนหมวดสินค้าแยกตามจังหวัด • แสดงภาพรวมทั้งประเทศแทน ({selected_month})", icon="ℹ️")
+        variant = "national"
+
+    # หาเดือนใน sub-cube ประเภทสินค้า
+    if cube.products.row_index(selected_month) is None:
+        st.info("ไม่พบข้อมูลประเภทสินค้าสำหรับเดือนนี้", icon="ℹ️")
+        return
+    fig = build_product_category_figure(cube, month=selected_month, variant=variant, template=plotly_template)
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"prodcat_{key_prefix}")
+
+# ================================
+# NEW 4 CHARTS (responsive to month & province)
+# ================================
+@cached_figure("province_vs_avg")
+def build_province_vs_avg_figure(cube: SalesCube, *, province: str, template: str):
+    month_cols = list(cube.months)
+    nat_avg = cube.national_mean
+
+    fig = go.Figure()
+
+    # เส้นค่าเฉลี่ยประเทศ
+    fig.add_trace(
+        go.Scatter(
+            x=month_cols,
+            y=nat_avg,
+            mode="lines+markers",
+            name="ค่าเฉลี่ยทั้งประเทศ",
+            line=dict(width=3, dash="dash", color="#7C3AED"),
+            marker=dict(size=6),
+            hovertemplate="%{x}<br>%{y:,.0f} บาท",
+        )
+    )
+
+    # เส้นจังหวัด
+    y = cube.series(province) if province != "ภาพรวม" else None
+    if y is not None:
+        fig.add_trace(
+            go.Scatter(
+                x=month_cols,
+                y=y,
+                mode="lines+markers",
+                name=f"{province}",
+                line=dict(width=5, color="#111827"),
+                marker=dict(size=8),
+                hovertemplate="%{x}<br>%{y:,.0f} บาท",
+            )
+        )
+    else:
+        fig.add_annotation(
+            x=month_cols[-1], y=nat_avg[-1],
+            text="เลือกจังหวัดทางซ้ายเพื่อเทียบแนวโน้ม",
+            showarrow=True, arrowhead=2, ax=-40, ay=-40,
+            bgcolor="rgba(255,255,255,.9)", bordercolor="#111", borderwidth=1
+        )
+
+    fig.update_layout(
+        template=template,
+        margin=dict(l=10, r=10, t=40, b=10),
+        yaxis_title="ยอดขาย (บาท)", xaxis_title="เดือน",
+        legend_title_text="",
+        height=420,
+        title=dict(text="Province vs National Average (Trend)", font=dict(size=20)),
+        xaxis=dict(tickangle=-30, tickfont=dict(size=12)),
+        yaxis=dict(tickfont=dict(size=12)),
+        legend=dict(font=dict(size=12)),
+    )
+    return fig
+
+@profiled("province_vs_avg")
+def render_province_vs_avg_trend(
+    cube: SalesCube,
+    selected_province: str,
+    plotly_template: str = "plotly_white",
+    key_prefix: str = "pvsavg",
+):
+    """แนวโน้มจังหวัดที่เลือก เทียบค่าเฉลี่ยประเทศ (เส้นใหญ่/ไฮไลต์ชัดเจน)"""
+    st.subheader("แนวโน้มจังหวัดที่เลือกเทียบค่าเฉลี่ยประเทศ")
+    fig = build_province_vs_avg_figure(cube, province=selected_province, template=plotly_template)
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"pvsavg_{key_prefix}")
+
+@cached_figure("mom_by_province")
+def build_mom_by_province_figure(cube: SalesCube, *, month: str, province: str, template: str):
+    m_idx = cube.month_index(month)
+    order = cube.mom_order_asc[m_idx]
+    bars = ranked_bar(np.nan_to_num(cube.values[:, m_idx, MOM], nan=0.0), cube.provinces, order, labels=pct_labels)
+    mom_pct, provs = bars["values"], bars["names"]
+
+    colors = np.where(mom_pct >= 0, "#60A5FA", "#F87171").astype(object)
+    sel = cube.province_index(province) if province != "ภาพรวม" else None
+    if sel is not None:
+        colors[order == sel] = "#111827"  # ไฮไลต์จังหวัดที่เลือก
+
+    fig = go.Figure(go.Bar(
+        x=mom_pct,
+        y=provs,
+        orientation="h",
+        marker=dict(color=colors.tolist()),
+        text=bars["text"],
+        textposition="outside",
+    ))
+    fig.update_layout(
+        template=template,
+        margin=dict(l=10, r=10, t=40, b=10),
+        xaxis_title="เปอร์เซ็นต์เปลี่ยนแปลง MoM (%)",
+        yaxis_title="",
+        height=600,
+        title=dict(text=f"MoM Change by Province — {month}", font=dict(size=20)),
+        xaxis=dict(tickfont=dict(size=12)), yaxis=dict(tickfont=dict(size=12)),
+    )
+    return fig
+
+@profiled("mom_by_province")
+def render_mom_change_by_province(
+    cube: SalesCube,
+    selected_month: str,
+    selected_province: str,
+    plotly_template: str = "plotly_white",
+    key_prefix: str = "momprov",
+):
+    """การเปลี่ยนแปลง MoM ตามจังหวัดสำหรับเดือนที่เลือก (ไฮไลต์จังหวัดที่เลือก)"""
+    st.subheader("การเปลี่ยนแปลง MoM ตามจังหวัด (เดือนที่เลือก)")
+    fig = build_mom_by_province_figure(cube, month=selected_month, province=selected_province, template=plotly_template)
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"momprov_{key_prefix}")
+
+@cached_figure("heatmap")
+def build_heatmap_figure(cube: SalesCube, *, month: str, province: str, template: str):
+    month_cols = list(cube.months)
+    top_idx = cube.order_desc[cube.month_pos[month], :15]
+    top15 = [cube.provinces[i] for i in top_idx]
+    sub = cube.values[top_idx, :, SALES]
+
+    fig = px.imshow(
+        sub,
+        x=month_cols,
+        y=top15,
+        labels=dict(color="ยอดขาย (บาท)"),
+        color_continuous_scale="YlGnBu",
+        aspect="auto",
+    )
+    fig.update_layout(
+        template=template,
+        margin=dict(l=10, r=10, t=40, b=10),
+        height=520,
+        title=dict(text=f"Heatmap — Top 15 จังหวัด (อิง {month})", font=dict(size=20)),
+        xaxis=dict(tickangle=-30),
+        coloraxis_colorbar=dict(title="บาท"),
+    )
+
+    if province and province in top15:
+        sel_idx = top15.index(province)
+        fig.add_annotation(
+            x=month_cols[-1],
+            y=sel_idx,
+            text=f"เลือก: {province}",
+            showarrow=True, arrowhead=2, ax=40, ay=0,
+            bgcolor="rgba(255,255,255,.95)", bordercolor="#111", borderwidth=1
+        )
+    return fig
+
+@profiled("heatmap")
+def render_monthly_heatmap_selected(
+    cube: SalesCube,
+    selected_month: str,
+    selected_province: str,
+    plotly_template: str = "plotly_white",
+    key_prefix: str = "heat",
+):
+    """Heatmap: Top 15 จังหวัด (ตามยอดของเดือนที่เลือก) x ทุกเดือน — ไฟอ่านชัดเจน"""
+    st.subheader("Heatmap จังหวัดยอดนิยม (Top 15) ตามเดือน")
+
+    if selected_month not in cube.month_pos:
+        st.info("ไม่พบข้อมูลเดือนที่เลือกใน df1", icon="ℹ️")
+        return
+    fig = build_heatmap_figure(cube, month=selected_month, province=selected_province, template=plotly_template)
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"heat_{key_prefix}")
+
+@cached_figure("channel_ytd")
+def build_channel_ytd_figure(cube: SalesCube, *, month: str, template: str):
+    ch = cube.channels
+    fy = ch.time.fiscal_year_slice(ch.row_index(month))
+    cum = to_baht(ch.sums.running(fy.start, fy.stop))
+    # บาทสำหรับแสดงผล คง float64 (float32 ปัดยอดหลักพันล้านจนป้าย ,.0f เพี้ยน)
+    long_df = long_frame(cum, ch.months[fy], ch.columns, "เดือน", "ช่องทาง", "สะสมบาท",
+                         ordered_rows=True, measure=np.asarray)
+
+    fig = px.line(
+        long_df, x="เดือน", y="สะสมบาท", color="ช่องทาง",
+        template=template
+    )
+    fig.update_traces(mode="lines+markers", hovertemplate="%{x}<br>%{y:,.0f} บาท")
+    fig.update_layout(
+        margin=dict(l=10, r=10, t=40, b=10),
+        yaxis_title="ยอดสะสม (บาท)",
+        xaxis_title="เดือน",
+        title=dict(text=f"ยอดสะสม YTD ตามช่องทาง — ถึง {month}", font=dict(size=20)),
+        xaxis=dict(tickangle=-30, tickfont=dict(size=12)),
+        yaxis=dict(tickfont=dict(size=12)),
+        legend=dict(font=dict(size=12)),
+        height=420
+    )
+    return fig
+
+@profiled("channel_ytd")
+def render_channel_cumulative_ytd(
+    cube: SalesCube,
+    selected_month: str,
+    plotly_template: str = "plotly_white",
+    key_prefix: str = "cumch",
+):
+    """กราฟเส้นสะสม (YTD) ของช่องทาง — คำนวณตั้งแต่ต้นปีงบจนถึงเดือนที่เลือก"""
+    st.subheader("Channel YTD (สะสมจนถึงเดือนที่เลือก)")
+
+    if cube.channels.row_index(selected_month) is None:
+        st.info("ไม่พบเดือนที่เลือกในตารางช่องทาง", icon="ℹ️")
+        return
+    fig = build_channel_ytd_figure(cube, month=selected_month, template=plotly_template)
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key=f"cumch_{key_prefix}")
+
+# ======================================================
+# Warm-up (utils/warmup.py) — เรียก builder ชุดเดียวกับที่ render_* ใช้
+# ======================================================
+def warm_views(
+    cube: SalesCube,
+    selected_month: str,
+    selected_province: str,
+    plotly_template: str = "plotly_white",
+    time_range: str = "ALL",
+    bar_kind: str = "Stacked",
+) -> int:
+    """สร้างรูปกราฟทุกตัวของ (เดือน, จังหวัด) นี้ลงแคช คืนจำนวนรูป (เงื่อนไขเดียวกับ render_*)"""
+    n = 0
+    build_channel_mix_figure(cube, province=selected_province, time_range=time_range,
+                             bar_kind=bar_kind, template=plotly_template)
+    build_top20_figure(cube, month=selected_month, template=plotly_template)
+    n += 2
+    if cube.channels.row_index(selected_month) is not None:
+        build_revenue_pie(cube, month=selected_month, template=plotly_template)
+        build_channel_ytd_figure(cube, month=selected_month, template=plotly_template)
+        n += 2
+    if cube.regions:
+        build_regional_figure(cube, month=selected_month, province=selected_province,
+                              variant=cube.default_scheme, template=plotly_template)
+        n += 1
+    if cube.products.row_index(selected_month) is not None:
+        variant = "national" if selected_province and selected_province != "ภาพรวม" else ""
+        build_product_category_figure(cube, month=selected_month, variant=variant, template=plotly_template)
+        n += 1
+    build_province_vs_avg_figure(cube, province=selected_province, template=plotly_template)
+    build_mom_by_province_figure(cube, month=selected_month, province=selected_province, template=plotly_template)
+    n += 2
+    if selected_month in cube.month_pos:
+        build_heatmap_figure(cube, month=selected_month, province=selected_province, template=plotly_template)
+        n += 1
+    return n
+
+def warm_figure_count(cube: SalesCube, views_per_month: int) -> int:
+    """
+    จำนวนรูปไม่ซ้ำ (key ในแคช) สูงสุดเมื่ออุ่นครบทุก view ของทุกเดือน — ต้องตรงกับ warm_views + warm_map
+    ต่อ (เดือน, จังหวัด): regional / MoM / heatmap, ต่อเดือน: top20 / pie / YTD / สินค้า 2 แบบ / แผนที่,
+    ต่อจังหวัด: channel mix / เทียบค่าเฉลี่ย
+    """
+    months = len(cube.months)
+    per_view = 2 + int(bool(cube.regions))
+    return months * views_per_month * per_view + months * 6 + views_per_month * 2
@@ -0,0 +1,37 @@
+# components/diagnostics.py
+# -*- coding: utf-8 -*-
+import pandas as pd
+import streamlit as st
+
+from utils.figcache import FIGURE_CACHE
+from utils.profiler import PROFILE_STATS, last_records
+
+
+def render_diagnostics_panel() -> None:
+    """แผงวินิจฉัยใน sidebar (OTOP_DIAGNOSTICS=1): เวลาต่อคอมโพเนนต์ของ session นี้ + p50/p95 ทุก session
+    "rerun" = ทั้งหน้าของรอบก่อนหน้า (รอบนี้ยังไม่จบตอนวาดแผง); fragment ที่ rerun เดี่ยว ๆ อัปเดตแถวของตัวเอง"""
+    with st.sidebar.expander("🩺 Diagnostics", expanded=False):
+        last = last_records()
+        if not last:
+            st.caption("ยังไม่มีข้อมูลโปรไฟล์ (OTOP_PROFILE=0 ?)")
+            return
+        summary = PROFILE_STATS.summary()
+        rows = []
+        for name, r in sorted(last.items(), key=lambda kv: -kv[1]["total_ms"]):
+            s = summary.get(name, {})
+            rows.append({
+                "คอมโพเนนต์": name,
+                "ms": r["total_ms"],
+                "build ms": r["build_ms"],
+                "KB": r["payload_bytes"] / 1024,
+                "cache": r["cache"],
+                "p50": s.get("p50_ms"),
+                "p95": s.get("p95_ms"),
+                "n": s.get("n"),
+            })
+        st.dataframe(pd.DataFrame(rows).round(1), hide_index=True, use_container_width=True)
+
+        fc = FIGURE_CACHE.stats()
+        st.caption(
+            f"แคชรูป {fc['entries']:,}/{fc['max_entries']:,} รูป • hit {fc['hit_rate']:.0%} • ไล่ออก {fc['evictions']:,}"
+        )
@@ -0,0 +1,94 @@
+# components/drilldown.py
+# -*- coding: utf-8 -*-
+from typing import Callable
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from components.mapbox import DISTRICT_ZOOM, geo_variant, build_district_map_figure
+from utils.chart_data import ranked_bar
+from utils.cube import SalesCube, SubCube, SUB_SALES
+from utils.figcache import cached_figure
+from utils.fragments import view_fragment
+from utils.formatters import fmt_baht
+from utils.geo import level_for_zoom
+from utils.money import to_baht
+from utils.profiler import profiled
+
+ALL_REGIONS = "ทุกภาค"
+
+# ------------------------------
+# Drill-down: ภาค -> จังหวัด -> อำเภอ
+# ------------------------------
+@cached_figure("district_bar")
+def build_district_bar_figure(cube: SalesCube, *, month: str, province: str, template: str, _districts: SubCube):
+    row = _districts.row_index(month)
+    bars = ranked_bar(_districts.values[row, :, SUB_SALES], _districts.columns, _districts.order_asc[row])
+    fig = go.Figure(go.Bar(
+        x=bars["values"], y=bars["names"], orientation="h",
+        marker=dict(color="#2563EB"),
+        text=bars["text"], textposition="outside",
+        hovertemplate="%{y}<br>%{x:,.0f} บาท<extra></extra>",
+    ))
+    fig.update_layout(
+        template=template, margin=dict(l=10, r=10, t=40, b=10),
+        xaxis_title="ยอดขาย (บาท)", yaxis_title="",
+        height=max(320, 22 * len(bars["names"]) + 80),
+        title=dict(text=f"ยอดขายรายอำเภอ — {province} ({month})", font=dict(size=18)),
+    )
+    return fig
+
+@view_fragment("drilldown")
+@profiled("drilldown")
+def render_district_drilldown(
+    cube: SalesCube,
+    fiscal_year: int,
+    selected_month: str,
+    selected_province: str,
+    load_districts: Callable,
+    load_district_geojson: Callable,
+    plotly_template: str = "plotly_white",
+):
+    """เลือกภาค -> จังหวัด (ค่าเริ่มต้นตามจังหวัดใน sidebar) -> ยอดรายอำเภอ; โหลดเฉพาะจังหวัดที่เลือก"""
+    st.subheader("เจาะลึกรายอำเภอ")
+    hierarchy = cube.rollup().hierarchy
+    regions = [ALL_REGIONS] + list(hierarchy.groups)
+
+    # เปลี่ยนจังหวัดใน sidebar -> ตัวเลือก drill-down ตามไปที่จังหวัดนั้น (เลือกเองภายหลังได้ตามปกติ)
+    if st.session_state.get("drill_synced") != selected_province:
+        st.session_state.drill_synced = selected_province
+        if selected_province in cube.province_pos:
+            st.session_state.drill_region = hierarchy.group_of(selected_province) or ALL_REGIONS
+            st.session_state.drill_province = selected_province
+
+    c_region, c_province = st.columns(2)
+    with c_region:
+        region = st.selectbox("ภาค", options=regions, key="drill_region")
+    provinces = list(cube.provinces) if region == ALL_REGIONS else list(hierarchy.members(region))
+    if st.session_state.get("drill_province") not in provinces:
+        st.session_state.drill_province = provinces[0] if provinces else None
+    with c_province:
+        province = st.selectbox("จังหวัด", options=provinces, key="drill_province")
+
+    districts = load_districts(fiscal_year, province) if province else None
+    if districts is None or districts.row_index(selected_month) is None:
+        st.info(f"ยังไม่มีข้อมูลยอดขายรายอำเภอของ {province} สำหรับเดือนนี้", icon="ℹ️")
+        return
+
+    eng = cube.province_eng[cube.province_pos[province]] if province in cube.province_pos else None
+    geojson = load_district_geojson(eng, level_for_zoom(DISTRICT_ZOOM)) if eng else None
+
+    c_map, c_bar = st.columns([3, 2], gap="large")
+    with c_map:
+        if geojson is not None:
+            fig = build_district_map_figure(cube, month=selected_month, province=province,
+                                            variant=geo_variant(geojson), _districts=districts, _geojson=geojson)
+            st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key="district_map")
+        else:
+            st.info("ไม่มีขอบเขตอำเภอของจังหวัดนี้ (สร้างด้วย python -m utils.geo --districts ...)", icon="ℹ️")
+    with c_bar:
+        fig = build_district_bar_figure(cube, month=selected_month, province=province,
+                                        template=plotly_template, _districts=districts)
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key="district_bar")
+        total = to_baht(districts.month_totals[districts.row_index(selected_month)])
+        st.caption(f"รวม {len(districts.columns):,} อำเภอ • {fmt_baht(total)}")
@@ -1,33 +1,142 @@
-# components/mapbox.py
-# -*- coding: utf-8 -*-
-import streamlit as st
-import plotly.express as px
-
-def render_thailand_map(
-    df1,
-    df1_melted,
-    thailand_geojson,          # <- เปลี่ยนชื่อพารามิเตอร์ให้ตรงกับ app.py
-    selected_month,
-    mapbox_style="carto-positron",
-):
-    st.subheader(f'ยอดขาย OTOP รายจังหวัด ประจำเดือน {selected_month}')
-    _map_df = df1_melted[df1_melted['เดือน'] == selected_month].dropna(subset=['province_eng'])
-
-    if thailand_geojson is not None and not _map_df.empty:
-        fig_map = px.choropleth_mapbox(
-            _map_df,
-            geojson=thailand_geojson,
-            locations='province_eng',
-            featureidkey="properties.name",
-            color='ยอดขาย',
-            color_continuous_scale="Viridis",
-            mapbox_style=mapbox_style,  # ตามสเปก: แผนที่สว่างตลอด
-            center={"lat": 13.736717, "lon": 100.523186},
-            zoom=4.5,
-            opacity=0.6,
-            hover_data={'province_eng': False}
-        )
-        fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
-        st.plotly_chart(fig_map, use_container_width=True, config={"displayModeBar": False}, key="thai_map")
-    else:
-        st.info("ไม่สามารถแสดงแผนที่ได้")
+# components/mapbox.py
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import weakref
+
+import numpy as np
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from utils.cube import SalesCube, SubCube, SUB_SALES
+from utils.figcache import cached_figure
+from utils.profiler import profiled
+from utils.settings import MAP_ENGINE
+
+# zoom เริ่มต้นของแผนที่ (app.py ใช้เลือก level ของ GeoJSON ที่เบาที่สุดที่ยังดูดีที่ zoom นี้)
+MAP_ZOOM = 4.5
+# zoom โดยประมาณเมื่อแสดงจังหวัดเดียวเต็มกรอบ (เลือก level ของขอบเขตอำเภอ)
+DISTRICT_ZOOM = 8.0
+# ความสูงของแผนที่โหมด geo (mapbox ใช้ค่าเริ่มต้นของ Plotly)
+GEO_MAP_HEIGHT = 520
+
+# id ของ GeoJSON ที่แชร์ -> hash ของเนื้อหา (ลบเมื่ออ็อบเจ็กต์ถูกเก็บกวาด — id ที่ถูกใช้ซ้ำจึงไม่ได้ key เก่า)
+_GEO_DIGESTS = {}
+
+def _geo_digest(geojson) -> str:
+    return hashlib.sha1(json.dumps(geojson, separators=(",", ":")).encode("utf-8")).hexdigest()[:16]
+
+def geo_variant(geojson) -> str:
+    """คีย์แคชของ geometry: URL (static) ใช้ได้ตรง ๆ, dict ใช้ hash ของเนื้อหา (คำนวณครั้งเดียวต่ออ็อบเจ็กต์ที่แชร์)"""
+    if isinstance(geojson, str):
+        return geojson
+    key = id(geojson)
+    digest = _GEO_DIGESTS.get(key)
+    if digest is None:
+        digest = _geo_digest(geojson)
+        try:
+            weakref.finalize(geojson, _GEO_DIGESTS.pop, key, None)
+        except TypeError:       # dict ธรรมดา (ไม่ผ่าน freeze_json) อ้าง weakref ไม่ได้ -> ไม่เก็บ
+            return f"geo{digest}"
+        _GEO_DIGESTS[key] = digest
+    return f"geo{digest}"
+
+def _map_frame(cube: SalesCube, selected_month) -> pd.DataFrame:
+    # slice เดือนจากคิวบ์ (แทนการกรอง df1_melted ทุก rerun)
+    return pd.DataFrame({
+        'จังหวัด': cube.provinces,
+        'เดือน': selected_month,
+        'ยอดขาย': cube.month_slice(selected_month),
+        'province_eng': cube.province_eng,
+    }).dropna(subset=['province_eng'])
+
+@cached_figure("thai_map")
+def build_map_figure(cube: SalesCube, *, month, template, variant, _geojson):
+    """template = mapbox style, variant = URL หรือ hash ของ GeoJSON (geo_variant)
+
+    _geojson เป็น URL (static) ได้เหมือนโหมด geo — รูปในแคชไม่ฝัง geometry และเปลี่ยนเดือนไม่ส่ง geometry ซ้ำ
+    """
+    fig_map = px.choropleth_mapbox(
+        _map_frame(cube, month),
+        geojson=_geojson,
+        locations='province_eng',
+        featureidkey="properties.name",
+        color='ยอดขาย',
+        color_continuous_scale="Viridis",
+        mapbox_style=template,  # ตามสเปก: แผนที่สว่างตลอด
+        center={"lat": 13.736717, "lon": 100.523186},
+        zoom=MAP_ZOOM,
+        opacity=0.6,
+        hover_data={'province_eng': False}
+    )
+    fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
+    return fig_map
+
+@cached_figure("thai_map_geo")
+def build_geo_map_figure(cube: SalesCube, *, month, variant, _geojson):
+    """
+    แผนที่แบบไม่ใช้ tile: วาดขอบเขตจังหวัดเป็น shape ล้วน (go.Choropleth + fitbounds) ทำงาน offline ได้
+    _geojson เป็น URL (static) ได้ — browser โหลด geometry ครั้งเดียว เปลี่ยนเดือนส่งแค่ค่า z ของแต่ละจังหวัด
+    uirevision คงที่ -> Plotly.react อัปเดตสี/ค่าโดยไม่รีเซ็ตมุมมองที่ผู้ใช้ซูมไว้
+    """
+    eng = np.array([p or "" for p in cube.province_eng], dtype=object)
+    keep = eng != ""
+    return _geo_choropleth(_geojson, eng[keep], cube.month_slice(month)[keep],
+                           np.asarray(cube.provinces, dtype=object)[keep], uirevision="thai_map")
+
+@cached_figure("district_map")
+def build_district_map_figure(cube: SalesCube, *, month, province, variant, _districts: SubCube, _geojson):
+    """ขอบเขตอำเภอของจังหวัดเดียว (แบบ geo เสมอ: fitbounds ซูมเข้าจังหวัดเอง ไม่ต้องรู้ center/zoom)"""
+    row = _districts.row_index(month)
+    names = np.asarray(_districts.columns, dtype=object)
+    return _geo_choropleth(_geojson, names, _districts.values[row, :, SUB_SALES], names,
+                           uirevision=f"district_map_{province}")
+
+def _geo_choropleth(geojson, locations, z, names, uirevision: str) -> go.Figure:
+    fig = go.Figure(go.Choropleth(
+        geojson=geojson,
+        featureidkey="properties.name",
+        locations=locations,
+        z=z,
+        customdata=names,
+        colorscale="Viridis",
+        colorbar=dict(title="ยอดขาย"),
+        marker_line_color="white",
+        marker_line_width=0.5,
+        hovertemplate="%{customdata}<br>%{z:,.0f} บาท<extra></extra>",
+    ))
+    fig.update_geos(fitbounds="locations", visible=False, projection_type="mercator")
+    fig.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=GEO_MAP_HEIGHT, uirevision=uirevision)
+    return fig
+
+def map_figure(cube: SalesCube, thailand_geojson, selected_month, mapbox_style="carto-positron", engine=MAP_ENGINE):
+    """รูปแผนที่ตาม engine (mapbox = มี tile พื้นหลัง, geo = shape ล้วน) — None ถ้าไม่มีข้อมูล geometry"""
+    if thailand_geojson is None or not any(cube.province_eng):
+        return None
+    variant = geo_variant(thailand_geojson)
+    if engine == "geo":
+        return build_geo_map_figure(cube, month=selected_month, variant=variant, _geojson=thailand_geojson)
+    return build_map_figure(cube, month=selected_month, template=mapbox_style,
+                            variant=variant, _geojson=thailand_geojson)
+
+def warm_map(cube: SalesCube, thailand_geojson, selected_month, mapbox_style="carto-positron") -> int:
+    """สร้างรูปแผนที่ของเดือนนี้ลงแคช (utils/warmup.py) คืนจำนวนรูป"""
+    return int(map_figure(cube, thailand_geojson, selected_month, mapbox_style) is not None)
+
+@profiled("thai_map")
+def render_thailand_map(
+    cube: SalesCube,
+    thailand_geojson,          # URL จาก load_geojson_url (เปิด static serving) หรือ dict จาก load_geojson
+    selected_month,
+    mapbox_style="carto-positron",
+    engine=MAP_ENGINE,
+):
+    st.subheader(f'ยอดขาย OTOP รายจังหวัด ประจำเดือน {selected_month}')
+
+    fig_map = map_figure(cube, thailand_geojson, selected_month, mapbox_style, engine)
+    if fig_map is not None:
+        st.plotly_chart(fig_map, use_container_width=True, config={"displayModeBar": False}, key="thai_map")
+    else:
+        st.info("ไม่สามารถแสดงแผนที่ได้")
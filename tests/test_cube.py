@@ -0,0 +1,69 @@
+# tests/test_cube.py
+# -*- coding: utf-8 -*-
+"""utils/cube.py + utils/data._lead_in: MoM ของเดือนแรกต่อข้ามปีงบ แม้ปีก่อนไม่มีบางจังหวัด"""
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cube import MOM, build_cube
+from utils.data import _lead_in
+from utils.hierarchy import compile_hierarchy
+
+PREV_MONTHS = ["สิงหาคม 2566", "กันยายน 2566"]            # ปีงบ 2566
+MONTHS = ["ตุลาคม 2566", "พฤศจิกายน 2566"]               # ปีงบ 2567
+CHANNELS = ["หน้าร้าน", "ออนไลน์"]
+
+
+def _tables(provinces, months, values) -> Dict[str, pd.DataFrame]:
+    df1 = pd.DataFrame(np.array(values, dtype=np.int64), index=pd.Index(provinces, name="จังหวัด"), columns=months)
+    per_channel = np.repeat(df1.sum(axis=0).to_numpy()[:, None] // 2, len(CHANNELS), axis=1)
+    side = pd.DataFrame(per_channel, index=pd.Index(months, name="เดือน"), columns=CHANNELS)
+    return {"province": df1, "channel": side, "product_type": side.copy()}
+
+
+class _Snapshot:
+    """แทน StoreSnapshot เฉพาะส่วนที่ _lead_in ใช้ (fiscal_years / tables)"""
+
+    def __init__(self, years: Dict[int, Dict[str, pd.DataFrame]]):
+        self._years = years
+
+    @property
+    def fiscal_years(self) -> Tuple[int, ...]:
+        return tuple(sorted(self._years))
+
+    def tables(self, fiscal_year: int) -> Dict[str, pd.DataFrame]:
+        return self._years[fiscal_year]
+
+
+@pytest.fixture
+def cube():
+    # "ค" เพิ่งมีในปีงบ 2567; ปีก่อนมีแค่ "ก" และ "ข"
+    prev = _tables(["ก", "ข"], PREV_MONTHS, [[100, 200], [300, 400]])
+    cur = _tables(["ก", "ข", "ค"], MONTHS, [[300, 300], [400, 400], [500, 500]])
+    snapshot = _Snapshot({2566: prev, 2567: cur})
+    df1, df2, df3 = cur["province"], cur["channel"], cur["product_type"]
+    hierarchy = compile_hierarchy("ภาค", {"เหนือ": ["ก"], "ใต้": ["ข", "ค"]}, df1.index)
+    lead_in = _lead_in(snapshot, 2567, df1, df2, df3, MONTHS)
+    return build_cube(df1, df2, df3, MONTHS, {"ภาค": hierarchy}, "ภาค", {}, lead_in=lead_in)
+
+
+def test_national_mom_uses_full_previous_month(cube):
+    # ก.ย. 2566 ทั้งประเทศ = 200 + 400 = 600; ต.ค. 2566 = 1200
+    assert cube.national_mom[0] == pytest.approx(100.0)
+
+
+def test_missing_province_only_blanks_its_own_mom(cube):
+    mom = cube.values[:, 0, MOM]
+    assert mom[0] == pytest.approx(50.0)
+    assert mom[1] == pytest.approx(0.0)
+    assert np.isnan(mom[2])
+
+
+def test_region_mom_ignores_missing_province_lead_in(cube):
+    region_mom = cube.rollup().mom[:, 0]
+    assert np.isfinite(region_mom).all()
+    assert region_mom[0] == pytest.approx(50.0)
+    # ภาคใต้: ก.ย. มีแค่ "ข" = 400; ต.ค. = 400 + 500
+    assert region_mom[1] == pytest.approx(125.0)
@@ -0,0 +1,58 @@
+# tests/test_frames.py
+# -*- coding: utf-8 -*-
+"""utils/frames.py: ตารางยาวแบบ categorical ต้องถอดรหัสกลับได้ตรงกับ DataFrame.melt และเล็กกว่า"""
+import numpy as np
+import pandas as pd
+
+from utils.frames import categorical, compact_measure, frame_memory, long_frame, with_mapped_category
+
+PROVINCES = ["กรุงเทพมหานคร", "เชียงใหม่", "ขอนแก่น"]
+MONTHS = ["ตุลาคม 2566", "พฤศจิกายน 2566", "ธันวาคม 2566", "มกราคม 2567"]
+
+
+def _wide() -> pd.DataFrame:
+    values = np.arange(12, dtype=np.int64).reshape(3, 4) * 10**12
+    return pd.DataFrame(values, index=pd.Index(PROVINCES, name="จังหวัด"), columns=MONTHS)
+
+
+def test_categorical_codes_round_trip():
+    codes = np.array([2, 0, 1, 2, -1])
+    cat = categorical(codes, ["ก", "ข", "ค"])
+    assert cat.codes.tolist() == codes.tolist()
+    assert list(cat[:4]) == ["ค", "ก", "ข", "ค"] and pd.isna(cat[4])
+    assert np.asarray(cat.categories)[cat.codes[:4]].tolist() == ["ค", "ก", "ข", "ค"]
+
+
+def test_long_frame_matches_melt():
+    wide = _wide()
+    got = long_frame(wide.to_numpy(), wide.index, wide.columns, "จังหวัด", "เดือน", "ยอดขาย", ordered_cols=True)
+    expected = wide.reset_index().melt(id_vars="จังหวัด", var_name="เดือน", value_name="ยอดขาย")
+
+    assert isinstance(got["จังหวัด"].dtype, pd.CategoricalDtype)
+    assert got["เดือน"].cat.ordered and list(got["เดือน"].cat.categories) == MONTHS
+    assert got["ยอดขาย"].dtype == np.int64
+    as_text = {"จังหวัด": object, "เดือน": object}
+    pd.testing.assert_frame_equal(got.astype(as_text), expected.astype(as_text))
+    assert frame_memory(got) < frame_memory(expected.astype(as_text))
+
+
+def test_long_frame_row_major_order():
+    wide = _wide()
+    got = long_frame(wide.to_numpy(), wide.index, wide.columns, "จังหวัด", "เดือน", "ยอดขาย", col_major=False)
+    assert got["จังหวัด"].tolist()[:4] == [PROVINCES[0]] * 4
+    assert got["เดือน"].tolist()[:4] == MONTHS
+    assert got["ยอดขาย"].tolist() == wide.to_numpy().ravel().tolist()
+
+
+def test_mapped_category_maps_categories_not_rows():
+    wide = _wide()
+    df = long_frame(wide.to_numpy(), wide.index, wide.columns, "จังหวัด", "เดือน", "ยอดขาย")
+    df = with_mapped_category(df, "จังหวัด", "province_eng", {"กรุงเทพมหานคร": "Bangkok", "เชียงใหม่": "Chiang Mai"})
+    assert list(df["province_eng"].cat.categories) == ["Bangkok", "Chiang Mai"]
+    assert df.loc[df["จังหวัด"] == "ขอนแก่น", "province_eng"].isna().all()
+    assert (df.loc[df["จังหวัด"] == "เชียงใหม่", "province_eng"] == "Chiang Mai").all()
+
+
+def test_compact_measure_keeps_money_exact():
+    assert compact_measure(np.array([2**62, 1])).dtype == np.int64
+    assert compact_measure(np.array([1.5, 2.25])).dtype == np.float32
@@ -0,0 +1,38 @@
+# tests/test_hierarchy.py
+# -*- coding: utf-8 -*-
+"""utils/hierarchy.py: ยอดรวมด้วยเมทริกซ์สมาชิกต้องเท่ากับ groupby ของ pandas ทุกแบบการแบ่ง"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.hierarchy import compile_all, compile_hierarchy, load_hierarchy_specs
+from utils.store import open_store
+
+
+@pytest.fixture(scope="module")
+def province_table() -> pd.DataFrame:
+    snapshot = open_store()
+    return snapshot.tables(snapshot.fiscal_years[-1])["province"]
+
+
+def test_rollup_equals_groupby_for_every_scheme(province_table):
+    _, specs = load_hierarchy_specs()
+    for name, h in compile_all(specs, province_table.index).items():
+        group = {leaf: g for g, leaves in specs[name]["groups"].items() for leaf in leaves}
+        expected = province_table.groupby(province_table.index.map(group)).sum()
+        got = h.rollup(province_table.to_numpy())
+        assert got.dtype == np.int64, name
+        for g, row in zip(h.groups, got):
+            assert row.tolist() == expected.loc[g].tolist(), f"{name}/{g}"
+
+
+def test_overlapping_groups_and_unknown_leaves():
+    leaves = ["ก", "ข", "ค", "ง"]
+    h = compile_hierarchy("test", {"A": ["ก", "ข", "ไม่มี"], "B": ["ข", "ค"], "ว่าง": ["ไม่มี"]}, leaves)
+    assert h.groups == ("A", "B")                       # กลุ่มที่ไม่มีใบในข้อมูลถูกข้าม
+    values = np.arange(8, dtype=np.int64).reshape(4, 2) * 10**15
+    assert h.rollup(values).tolist() == [(values[0] + values[1]).tolist(), (values[1] + values[2]).tolist()]
+    # กลุ่มหลักของใบ = กลุ่มแรกที่มีใบนั้น; ใบที่ไม่อยู่ในกลุ่มใด -> "" / -1
+    assert [h.group_of(x) for x in leaves] == ["A", "A", "B", ""]
+    assert h.group_index("ง") == -1 and h.group_index(None) == -1
+    assert h.members("B") == ("ข", "ค") and h.members("ว่าง") == ()
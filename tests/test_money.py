@@ -0,0 +1,49 @@
+# tests/test_money.py
+# -*- coding: utf-8 -*-
+"""utils/money.py: parse_satang แปลงข้อความเป็นสตางค์แบบแม่นยำ (ปัดครึ่งขึ้นที่หลักที่ 3) และย้อนกลับด้วย format_satang ได้พอดี"""
+import numpy as np
+import pytest
+
+from utils.money import MONEY_DTYPE, format_satang, parse_satang
+
+
+@pytest.mark.parametrize("text, satang", [
+    ("61,000,000.57", 6_100_000_057),
+    ("1,222,765,499.5", 122_276_549_950),
+    (".5", 50),
+    ("5.", 500),
+    ("5", 500),
+    ("  +12.30 ", 1230),
+    ("-1,234.56", -123_456),
+    ("0.004", 0),
+    ("0.005", 1),
+    ("-0.005", -1),
+    ("0.0149", 1),
+    ("2.675", 268),                 # float(2.675) ต่ำกว่า 2.675 — ต้องไม่ผ่าน float
+    ("92233720368547758.07", np.iinfo(MONEY_DTYPE).max),
+])
+def test_parse_satang(text, satang):
+    out = parse_satang([text])
+    assert out.dtype == MONEY_DTYPE
+    assert out.tolist() == [satang]
+
+
+def test_parse_satang_keeps_shape():
+    out = parse_satang([["1", "2.5"], ["-3", ".01"]])
+    assert out.shape == (2, 2)
+    assert out.tolist() == [[100, 250], [-300, 1]]
+
+
+@pytest.mark.parametrize("bad", ["", "   ", None, np.nan, "abc", "1.2.3", "1e5", "฿100", "-", ".", "12-"])
+def test_parse_satang_rejects_blank_and_non_numeric(bad):
+    with pytest.raises(ValueError):
+        parse_satang(["1.00", bad])
+
+
+def test_format_satang_round_trip():
+    satang = np.array([0, 1, -1, 5, -5, 99, 100, 12_345, -123_456, 6_100_000_057, np.iinfo(MONEY_DTYPE).min + 1],
+                      dtype=MONEY_DTYPE)
+    text = format_satang(satang)
+    assert text[:5].tolist() == ["0.00", "0.01", "-0.01", "0.05", "-0.05"]
+    assert text[7] == "123.45"
+    assert np.array_equal(parse_satang(text), satang)
@@ -0,0 +1,60 @@
+# tests/test_payload.py
+# -*- coding: utf-8 -*-
+"""utils/payload.py: ป้ายที่ browser แสดงหลังเข้ารหัสต้องเหมือนป้ายที่ Python สร้าง (รวมค่าที่ปัดครึ่งพอดี)"""
+import base64
+
+import numpy as np
+
+from utils.formatters import baht_labels, pct_labels
+from utils.payload import _template_text, typed_array
+
+
+def _bar(values, labels):
+    return {"type": "bar", "y": np.asarray(values, dtype=float), "text": list(labels(values))}
+
+
+def test_text_becomes_template_without_ties():
+    trace = _bar(np.arange(8) * 1000.0 + 0.4, baht_labels)
+    _template_text(trace)
+    assert "text" not in trace and trace["texttemplate"] == "%{value:,.0f}"
+
+
+def test_text_kept_when_a_baht_value_is_on_a_tie():
+    # d3 ปัด 1222765498.5 เป็น ...499 แต่ f"{v:,.0f}" ได้ ...498 (half-even)
+    values = np.arange(8) * 1000.0
+    values[3] = 1222765498.5
+    trace = _bar(values, baht_labels)
+    _template_text(trace)
+    assert "text" in trace and "texttemplate" not in trace
+
+
+def test_text_kept_when_a_pct_value_is_on_a_tie():
+    values = np.arange(8) + 0.25
+    values[0] = 0.125                               # "%.2f" -> 0.12, toFixed(2) -> 0.13
+    trace = _bar(values, lambda v: pct_labels(v, 2))
+    _template_text(trace)
+    assert "text" in trace
+
+
+def _decode(spec):
+    return np.frombuffer(base64.b64decode(spec["bdata"]), dtype="<" + spec["dtype"])
+
+
+def test_f4_only_when_labels_are_unchanged():
+    smooth = np.linspace(0.1, 99.9, 16)
+    spec = typed_array(smooth)
+    assert spec["dtype"] == "f4"
+    assert np.array_equal(pct_labels(_decode(spec).astype(float)), pct_labels(smooth))
+
+    # ยอดเงินใหญ่: f4 คลาดเป็นหลักบาท -> ป้าย ,.0f เปลี่ยน -> ต้องเป็น f8
+    money = np.linspace(1.0e9, 2.0e9, 16) + 0.3
+    assert typed_array(money)["dtype"] == "f8"
+
+
+def test_f4_rejected_when_it_lands_on_a_new_tie():
+    # 0.1249999999 -> f4 = 0.125 พอดี: ป้าย Python ยัง "0.12%" ทั้งคู่ แต่ d3 แสดง f4 เป็น "0.13%"
+    values = np.full(8, 1.0)
+    values[0] = 0.1249999999
+    assert np.float32(values[0]) == 0.125
+    assert np.array_equal(pct_labels(values), pct_labels(values.astype(np.float32).astype(float)))
+    assert typed_array(values)["dtype"] == "f8"
@@ -0,0 +1,47 @@
+# tests/test_procmem.py
+# -*- coding: utf-8 -*-
+"""utils/procmem.py: อ่าน RSS ไม่ได้ -> None และผู้ใช้ (PartitionCache / warm-up) ข้ามการตรวจหน่วยความจำ ไม่ไล่ / ไม่หยุด"""
+import builtins
+
+import pytest
+
+from utils import partitions, procmem, warmup
+from utils.partitions import PartitionCache
+
+
+def test_rss_mb_reads_the_process():
+    rss = procmem.rss_mb()
+    assert rss is not None and 1 < rss < 1 << 20
+
+
+@pytest.fixture
+def no_proc(monkeypatch):
+    """ไม่มี /proc (macOS / Windows) -> ต้องใช้ getrusage หรือไม่รู้ค่า"""
+    real_open = builtins.open
+
+    def fake_open(path, *args, **kwargs):
+        if str(path).startswith("/proc/"):
+            raise FileNotFoundError(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", fake_open)
+
+
+def test_maxrss_fallback_is_in_megabytes(no_proc):
+    rss = procmem.rss_mb()
+    assert rss is not None and 1 < rss < 1 << 20
+
+
+def test_rss_mb_unknown_without_proc_or_resource(no_proc, monkeypatch):
+    monkeypatch.setattr(procmem, "resource", None)      # Windows
+    assert procmem.rss_mb() is None
+
+
+def test_unknown_rss_skips_memory_checks(monkeypatch):
+    monkeypatch.setattr(partitions, "rss_mb", lambda: None)
+    monkeypatch.setattr(warmup, "rss_mb", lambda: None)
+    cache = PartitionCache(max_entries=3, memory_mb=1, sizeof=lambda v: 1)
+    for year in (2566, 2567, 2568):
+        cache.get(year, lambda: object())
+    assert len(cache) == 3 and cache.evictions == 0
+    assert not warmup._budget_exceeded(1).startswith("หน่วยความจำ")
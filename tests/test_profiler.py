@@ -0,0 +1,25 @@
+# tests/test_profiler.py
+# -*- coding: utf-8 -*-
+"""utils/profiler.py: log แยกไฟล์ต่อโปรเซส และ read_log รวมทุก pid + ไฟล์ที่หมุนแล้ว"""
+import json
+import os
+
+from utils.profiler import log_path, read_log
+
+
+def test_log_path_is_per_process(tmp_path):
+    assert log_path(str(tmp_path / "profile.jsonl")) == tmp_path / f"profile.{os.getpid()}.jsonl"
+
+
+def test_read_log_merges_processes_and_rotated_files(tmp_path):
+    files = {
+        "profile.jsonl": "a",            # ไฟล์แบบเดิม (ก่อนแยก pid)
+        "profile.101.jsonl": "b",
+        "profile.101.jsonl.1": "c",
+        "profile.202.jsonl": "d",
+        "other.jsonl": "x",
+    }
+    for name, component in files.items():
+        (tmp_path / name).write_text(json.dumps({"component": component}) + "\nnot json\n", encoding="utf-8")
+    got = sorted(r["component"] for r in read_log(tmp_path / "profile.jsonl"))
+    assert got == ["a", "b", "c", "d"]
@@ -0,0 +1,50 @@
+# tests/test_ranges.py
+# -*- coding: utf-8 -*-
+"""utils/ranges.py: ทุกช่วง [start, stop) จาก prefix sum ต้องเท่ากับการ slice แล้ว sum ตรง ๆ"""
+import numpy as np
+import pytest
+
+from utils.ranges import build_range_sums
+
+
+@pytest.fixture(scope="module")
+def sales() -> np.ndarray:
+    # สตางค์ (เดือน × จังหวัด) ขนาดใหญ่พอที่ float จะปัดเศษ
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 10**13, size=(24, 5), dtype=np.int64)
+
+
+def test_every_window_equals_slice_sum(sales):
+    sums = build_range_sums(sales)
+    n = len(sales)
+    assert len(sums) == n and sums.cum.dtype == np.int64
+    for start in range(n + 1):
+        for stop in range(start, n + 1):
+            assert np.array_equal(sums.total(start, stop), sales[start:stop].sum(axis=0)), (start, stop)
+            assert np.array_equal(sums.running(start, stop), np.cumsum(sales[start:stop], axis=0))
+
+
+def test_time_axis_can_be_any_axis(sales):
+    by_row = build_range_sums(sales.T, axis=1)
+    assert np.array_equal(by_row.total(3, 15), sales[3:15].sum(axis=0))
+
+
+def test_bounds_are_clipped(sales):
+    sums = build_range_sums(sales)
+    assert np.array_equal(sums.total(-5, 100), sales.sum(axis=0))
+    assert np.array_equal(sums.total(10, 4), np.zeros(5, dtype=np.int64))
+    assert np.isnan(sums.mean(7, 7)).all()
+
+
+def test_mean_and_growth_match_direct_computation(sales):
+    sums = build_range_sums(sales.astype(float))
+    np.testing.assert_allclose(sums.mean(6, 18), sales[6:18].mean(axis=0))
+    cur, prev = sales[12:18].sum(axis=0), sales[6:12].sum(axis=0)
+    np.testing.assert_allclose(sums.growth(12, 18), (cur - prev) / prev * 100.0)
+    assert np.isnan(sums.growth(2, 6)).all()                 # ช่วงก่อนหน้าไม่ครบ
+
+
+def test_growth_is_nan_when_previous_window_is_zero():
+    sums = build_range_sums(np.array([0, 0, 5, 7]))
+    assert np.isnan(sums.growth(2, 4))
+    assert sums.growth(3, 4) == pytest.approx(40.0)
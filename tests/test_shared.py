@@ -0,0 +1,161 @@
+# tests/test_shared.py
+# -*- coding: utf-8 -*-
+"""utils/shared.py: segment ต้องถอดกลับได้ครบ, อ่านอย่างเดียว, prune ไม่ลบของที่ใช้อยู่, build ครั้งเดียว"""
+import dataclasses
+import gc
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data import OtopDataset, build_dataset
+from utils.shared import attach, load_or_publish, prune, publish
+from utils.store import open_store
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def dataset() -> OtopDataset:
+    snapshot = open_store()
+    return build_dataset(snapshot, snapshot.fiscal_years[-1])
+
+
+def _arrays(obj):
+    """array ทุกตัวในอ็อบเจ็กต์ (รวมคอลัมน์ของ DataFrame / Series)"""
+    if isinstance(obj, np.ndarray):
+        yield obj
+    elif isinstance(obj, pd.DataFrame):
+        for c in obj.columns:
+            yield from _arrays(obj[c])
+    elif isinstance(obj, pd.Series):
+        s = obj.cat.codes if isinstance(obj.dtype, pd.CategoricalDtype) else obj
+        yield s.to_numpy()
+    elif dataclasses.is_dataclass(obj):
+        for f in dataclasses.fields(obj):
+            yield from _arrays(getattr(obj, f.name))
+    elif isinstance(obj, tuple):
+        for x in obj:
+            yield from _arrays(x)
+    elif isinstance(obj, Mapping):
+        for x in obj.values():
+            yield from _arrays(x)
+
+
+def assert_same(a, b, where="root"):
+    assert type(a) is type(b), f"{where}: {type(a).__name__} != {type(b).__name__}"
+    if isinstance(a, np.ndarray):
+        assert a.dtype == b.dtype and a.shape == b.shape, where
+        assert np.array_equal(a, b, equal_nan=a.dtype.kind == "f"), where
+    elif isinstance(a, pd.DataFrame):
+        pd.testing.assert_frame_equal(a, b, obj=where)
+    elif isinstance(a, pd.Series):
+        pd.testing.assert_series_equal(a, b, obj=where)
+    elif dataclasses.is_dataclass(a):
+        for f in dataclasses.fields(a):
+            assert_same(getattr(a, f.name), getattr(b, f.name), f"{where}.{f.name}")
+    elif isinstance(a, tuple):
+        assert len(a) == len(b), where
+        for i, (x, y) in enumerate(zip(a, b)):
+            assert_same(x, y, f"{where}[{i}]")
+    elif isinstance(a, Mapping):
+        assert list(a) == list(b), where
+        for k in a:
+            assert_same(a[k], b[k], f"{where}[{k!r}]")
+    elif isinstance(a, float) and np.isnan(a):
+        assert np.isnan(b), where
+    else:
+        assert a == b, where
+
+
+def test_round_trip_dataset(dataset, tmp_path):
+    seg = publish(tmp_path / "seg", dataset)
+    assert_same(dataset, attach(seg))
+
+
+def test_round_trip_cube(dataset, tmp_path):
+    seg = publish(tmp_path / "cube", dataset.cube)
+    assert_same(dataset.cube, attach(seg))
+
+
+def test_attached_arrays_are_read_only(dataset, tmp_path):
+    shared = attach(publish(tmp_path / "seg", dataset))
+    arrays = [a for a in _arrays(shared) if a.size]
+    assert arrays
+    for a in arrays:
+        assert not a.flags.writeable
+    with pytest.raises(ValueError):
+        shared.cube.national_total[0] = 0
+
+
+def _attach_in_child(seg: Path) -> subprocess.Popen:
+    code = (
+        "import sys\n"
+        "from utils.shared import attach\n"
+        f"held = attach({str(seg)!r})\n"
+        "print('attached', flush=True)\n"
+        "sys.stdin.read()\n"
+    )
+    child = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, stdin=subprocess.PIPE,
+                             stdout=subprocess.PIPE, text=True)
+    assert child.stdout.readline().strip() == "attached"
+    return child
+
+
+def test_prune_skips_attached_segment(tmp_path):
+    old = tmp_path / "v1" / "fy1-x"
+    current = tmp_path / "v2" / "fy1-x"
+    publish(old, {"a": np.arange(100)})
+    publish(current, {"a": np.arange(100)})
+
+    child = _attach_in_child(old)
+    try:
+        assert prune(tmp_path, keep={"v2"}) == []
+        assert (old / "meta.json").exists()
+    finally:
+        child.communicate("")
+
+    assert prune(tmp_path, keep={"v2"}) == [old]
+    assert not (tmp_path / "v1").exists()
+    assert (current / "meta.json").exists()
+
+
+def test_prune_releases_after_gc(tmp_path):
+    seg = tmp_path / "v1" / "fy1-x"
+    held = load_or_publish(seg, lambda: {"a": np.arange(100)})
+    assert prune(tmp_path, keep={"v2"}) == []
+    del held
+    gc.collect()
+    assert prune(tmp_path, keep={"v2"}) == [seg]
+
+
+def test_concurrent_load_or_publish_builds_once(tmp_path):
+    seg = tmp_path / "v1" / "fy1-x"
+    builds = []
+    start = threading.Barrier(8)
+    results = []
+
+    def build():
+        builds.append(1)
+        time.sleep(0.2)          # ให้ thread อื่นมาถึงระหว่างสร้าง
+        return {"a": np.arange(1000)}
+
+    def worker():
+        start.wait()
+        results.append(load_or_publish(seg, build))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(builds) == 1
+    assert len(results) == 8
+    for r in results:
+        assert np.array_equal(r["a"], np.arange(1000))
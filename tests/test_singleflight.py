@@ -0,0 +1,99 @@
+# tests/test_singleflight.py
+# -*- coding: utf-8 -*-
+"""utils/singleflight.py: key เดียวคำนวณครั้งเดียว, Exception ส่งถึง follower, BaseException -> follower หนึ่งคนเป็น leader ใหม่"""
+import threading
+import time
+
+from utils.singleflight import SingleFlight
+
+N = 8
+KEY = ("fig", "main", 1)
+TIMEOUT = 10.0
+
+
+class _Abort(BaseException):
+    """แทน StopException / RerunException ของ Streamlit"""
+
+
+def _wait_for_followers(flight: SingleFlight, n: int) -> None:
+    """รอจน follower สะสม (stats) ครบ n — follower ถูกนับตอนเกาะ call แล้ว จึงได้ผลของ call นั้นแน่นอน"""
+    deadline = time.monotonic() + TIMEOUT
+    while flight.stats()["followers"] < n:
+        if time.monotonic() > deadline:
+            raise AssertionError(f"follower ไม่ครบ {n} คนภายใน {TIMEOUT} วินาที")
+        time.sleep(0.001)
+
+
+def _run(flight: SingleFlight, compute, n: int = N) -> list:
+    """เรียก flight.do(KEY, compute) จาก n thread พร้อมกัน -> [("ok", (value, shared)) | ("error", exc)]"""
+    results = [None] * n
+
+    def worker(i: int) -> None:
+        try:
+            results[i] = ("ok", flight.do(KEY, compute))
+        except BaseException as e:
+            results[i] = ("error", e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(TIMEOUT)
+    assert not any(t.is_alive() for t in threads)
+    assert flight.in_flight() == 0
+    return results
+
+
+def test_concurrent_callers_build_once():
+    flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        _wait_for_followers(flight, N - 1)
+        return "figure"
+
+    results = _run(flight, compute)
+    assert len(calls) == 1
+    assert all(kind == "ok" and value == "figure" for kind, (value, _) in results)
+    assert sorted(shared for _, (_, shared) in results) == [False] + [True] * (N - 1)
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": N - 1}
+
+
+def test_leader_exception_reaches_every_follower():
+    flight = SingleFlight()
+    calls = []
+    error = ValueError("build failed")
+
+    def compute():
+        calls.append(1)
+        _wait_for_followers(flight, N - 1)
+        raise error
+
+    results = _run(flight, compute)
+    assert len(calls) == 1
+    assert all(kind == "error" and exc is error for kind, exc in results)
+
+
+def test_leader_abort_makes_one_follower_the_new_leader():
+    flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            _wait_for_followers(flight, N - 1)
+            raise _Abort()
+        # leader ใหม่รอให้ follower ที่เหลือลองใหม่แล้วมารอผลนี้ครบก่อน
+        _wait_for_followers(flight, (N - 1) + (N - 2))
+        return "figure"
+
+    results = _run(flight, compute)
+    aborted = [r for r in results if r[0] == "error"]
+    ok = [r[1] for r in results if r[0] == "ok"]
+    assert len(aborted) == 1 and isinstance(aborted[0][1], _Abort)
+    assert len(calls) == 2
+    assert all(value == "figure" for value, _ in ok)
+    assert sorted(shared for _, shared in ok) == [False] + [True] * (N - 2)
+    assert flight.leaders == 2
+
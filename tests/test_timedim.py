@@ -0,0 +1,68 @@
+# tests/test_timedim.py
+# -*- coding: utf-8 -*-
+"""utils/timedim.py: ป้ายเดือนภาษาไทย -> Period / ordinal / ปีงบ (เริ่มตุลาคม) และการเลื่อนงวดตามปฏิทินจริง"""
+import numpy as np
+import pytest
+
+from utils.timedim import Period, build_timedim, month_columns, parse_month, period_from_ordinal
+
+
+@pytest.mark.parametrize("label, period", [
+    ("ตุลาคม 2566", Period(2566, 10)),
+    ("ต.ค. 2566", Period(2566, 10)),
+    ("ต.ค. 66", Period(2566, 10)),
+    ("ตค 66", Period(2566, 10)),
+    ("  มกราคม2567 ", Period(2567, 1)),
+    ("กันยายน", Period(None, 9)),
+    ("รวม", None),
+    ("จังหวัด", None),
+])
+def test_parse_month(label, period):
+    assert parse_month(label) == period
+
+
+@pytest.mark.parametrize("period, fiscal_year", [
+    (Period(2566, 9), 2566),
+    (Period(2566, 10), 2567),
+    (Period(2566, 12), 2567),
+    (Period(2567, 1), 2567),
+    (Period(2567, 9), 2567),
+    (Period(None, 10), None),
+])
+def test_fiscal_year_starts_in_october(period, fiscal_year):
+    assert period.fiscal_year == fiscal_year
+
+
+def test_ordinals_are_consecutive_across_years():
+    dec, jan = parse_month("ธันวาคม 2566"), parse_month("มกราคม 2567")
+    assert jan.ordinal == dec.ordinal + 1
+    assert dec.ordinal == (2566 - 543) * 12 + 11
+    assert period_from_ordinal(jan.ordinal) == jan
+    assert period_from_ordinal(jan.ordinal).label() == "มกราคม 2567"
+
+
+def test_timedim_lookup_prev_and_fiscal_years():
+    # ขาดเดือนธันวาคม -> มกราคมไม่มีงวดก่อนหน้า
+    labels = ["สิงหาคม 2566", "กันยายน 2566", "ตุลาคม 2566", "พฤศจิกายน 2566", "มกราคม 2567"]
+    t = build_timedim(labels)
+    assert t.prev.tolist() == [-1, 0, 1, 2, -1]
+    assert t.fiscal_years.tolist() == [2566, 2566, 2567, 2567, 2567]
+    assert t.fiscal_year_list == (2566, 2567)
+    assert t.fiscal_year_bounds(2567) == slice(2, 5)
+    assert t.fiscal_year_slice(3) == slice(2, 4)
+    # ป้ายต่างรูปแบบของเดือนเดียวกันจับคู่ด้วย ordinal
+    assert t.index("ต.ค. 66") == 2 and t.index("ธันวาคม 2566") is None
+    assert t.lag(2) == 1 and t.lead(3) is None and t.shift(0, 3) == 3
+
+
+def test_timedim_without_years_groups_by_october():
+    t = build_timedim(["สิงหาคม", "กันยายน", "ตุลาคม", "พฤศจิกายน"])
+    assert np.array_equal(t.ordinals, [-1, -1, -1, -1])
+    assert t.prev.tolist() == [-1, 0, 1, 2]
+    assert t.fy_ids.tolist() == [0, 0, 1, 1]
+    assert t.index("ตุลาคม 2566") == 2          # ไม่มีปีฝั่งตาราง -> จับคู่ด้วยเดือน
+
+
+def test_month_columns_keeps_only_dated_labels():
+    assert month_columns(["จังหวัด", "ตุลาคม 2566", "รวม", "ต.ค. 67"]) == ["ตุลาคม 2566", "ต.ค. 67"]
+    assert month_columns(["ตุลาคม", "รวม"]) == ["ตุลาคม", "รวม"]
@@ -0,0 +1,65 @@
+# utils/chart_data.py
+# -*- coding: utf-8 -*-
+"""
+เตรียมข้อมูล trace ของกราฟจากเมทริกซ์กว้าง (แถว = แกน x, คอลัมน์ = series) ในครั้งเดียว
+
+- wide_traces: ทุก series ของกราฟแท่ง/เส้น พร้อมป้าย (สร้างป้ายทั้งเมทริกซ์ครั้งเดียวแล้ว slice ต่อคอลัมน์)
+- ranked_bar: ค่า + ชื่อ + ป้าย เรียงตามดัชนีที่คิวบ์คำนวณไว้แล้ว (order_desc / order_asc / mom_order_asc)
+- tail_rows: ช่วงท้ายของแกนเวลา (ALL / 1M / 6M / 1Y)
+- window_rows: ช่วงเวลาที่เลือก (ช่วงท้ายสำเร็จรูป หรือ "เดือนเริ่ม..เดือนจบ") -> slice แถวของตารางใดก็ได้
+"""
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from utils.formatters import baht_labels
+from utils.timedim import TimeDim
+
+TIME_RANGE_MONTHS = {"1M": 1, "6M": 6, "1Y": 12}  # "ALL" = ทุกเดือน
+RANGE_SEP = ".."                                   # time_range แบบกำหนดเอง = f"{เดือนเริ่ม}..{เดือนจบ}"
+
+
+def tail_rows(n_rows: int, time_range: str) -> slice:
+    n_tail = TIME_RANGE_MONTHS.get(time_range, n_rows)
+    return slice(max(0, n_rows - n_tail), n_rows)
+
+
+def custom_range(start: str, end: str) -> str:
+    return f"{start}{RANGE_SEP}{end}"
+
+
+def window_rows(time: TimeDim, time_range: str) -> slice:
+    """time_range -> ช่วงแถว [start, stop) ของตารางนี้ (ช่วงกำหนดเองที่หาเดือนไม่พบ -> ทุกเดือน)"""
+    if RANGE_SEP in time_range:
+        a, b = time_range.split(RANGE_SEP, 1)
+        i, j = time.index(a), time.index(b)
+        if i is None or j is None:
+            return slice(0, len(time))
+        return slice(min(i, j), max(i, j) + 1)
+    return tail_rows(len(time), time_range)
+
+
+def wide_traces(
+    x: Sequence,
+    matrix: np.ndarray,
+    names: Sequence[str],
+    labels: Callable[[np.ndarray], np.ndarray] = baht_labels,
+) -> List[Dict]:
+    """เมทริกซ์ (len(x), len(names)) -> kwargs ของแต่ละ trace: x, y, name, text"""
+    text = labels(matrix)
+    x = list(x)
+    return [
+        {"x": x, "y": matrix[:, c], "name": name, "text": text[:, c]}
+        for c, name in enumerate(names)
+    ]
+
+
+def ranked_bar(
+    values: np.ndarray,
+    names: Sequence[str],
+    order: np.ndarray,
+    labels: Callable[[np.ndarray], np.ndarray] = baht_labels,
+) -> Dict[str, np.ndarray]:
+    """ค่า/ชื่อ/ป้าย ตามลำดับ order (ใช้กับกราฟแท่งแนวนอนที่เรียงแล้ว)"""
+    v = np.asarray(values)[order]
+    return {"values": v, "names": np.asarray(names, dtype=object)[order], "text": labels(v)}
@@ -0,0 +1,276 @@
+# utils/cube.py
+# -*- coding: utf-8 -*-
+"""
+คิวบ์วิเคราะห์ (province × month × measure) ที่สร้างครั้งเดียวตอนโหลดข้อมูล
+
+- SalesCube: ยอดขายรายจังหวัด พร้อม MoM / YTD / อันดับ / สัดส่วน ต่อเดือน
+  รวมถึงยอดรวม/ค่าเฉลี่ยประเทศ ลำดับการเรียง และยอดรวมรายภูมิภาค
+- SubCube: ตาราง month × column (ช่องทาง / ประเภทสินค้า) พร้อม MoM / YTD / สัดส่วน
+- RegionRollup: ยอดรวมราย กลุ่ม × เดือน ของแต่ละแบบการแบ่งภาค (utils/hierarchy.py)
+- sums (RangeSums, utils/ranges.py): ผลรวมสะสมตามเดือน — ยอดรวม/เฉลี่ย/การเติบโตของช่วงใด ๆ เป็น O(1)
+
+คอมโพเนนต์ใน components/* อ่านค่าจากคิวบ์แบบ slice ตรง ๆ ไม่ต้องคำนวณ pandas ซ้ำทุก rerun
+
+หน่วยเงิน: ตารางต้นทางเป็นสตางค์ int64 (utils/money.py) — ยอดรวมทุกชนิด (sales, national_total,
+month_totals, ยอดรายภาค, sums, YTD) รวมกันแบบจำนวนเต็มเป็นสตางค์
+measure ใน values (SALES / YTD / SUB_SALES / SUB_YTD) เป็นบาท float ไว้แสดงผลตรง ๆ
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.hierarchy import Hierarchy
+from utils.money import MONEY_DTYPE, to_baht
+from utils.ranges import RangeSums, build_range_sums
+from utils.timedim import TimeDim, build_timedim
+
+# measure ของคิวบ์จังหวัด (แกนที่ 3)
+MEASURES = ("sales", "mom", "ytd", "rank", "share")
+SALES, MOM, YTD, RANK, SHARE = range(len(MEASURES))
+
+# measure ของ sub-cube (ช่องทาง / ประเภทสินค้า)
+SUB_MEASURES = ("sales", "mom", "ytd", "share")
+SUB_SALES, SUB_MOM, SUB_YTD, SUB_SHARE = range(len(SUB_MEASURES))
+
+# ------------------------------
+# Helpers (คำนวณตามแกนเดือน)
+# ------------------------------
+def _mom_pct(values: np.ndarray, prev: np.ndarray, axis: int, lead_in: Optional[np.ndarray] = None) -> np.ndarray:
+    """% เปลี่ยนแปลงจากงวดก่อนหน้า (prev = TimeDim.prev; NaN เมื่อไม่มีงวดก่อน หรืองวดก่อน = 0)
+
+    lead_in = ค่าของงวดก่อนแถวแรก (เดือนสุดท้ายของปีงบก่อนหน้า) ใช้แทนงวดก่อนของแถวแรก
+    """
+    v = np.moveaxis(np.asarray(values, dtype=float), axis, 0)
+    if lead_in is not None and len(prev) and prev[0] < 0:
+        # ต่องวดก่อนไว้หน้าแถวแรก คำนวณ แล้วตัดแถวนั้นทิ้ง
+        v = np.concatenate([np.asarray(lead_in, dtype=float)[None], v])
+        prev = np.concatenate([[-1, 0], np.where(prev[1:] >= 0, prev[1:] + 1, -1)])
+        return np.moveaxis(_mom_pct(v, prev, axis=0)[1:], 0, axis)
+    out = np.full(v.shape, np.nan)
+    has = prev >= 0
+    p, cur = v[prev[has]], v[has]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[has] = np.where(p != 0, (cur - p) / p * 100.0, np.nan)
+    return np.moveaxis(out, 0, axis)
+
+def _ytd(sums: RangeSums, fy_ids: np.ndarray, axis: int) -> np.ndarray:
+    """ยอดสะสมตั้งแต่ต้นปีงบ (reset ทุกต้นปีงบ) = cum[แถว + 1] - cum[แถวแรกของปีงบ]"""
+    groups, first = np.unique(fy_ids, return_index=True)
+    fy_start = first[np.searchsorted(groups, fy_ids)]
+    out = sums.cum[1:] - sums.cum[fy_start]
+    return np.moveaxis(out, 0, axis)
+
+def _share_pct(values: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(totals != 0, values / totals * 100.0, np.nan)
+
+
+# ------------------------------
+# Sub-cube: month × column
+# ------------------------------
+@dataclass(frozen=True)
+class SubCube:
+    months: Tuple[str, ...]          # ป้ายเดือนตามตารางต้นทาง
+    columns: Tuple[str, ...]         # ช่องทาง / ประเภทสินค้า
+    values: np.ndarray               # (M, C, len(SUB_MEASURES)) บาท / %
+    sales: np.ndarray                # (M, C) สตางค์ int64
+    month_totals: np.ndarray         # (M,) สตางค์ int64
+    order_asc: np.ndarray            # (M, C) ลำดับคอลัมน์จากน้อยไปมากตามยอดขาย
+    sums: RangeSums                  # (M + 1, C) ผลรวมสะสมของยอดขาย (สตางค์)
+    time: TimeDim                    # ป้ายเดือนของตารางใดก็ได้ -> แถว (จับคู่ด้วยงวด)
+
+    def row_index(self, month: str) -> Optional[int]:
+        return self.time.index(month)
+
+    def row(self, month: str, measure: int = SUB_SALES) -> Optional[np.ndarray]:
+        i = self.row_index(month)
+        return None if i is None else self.values[i, :, measure]
+
+
+def build_subcube(df: pd.DataFrame, lead_in: Optional[np.ndarray] = None) -> SubCube:
+    """สร้าง SubCube จากตารางกว้าง (index = เดือน, columns = หมวด; lead_in = แถวของเดือนก่อนแถวแรก)"""
+    time = build_timedim(df.index)
+    sales = df.to_numpy(dtype=MONEY_DTYPE)
+    totals = sales.sum(axis=1)
+    sums = build_range_sums(sales, axis=0)
+
+    values = np.empty(sales.shape + (len(SUB_MEASURES),))
+    values[..., SUB_SALES] = to_baht(sales)
+    values[..., SUB_MOM] = _mom_pct(sales, time.prev, axis=0, lead_in=lead_in)
+    values[..., SUB_YTD] = to_baht(_ytd(sums, time.fy_ids, axis=0))
+    values[..., SUB_SHARE] = _share_pct(sales, totals[:, None])
+
+    return SubCube(
+        months=time.labels,
+        columns=tuple(str(c) for c in df.columns),
+        values=values,
+        sales=sales,
+        month_totals=totals,
+        order_asc=np.argsort(sales, axis=1, kind="stable"),
+        sums=sums,
+        time=time,
+    )
+
+
+# ------------------------------
+# Region rollup: group × month (ต่อแบบการแบ่งภาค)
+# ------------------------------
+@dataclass(frozen=True)
+class RegionRollup:
+    hierarchy: Hierarchy
+    sales: np.ndarray                # (G, M) สตางค์ int64
+    mom: np.ndarray                  # (G, M)
+
+    @property
+    def regions(self) -> Tuple[str, ...]:
+        return self.hierarchy.groups
+
+
+def build_rollup(
+    hierarchy: Hierarchy, sales: np.ndarray, time: TimeDim, lead_in: Optional[np.ndarray] = None
+) -> RegionRollup:
+    """sales (P, M) -> ยอดรวมทุกกลุ่มด้วย matrix product ครั้งเดียว"""
+    region_sales = hierarchy.rollup(sales)
+    # จังหวัดที่ไม่มีในปีก่อน (NaN) ไม่ทำให้ทั้งภาคกลายเป็น NaN
+    region_lead_in = None if lead_in is None else hierarchy.rollup(np.nan_to_num(lead_in, nan=0.0))
+    return RegionRollup(
+        hierarchy=hierarchy, sales=region_sales, mom=_mom_pct(region_sales, time.prev, axis=1, lead_in=region_lead_in)
+    )
+
+
+# ------------------------------
+# Province cube: province × month × measure
+# ------------------------------
+@dataclass(frozen=True)
+class SalesCube:
+    provinces: Tuple[str, ...]
+    province_eng: Tuple[Optional[str], ...]
+    months: Tuple[str, ...]
+    values: np.ndarray               # (P, M, len(MEASURES)) บาท / % / อันดับ
+    sales: np.ndarray                # (P, M) สตางค์ int64
+    national_total: np.ndarray       # (M,) สตางค์ int64
+    national_mean: np.ndarray        # (M,) บาท (ค่าเฉลี่ยต่อจังหวัด ไว้แสดงผล)
+    national_mom: np.ndarray         # (M,) NaN เมื่อไม่มีเดือนก่อนหน้า
+    order_desc: np.ndarray           # (M, P) ดัชนีจังหวัด เรียงยอดขายมาก -> น้อย
+    mom_order_asc: np.ndarray        # (M, P) ดัชนีจังหวัด เรียง MoM (NaN = 0) น้อย -> มาก
+    region_schemes: Dict[str, RegionRollup]   # ชื่อแบบการแบ่งภาค -> ยอดรวมรายภาค
+    default_scheme: str
+    province_pos: Dict[str, int]
+    sums: RangeSums                  # (M + 1, P) ผลรวมสะสมของยอดขายรายจังหวัด (สตางค์)
+    time: TimeDim
+    channels: SubCube
+    products: SubCube
+    data_version: str = ""           # snapshot ของคลังข้อมูลที่ใช้สร้างคิวบ์
+
+    @property
+    def month_pos(self) -> Dict[str, int]:
+        return self.time.label_pos
+
+    def month_index(self, month: str) -> int:
+        """ตำแหน่งเดือน (ไม่พบ -> เดือนล่าสุด)"""
+        i = self.time.index(month)
+        return len(self.months) - 1 if i is None else i
+
+    def province_index(self, province: Optional[str]) -> Optional[int]:
+        if not province:
+            return None
+        return self.province_pos.get(province)
+
+    def series(self, province: str, measure: int = SALES) -> Optional[np.ndarray]:
+        p = self.province_index(province)
+        return None if p is None else self.values[p, :, measure]
+
+    def month_slice(self, month: str, measure: int = SALES) -> np.ndarray:
+        return self.values[:, self.month_index(month), measure]
+
+    def rollup(self, scheme: Optional[str] = None) -> RegionRollup:
+        """ยอดรวมรายภาคของแบบการแบ่งที่ระบุ (ไม่ระบุ / ไม่รู้จัก -> แบบเริ่มต้น)"""
+        return self.region_schemes.get(scheme or self.default_scheme) or self.region_schemes[self.default_scheme]
+
+    # ภาคตามแบบการแบ่งเริ่มต้น
+    @property
+    def regions(self) -> Tuple[str, ...]:
+        return self.rollup().regions
+
+    @property
+    def region_sales(self) -> np.ndarray:
+        return self.rollup().sales
+
+    @property
+    def region_mom(self) -> np.ndarray:
+        return self.rollup().mom
+
+    def region_of(self, province: Optional[str], scheme: Optional[str] = None) -> str:
+        return self.rollup(scheme).hierarchy.group_of(province)
+
+
+def build_cube(
+    df1: pd.DataFrame,
+    df2: pd.DataFrame,
+    df3: pd.DataFrame,
+    month_cols: List[str],
+    hierarchies: Mapping[str, Hierarchy],
+    default_scheme: str,
+    province_name_map: Dict[str, str],
+    data_version: str = "",
+    lead_in: Optional[Mapping[str, np.ndarray]] = None,
+) -> SalesCube:
+    """สร้างคิวบ์ทั้งหมดครั้งเดียว (เรียกจาก utils/data.py; hierarchies compile กับลำดับแถวของ df1 แล้ว)
+
+    lead_in = ยอดของเดือนก่อนเดือนแรก แยกตามตาราง {"province": (P,), "channel": (C,), "product_type": (C,)}
+    (เดือนสุดท้ายของปีงบก่อนหน้า) ใช้คำนวณ MoM ของเดือนแรกให้ต่อเนื่องข้ามปี
+    "national" = ยอดรวมประเทศของเดือนนั้น (ไม่ระบุ -> รวมจาก "province" ข้าม NaN)
+    """
+    lead_in = lead_in or {}
+    provinces = tuple(str(p) for p in df1.index)
+    time = build_timedim(month_cols)
+    months = time.labels
+    sales = df1[list(month_cols)].to_numpy(dtype=MONEY_DTYPE)    # (P, M) สตางค์
+    n_prov, n_month = sales.shape
+
+    national_total = sales.sum(axis=0)
+    national_lead_in = lead_in.get("national")
+    if national_lead_in is None and lead_in.get("province") is not None:
+        national_lead_in = np.nansum(lead_in["province"])
+    order_desc = np.argsort(-sales, axis=0, kind="stable").T      # (M, P)
+    rank = np.empty_like(sales)
+    rank[order_desc.T, np.arange(n_month)[None, :]] = np.arange(1, n_prov + 1)[:, None]
+
+    mom = _mom_pct(sales, time.prev, axis=1, lead_in=lead_in.get("province"))
+    values = np.empty((n_prov, n_month, len(MEASURES)))
+    values[..., SALES] = to_baht(sales)
+    values[..., MOM] = mom
+    sums = build_range_sums(sales, axis=1)
+    values[..., YTD] = to_baht(_ytd(sums, time.fy_ids, axis=1))
+    values[..., RANK] = rank
+    values[..., SHARE] = _share_pct(sales, national_total[None, :])
+
+    # ภูมิภาค: ทุกแบบการแบ่ง (เฉพาะกลุ่มที่มีจังหวัดอยู่ในข้อมูล)
+    for name, h in hierarchies.items():
+        if h.leaves != provinces:
+            raise ValueError(f"hierarchy '{name}' ไม่ได้ compile กับลำดับจังหวัดของ df1")
+    if default_scheme not in hierarchies:
+        raise ValueError(f"ไม่พบแบบการแบ่งภาค '{default_scheme}'")
+
+    return SalesCube(
+        provinces=provinces,
+        province_eng=tuple(province_name_map.get(p) for p in provinces),
+        months=months,
+        values=values,
+        sales=sales,
+        national_total=national_total,
+        national_mean=to_baht(national_total) / max(n_prov, 1),
+        national_mom=_mom_pct(national_total, time.prev, axis=0, lead_in=national_lead_in),
+        order_desc=order_desc,
+        mom_order_asc=np.argsort(np.nan_to_num(mom, nan=0.0), axis=0, kind="stable").T,
+        region_schemes={name: build_rollup(h, sales, time, lead_in.get("province")) for name, h in hierarchies.items()},
+        default_scheme=default_scheme,
+        province_pos={p: i for i, p in enumerate(provinces)},
+        sums=sums,
+        time=time,
+        channels=build_subcube(df2, lead_in.get("channel")),
+        products=build_subcube(df3, lead_in.get("product_type")),
+        data_version=data_version,
+    )
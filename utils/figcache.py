@@ -0,0 +1,190 @@
+# utils/figcache.py
+# -*- coding: utf-8 -*-
+"""
+แคชรูปกราฟ Plotly ที่สร้างแล้ว (แชร์ทุก session ในโปรเซส, LRU จำกัดจำนวน)
+
+key ของรูป = FigureKey(chart, month, province, time_range, bar_kind, template, variant, data_version)
+builder ที่ตกแต่งด้วย @cached_figure("ชื่อกราฟ") ถูกเรียกแบบ build(cube, month=..., province=..., ...)
+- ฟิลด์ที่ builder ไม่ได้รับ = None ใน key (กราฟที่ไม่ขึ้นกับจังหวัดจึงใช้รูปเดียวกันทุกจังหวัด)
+- อาร์กิวเมนต์ที่ขึ้นต้นด้วย "_" ส่งให้ builder แต่ไม่นับใน key (เช่น _geojson)
+- data_version อ่านจาก cube เสมอ (ข้อมูลชุดใหม่ = key ใหม่)
+
+รูปที่เก็บในแคชผ่าน utils/payload.encode_figure แล้ว (OTOP_PAYLOAD_ENCODE)
+และเป็นอ็อบเจ็กต์เดียวกันทุก session — ห้ามแก้ไข
+hit / miss / เวลาสร้าง / ขนาดของแต่ละรูปแจ้ง utils/profiler.py (นับให้คอมโพเนนต์ที่กำลัง render)
+ขนาด JSON วัดครั้งเดียวตอนเก็บรูป (utils/payload.figure_nbytes) แล้วเก็บคู่กับรูปในแคช
+
+รูปที่ยังไม่มีในแคชถูกสร้างครั้งเดียวแม้หลาย session ขอพร้อมกัน (utils/singleflight.py):
+session ที่มาระหว่างสร้างรอผลของงานแรก (นับเป็น coalesced) — ลด CPU spike ตอนเปิดเดือนใหม่
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from utils.payload import encode_figure, figure_nbytes
+from utils.profiler import note_figure
+from utils.singleflight import SingleFlight
+from utils.settings import FIGURE_CACHE_ENTRIES, PAYLOAD_ENCODE
+
+
+class FigureKey(NamedTuple):
+    chart: str
+    month: Optional[str] = None
+    province: Optional[str] = None
+    time_range: Optional[str] = None
+    bar_kind: Optional[str] = None
+    template: Optional[str] = None
+    variant: Optional[str] = None
+    data_version: str = ""
+
+
+VIEW_FIELDS = frozenset(FigureKey._fields) - {"chart", "data_version"}
+
+
+class FigureCache:
+    """LRU ขนาดจำกัด + ตัวนับ hit / miss / eviction (รวมและแยกตามกราฟ)"""
+
+    def __init__(self, max_entries: int, coalesce: bool = True):
+        self.max_entries = max(1, int(max_entries))
+        self.coalesce = coalesce     # รูปที่กำลังสร้างอยู่: session อื่นที่ขอรูปเดียวกันรอผลแทนการสร้างซ้ำ
+        self._data: "OrderedDict[FigureKey, Tuple[Any, int]]" = OrderedDict()   # key -> (รูป, ขนาด JSON)
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.hits = self.misses = self.evictions = self.coalesced = 0
+        self.by_chart: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, chart: str, field: str) -> None:
+        c = self.by_chart.setdefault(chart, {"hits": 0, "misses": 0})
+        c[field] += 1
+
+    def get(self, key: FigureKey) -> Optional[Any]:
+        entry = self._hit(key)
+        return entry[0] if entry else None
+
+    def _hit(self, key: FigureKey) -> Optional[Tuple[Any, int]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            self._count(key.chart, "hits")
+            return entry
+
+    def reserve(self, entries: int) -> None:
+        """ขยายให้จุได้อย่างน้อย entries รูป (ไม่ลดขนาด) — utils/warmup.py ใช้ก่อนอุ่นทุก view"""
+        with self._lock:
+            self.max_entries = max(self.max_entries, int(entries))
+
+    def put(self, key: FigureKey, fig: Any, nbytes: Optional[int] = None) -> None:
+        entry = (fig, figure_nbytes(fig) if nbytes is None else nbytes)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_build(self, key: FigureKey, build: Callable[[], Any]) -> Any:
+        entry = self._hit(key)
+        if entry is not None:
+            note_figure(True, nbytes=entry[1])
+            return entry[0]
+        if not self.coalesce:
+            return self._build(key, build)[0]
+        entry, shared = self._flight.do(key, lambda: self._build(key, build))
+        if shared:
+            with self._lock:
+                self.coalesced += 1
+            note_figure(True, nbytes=entry[1])
+        return entry[0]
+
+    def _build(self, key: FigureKey, build: Callable[[], Any]) -> Tuple[Any, int]:
+        with self._lock:
+            # leader ก่อนหน้าอาจเก็บรูปเสร็จระหว่าง get() กับการเริ่มงานนี้
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                self._count(key.chart, "misses")
+        if entry is not None:
+            note_figure(True, nbytes=entry[1])
+            return entry
+        t0 = time.perf_counter()
+        fig = build()
+        build_ms = (time.perf_counter() - t0) * 1000.0
+        _local.builds = builds_in_thread() + 1
+        entry = (fig, figure_nbytes(fig))
+        note_figure(False, build_ms, entry[1])
+        self.put(key, *entry)
+        return entry
+
+    def __contains__(self, key: FigureKey) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def discard_version(self, data_version: str) -> int:
+        """ทิ้งรูปทั้งหมดของข้อมูลชุดหนึ่ง (เช่น ปีงบที่ถูกไล่ออกจากหน่วยความจำ) -> จำนวนที่ทิ้ง"""
+        with self._lock:
+            stale = [k for k in self._data if k.data_version == data_version]
+            for k in stale:
+                del self._data[k]
+            return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / total if total else 0.0,
+                "by_chart": {k: dict(v) for k, v in self.by_chart.items()},
+            }
+
+
+# จำนวนรูปที่แต่ละ thread สร้างจริง (cache miss ที่ตัวเองเป็นผู้สร้าง — hit / รอผลของคนอื่นไม่นับ)
+_local = threading.local()
+
+
+def builds_in_thread() -> int:
+    return getattr(_local, "builds", 0)
+
+
+# แคชเดียวของโปรเซส (โมดูลใน utils/ ไม่ถูก import ซ้ำทุก rerun)
+FIGURE_CACHE = FigureCache(FIGURE_CACHE_ENTRIES)
+
+
+def figure_key(chart: str, cube, view: Dict[str, Any]) -> FigureKey:
+    unknown = {k for k in view if not k.startswith("_")} - VIEW_FIELDS
+    if unknown:
+        raise TypeError(f"{chart}: อาร์กิวเมนต์ {sorted(unknown)} ไม่อยู่ใน FigureKey (ขึ้นต้นด้วย _ ถ้าไม่ใช่ส่วนของ key)")
+    return FigureKey(
+        chart=chart,
+        data_version=cube.data_version,
+        **{k: v for k, v in view.items() if k in VIEW_FIELDS},
+    )
+
+
+def cached_figure(chart: str) -> Callable:
+    def deco(build: Callable) -> Callable:
+        @functools.wraps(build)
+        def wrapper(cube, **view):
+            key = figure_key(chart, cube, view)
+            if PAYLOAD_ENCODE:
+                return FIGURE_CACHE.get_or_build(key, lambda: encode_figure(build(cube, **view), chart))
+            return FIGURE_CACHE.get_or_build(key, lambda: build(cube, **view))
+        wrapper.chart = chart
+        return wrapper
+    return deco
@@ -1,15 +1,95 @@
-def fmt_baht(v, no_prefix=False):
-    try:
-        v = float(v)
-    except:
-        return "-"
-    s = f"{v:,.0f}"
-    return s if no_prefix else f"฿{s}"
-
-def fmt_pct(x, digits=2):
-    if x is None:
-        return "—"
-    try:
-        return f"{x*100:.{digits}f}%"
-    except:
-        return "—"
+import functools
+
+import numpy as np
+
+# ------------------------------
+# ป้ายตัวเลขแบบ vectorized (ทั้ง array ในครั้งเดียว แทน f-string ทีละจุด)
+# ------------------------------
+_GROUP = np.array([str(i) for i in range(1000)])             # กลุ่มหน้าสุด (ไม่เติม 0)
+_GROUP3 = np.array([f"{i:03d}" for i in range(1000)])        # กลุ่มถัดไป (3 หลักเสมอ)
+LABEL_CACHE_SIZE = 1024
+
+
+def _thousands(n: np.ndarray) -> np.ndarray:
+    """จำนวนเต็มไม่ติดลบ -> สตริงมีจุลภาคคั่นหลักพัน (เทียบเท่า f"{n:,}")"""
+    out = np.where(n >= 1000, _GROUP3[n % 1000], _GROUP[n % 1000])
+    rest = n // 1000
+    while (rest > 0).any():
+        head = np.where(rest >= 1000, _GROUP3[rest % 1000], _GROUP[rest % 1000])
+        out = np.where(rest > 0, np.char.add(np.char.add(head, ","), out), out)
+        rest = rest // 1000
+    return out
+
+
+def _signed(rounded: np.ndarray, body: np.ndarray) -> np.ndarray:
+    return np.where(np.signbit(rounded), np.char.add("-", body), body)
+
+
+def _missing(v: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    return np.where(np.isfinite(v), labels, "-")
+
+
+_INT_LIMIT = 2.0 ** 62                           # |ค่า| ตั้งแต่นี้ int64 ไม่พอ -> ใช้ f-string ทีละตัว (หายากมาก)
+
+
+def _baht(v: np.ndarray) -> np.ndarray:
+    r = np.rint(v)                               # ปัดแบบ half-even เหมือน f"{v:,.0f}" (ไม่มีการคูณ -> ปัดครั้งเดียว)
+    big = np.isfinite(r) & (np.abs(r) >= _INT_LIMIT)
+    n = np.abs(np.nan_to_num(np.where(big, 0.0, r), nan=0.0, posinf=0.0, neginf=0.0)).astype(np.int64)
+    out = _missing(v, _signed(r, _thousands(n)))
+    if big.any():
+        wide = [f"{x:,.0f}" for x in v[big]]
+        out = out.astype(f"U{max(out.dtype.itemsize // 4, max(map(len, wide)))}")
+        out[big] = wide
+    return out
+
+
+def _pct(v: np.ndarray, digits: int) -> np.ndarray:
+    # printf ของ C ปัดจากค่าฐานสองจริงเหมือน f"{v:.2f}" (ไม่คูณ 10**digits แล้วปัดซ้ำ)
+    body = np.char.mod(f"%.{digits}f%%", np.nan_to_num(v, nan=0.0, posinf=0.0, neginf=0.0))
+    return _missing(v, body)
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def _labels_cached(kind: str, digits: int, raw: bytes, shape: tuple) -> np.ndarray:
+    v = np.frombuffer(raw, dtype=np.float64).reshape(shape)
+    out = _baht(v) if kind == "baht" else _pct(v, digits)
+    out.flags.writeable = False                  # แชร์จากแคช ห้ามแก้
+    return out
+
+
+def _key(values) -> tuple:
+    v = np.ascontiguousarray(values, dtype=np.float64)
+    return v.tobytes(), v.shape
+
+
+def baht_labels(values) -> np.ndarray:
+    """array ของป้ายยอดเงิน เช่น 1234567.4 -> "1,234,567" (ค่าว่าง/NaN -> "-")"""
+    raw, shape = _key(values)
+    return _labels_cached("baht", 0, raw, shape)
+
+
+def pct_labels(values, digits: int = 2) -> np.ndarray:
+    """array ของป้ายเปอร์เซ็นต์ (ค่าเป็น % อยู่แล้ว) เช่น 12.345 -> "12.35%" (NaN -> "-")"""
+    raw, shape = _key(values)
+    return _labels_cached("pct", digits, raw, shape)
+
+
+# ------------------------------
+# ตัวเดียว (ใช้ในข้อความ / KPI)
+# ------------------------------
+def fmt_baht(v, no_prefix=False):
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        return "-"
+    s = str(baht_labels([v])[0])
+    return s if no_prefix else f"฿{s}"
+
+def fmt_pct(x, digits=2):
+    if x is None:
+        return "—"
+    try:
+        return f"{x*100:.{digits}f}%"
+    except:
+        return "—"
@@ -0,0 +1,40 @@
+# utils/fragments.py
+# -*- coding: utf-8 -*-
+"""
+Fragment (st.fragment) พร้อมการประกาศ dependency ของ session state
+
+- view_fragment(name, reads=...): ห่อฟังก์ชันด้วย st.fragment และบันทึกว่า fragment นี้อ่าน key ใดบ้าง
+  ตัวคุมภายใน fragment เปลี่ยนค่า -> rerun เฉพาะ fragment นั้น (ไม่ rerun KPI / แผนที่ / ส่วนอื่น)
+- set_state(key, value, origin): ตัวคุมเขียนค่าลง session state ผ่านฟังก์ชันนี้
+  ถ้า fragment อื่น (ไม่ใช่ origin) ประกาศว่าอ่าน key นั้น จะสั่ง rerun ทั้งแอปเพื่อให้ค่าตรงกันทั้งหน้า
+"""
+import functools
+from typing import Any, Callable, Dict, Sequence, Tuple
+
+import streamlit as st
+
+# ชื่อ fragment -> session state keys ที่อ่าน (ลงทะเบียนตอน import)
+FRAGMENT_READS: Dict[str, Tuple[str, ...]] = {}
+
+_MISSING = object()
+
+
+def view_fragment(name: str, reads: Sequence[str] = ()) -> Callable:
+    def deco(fn: Callable) -> Callable:
+        FRAGMENT_READS[name] = tuple(reads)
+        return functools.wraps(fn)(st.fragment(fn))
+    return deco
+
+
+def readers_of(key: str) -> Tuple[str, ...]:
+    return tuple(n for n, keys in FRAGMENT_READS.items() if key in keys)
+
+
+def set_state(key: str, value: Any, origin: str) -> None:
+    """เขียนค่าตัวคุม; ค่าเปลี่ยนและมี fragment อื่นอ่าน key นี้ -> rerun ทั้งแอป"""
+    old = st.session_state.get(key, _MISSING)
+    st.session_state[key] = value
+    if old is _MISSING or old == value:
+        return
+    if any(n != origin for n in readers_of(key)):
+        st.rerun(scope="app")
@@ -0,0 +1,93 @@
+# utils/frames.py
+# -*- coding: utf-8 -*-
+"""
+ตารางแบบยาว (long-form) ที่ประหยัดหน่วยความจำ + รายงานขนาดต่อตาราง
+
+- long_frame: เมทริกซ์กว้าง (แถว × คอลัมน์) -> ตารางยาว โดยมิติเป็น categorical
+  (เก็บรหัส int8/int16 ต่อแถว + ชื่อไทยแค่ครั้งเดียวต่อค่า แทน object string ซ้ำทุกแถว)
+  มิติเดือนเป็น ordered categorical ตามลำดับเวลา (sort / filter ช่วงเดือนได้ตรง ๆ)
+- compact_measure: จำนวนเงิน (สตางค์) คง int64; ค่าอัตราส่วน/เปอร์เซ็นต์ลดเป็น float32
+- frame_memory / memory_report: ขนาดจริง (deep) ของแต่ละตาราง สำหรับ log ตอนโหลดข้อมูล
+
+สร้างรหัสด้วย np.repeat / np.tile ตรง ๆ ไม่ผ่าน DataFrame.melt (ไม่มีสตริงชั่วคราวทุกแถว)
+"""
+import logging
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+
+def categorical(codes: np.ndarray, categories: Sequence, ordered: bool = False) -> pd.Categorical:
+    """รหัส (0..n-1) + ค่าของแต่ละรหัส -> Categorical (ไม่แปลงผ่านสตริงทุกแถว)"""
+    return pd.Categorical.from_codes(np.asarray(codes), categories=pd.Index(list(categories)), ordered=ordered)
+
+
+def compact_measure(values: np.ndarray) -> np.ndarray:
+    a = np.asarray(values)
+    if a.dtype.kind in "iu":
+        return a.astype(np.int64, copy=False)
+    return a.astype(np.float32)
+
+
+def long_frame(
+    matrix: np.ndarray,
+    rows: Sequence,
+    cols: Sequence,
+    row_name: str,
+    col_name: str,
+    value_name: str,
+    ordered_rows: bool = False,
+    ordered_cols: bool = False,
+    col_major: bool = True,
+    measure=compact_measure,
+) -> pd.DataFrame:
+    """
+    matrix (len(rows), len(cols)) -> ตาราง [row_name, col_name, value_name] ยาว len(rows) × len(cols)
+    col_major=True เรียงแบบ DataFrame.melt (คอลัมน์เป็นวงนอก) / False = แถวเป็นวงนอก
+    measure = ฟังก์ชันแปลง dtype ของค่า (ค่าเริ่มต้น compact_measure)
+    """
+    m = np.asarray(matrix)
+    n_rows, n_cols = m.shape
+    if col_major:
+        r, c, v = np.tile(np.arange(n_rows), n_cols), np.repeat(np.arange(n_cols), n_rows), m.T.ravel()
+    else:
+        r, c, v = np.repeat(np.arange(n_rows), n_cols), np.tile(np.arange(n_cols), n_rows), m.ravel()
+    return pd.DataFrame({
+        row_name: categorical(r, rows, ordered_rows),
+        col_name: categorical(c, cols, ordered_cols),
+        value_name: measure(v),
+    })
+
+
+def with_mapped_category(df: pd.DataFrame, source: str, name: str, mapping: Mapping) -> pd.DataFrame:
+    """เพิ่มคอลัมน์ categorical ที่ map จากหมวดของคอลัมน์ source (map แค่ categories ไม่ใช่ทุกแถว)"""
+    cats = df[source].cat.categories
+    mapped = [mapping.get(x) for x in cats]
+    uniq = list(dict.fromkeys(x for x in mapped if x is not None))
+    pos = {x: i for i, x in enumerate(uniq)}
+    lut = np.array([pos.get(x, -1) for x in mapped] + [-1], dtype=np.int32)   # รหัส -1 (NaN) -> -1
+    df[name] = categorical(lut[df[source].cat.codes.to_numpy()], uniq)
+    return df
+
+
+# ------------------------------
+# รายงานขนาด
+# ------------------------------
+def frame_memory(df: pd.DataFrame) -> int:
+    """ขนาดจริงเป็น byte (รวม index และสตริงใน object/category)"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(frames: Mapping[str, pd.DataFrame], label: Optional[str] = None) -> Dict[str, int]:
+    """{ชื่อ: byte} ของทุกตาราง + log บรรทัดเดียว"""
+    sizes = {name: frame_memory(df) for name, df in frames.items()}
+    log.info(
+        "memory %s: %s (รวม %.1f KB)",
+        label or "frames",
+        ", ".join(f"{k}={v / 1024:.1f} KB" for k, v in sizes.items()),
+        sum(sizes.values()) / 1024,
+    )
+    return sizes
@@ -0,0 +1,339 @@
+# utils/geo.py
+# -*- coding: utf-8 -*-
+"""
+เรขาคณิตจังหวัดสำหรับแผนที่: ลดรายละเอียดแบบรักษา topology + quantize พิกัด + แคชบนดิสก์
+
+ระดับรายละเอียด (level) ยิ่งมากยิ่งเบา:
+    0 = ละเอียดสุด (quantize 5 ตำแหน่ง ~1 ม.)  ...  3 = เบาสุด   (level_for_zoom เลือกตาม zoom ของแผนที่)
+
+ลำดับการหาไฟล์ของ level ที่ต้องการ:
+    1) assets/geo/thailand_l{n}.json          (ไฟล์ที่ bundle มากับ repo ถ้ามี)
+    2) <cache>/thailand_l{n}.json             (แคชบนดิสก์, env OTOP_GEO_CACHE)
+    3) ดาวน์โหลดต้นฉบับ (มี timeout) -> สร้างทุก level -> เขียนลงแคช
+
+สร้างไฟล์ bundle เอง:
+    python -m utils.geo --source thailand.json --out assets/geo
+
+ขอบเขตอำเภอ (drill-down): แยกไฟล์รายจังหวัด x ทุก level — โหลดเฉพาะจังหวัดที่เลือก ไม่ใช่ ~900 อำเภอทั้งประเทศ
+    python -m utils.geo --districts amphoe.json --province-key pro_en --name-key amp_th --out assets/geo
+    -> assets/geo/districts/<province>_l{n}.json   (properties.name = ชื่ออำเภอตามตารางยอดขาย)
+    ไม่มีแหล่งดาวน์โหลดอัตโนมัติ: ไม่มีไฟล์ = แสดงยอดรายอำเภอแบบกราฟแท่งอย่างเดียว
+
+เสิร์ฟแบบ static (server.enableStaticServing ใน .streamlit/config.toml):
+    publish_level() คัดลอก level ไปไว้ที่ static/geo/ แล้วคืน URL "app/static/geo/..."
+    กราฟอ้าง geometry ด้วย URL แทนการฝังทั้งก้อน — browser โหลดครั้งเดียวแล้วใช้แคช HTTP
+    ทุกเดือน/ทุก rerun ส่งแค่ค่าของแต่ละจังหวัด (ไม่พึ่ง tile server ภายนอก)
+"""
+import argparse
+import json
+import math
+import os
+import re
+import tempfile
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+GEOJSON_URL = "https://raw.githubusercontent.com/apisit/thailand.json/master/thailand.json"
+FETCH_TIMEOUT = 10  # วินาที
+
+BUNDLED_DIR = Path(__file__).resolve().parent.parent / "assets" / "geo"
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static" / "geo"
+STATIC_URL = "app/static/geo"   # Streamlit เสิร์ฟ <app>/static/* ที่ /app/static/*
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "otop-dashboard" / "geo"
+
+# level -> (ค่าความคลาดเคลื่อน Douglas-Peucker เป็นองศา, จำนวนทศนิยมหลัง quantize)
+LEVELS: Dict[int, Tuple[float, int]] = {
+    0: (0.0, 5),
+    1: (0.002, 4),
+    2: (0.01, 3),
+    3: (0.03, 3),
+}
+
+# ขนาด tile ที่ zoom ของแผนที่อ้างถึง: Mapbox GL (plotly scattermapbox / choroplethmapbox) ใช้ 512 px
+# (tile 256 px ของ raster รุ่นเก่านับ zoom เพิ่มอีก 1 — ใช้ 256 จะได้ level หยาบกว่าที่จอแสดงจริงหนึ่งขั้น)
+TILE_SIZE = 512.0
+
+# properties ที่แผนที่ใช้จริง (featureidkey="properties.name")
+KEEP_PROPERTIES = ("name",)
+
+
+def cache_dir() -> Path:
+    return Path(os.environ.get("OTOP_GEO_CACHE", DEFAULT_CACHE_DIR))
+
+
+def level_file(level: int) -> str:
+    return f"thailand_l{level}.json"
+
+
+def district_file(province: str, level: int) -> str:
+    slug = re.sub(r"[^0-9A-Za-z]+", "_", province).strip("_").lower() or "province"
+    return f"districts/{slug}_l{level}.json"
+
+
+def level_for_zoom(zoom: float, max_error_px: float = 0.5) -> int:
+    """
+    level ที่เบาที่สุดซึ่งความคลาดเคลื่อนยังไม่เกิน max_error_px พิกเซลที่ zoom นี้
+    (Web Mercator; zoom ของ Mapbox GL / MapLibre นับ tile TILE_SIZE px — ทั้งโลก = TILE_SIZE * 2**zoom px)
+    """
+    deg_per_px = 360.0 / (TILE_SIZE * 2.0 ** zoom)
+    ok = [lv for lv, (tol, _) in LEVELS.items() if tol <= deg_per_px * max_error_px]
+    return max(ok) if ok else 0
+
+
+# ------------------------------
+# Douglas-Peucker
+# ------------------------------
+def _dp_keep(pts: np.ndarray, tol: float) -> np.ndarray:
+    """mask ของจุดที่เก็บไว้ (เก็บจุดปลายทั้งสองเสมอ)"""
+    n = len(pts)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    if n < 3 or tol <= 0:
+        keep[:] = True
+        return keep
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = pts[b] - pts[a]
+        rel = pts[a + 1:b] - pts[a]
+        norm = math.hypot(seg[0], seg[1])
+        if norm == 0:
+            d = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            d = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / norm
+        i = int(np.argmax(d))
+        if d[i] > tol:
+            m = a + 1 + i
+            keep[m] = True
+            stack.append((a, m))
+            stack.append((m, b))
+    return keep
+
+
+# ------------------------------
+# Topology-preserving simplification
+# ------------------------------
+Point = Tuple[float, float]
+
+
+def _quantize_ring(ring: Sequence[Sequence[float]], decimals: int) -> List[Point]:
+    out: List[Point] = []
+    for x, y, *_ in ring:
+        p = (round(float(x), decimals), round(float(y), decimals))
+        if not out or out[-1] != p:
+            out.append(p)
+    if len(out) > 1 and out[0] == out[-1]:
+        out.pop()  # เก็บแบบเปิด (ไม่ซ้ำจุดแรกท้ายวง) ระหว่างประมวลผล
+    return out
+
+
+def _iter_polygons(geometry: dict):
+    if geometry["type"] == "Polygon":
+        yield geometry["coordinates"]
+    elif geometry["type"] == "MultiPolygon":
+        yield from geometry["coordinates"]
+
+
+def simplify_feature_collection(fc: dict, tolerance: float, decimals: int) -> dict:
+    """
+    ลดรายละเอียดทั้ง FeatureCollection โดยเส้นแบ่งเขตที่ใช้ร่วมกันถูกลดแบบเดียวกันทั้งสองฝั่ง
+    (แยกวงเป็น arc ตรงจุดที่ชุดของวงที่ใช้จุดนั้นเปลี่ยน แล้ว simplify แต่ละ arc ครั้งเดียว)
+    """
+    # 1) quantize ทุกวงก่อน เพื่อให้จุดที่ใช้ร่วมกันเท่ากันพอดี
+    rings: List[List[Point]] = []
+    layout = []  # ต่อ feature: list ของ polygon, แต่ละ polygon = list ของ ring id
+    for feat in fc.get("features", []):
+        polys = []
+        for poly in _iter_polygons(feat.get("geometry") or {"type": None}):
+            ids = []
+            for ring in poly:
+                q = _quantize_ring(ring, decimals)
+                if len(q) >= 3:
+                    ids.append(len(rings))
+                    rings.append(q)
+            if ids:
+                polys.append(ids)
+        layout.append(polys)
+
+    # 2) จุด -> ชุดของวงที่ใช้จุดนั้น
+    members: Dict[Point, set] = {}
+    for rid, ring in enumerate(rings):
+        for p in ring:
+            members.setdefault(p, set()).add(rid)
+
+    # 3) simplify ทีละ arc (cache ด้วย key ที่ไม่ขึ้นกับทิศทาง)
+    arc_cache: Dict[Tuple[Point, ...], Tuple[Point, ...]] = {}
+
+    def simplify_arc(arc: List[Point]) -> List[Point]:
+        key = tuple(arc)
+        rkey = key[::-1]
+        canon, flipped = (key, False) if key <= rkey else (rkey, True)
+        if canon not in arc_cache:
+            pts = np.asarray(canon, dtype=float)
+            arc_cache[canon] = tuple(canon[i] for i in np.flatnonzero(_dp_keep(pts, tolerance)))
+        out = arc_cache[canon]
+        return list(out[::-1] if flipped else out)
+
+    new_rings: List[Optional[List[Point]]] = []
+    for ring in rings:
+        n = len(ring)
+        m = [frozenset(members[p]) for p in ring]
+        breaks = [i for i in range(n) if m[i] != m[i - 1] or m[i] != m[(i + 1) % n]]
+        if not breaks:
+            # วงที่ไม่มีจุดแยก (เกาะ / วงที่ซ้อนพอดีกับอีกวง): ตัดเป็นสอง arc ที่จุดน้อยสุด
+            # กับจุดที่ไกลจากจุดนั้นที่สุด — เลือกจากชุดจุด จึงได้ arc เดียวกันทุกวงที่ใช้จุดชุดนี้
+            pts = np.asarray(ring, dtype=float)
+            first = min(range(n), key=ring.__getitem__)
+            far = int(np.argmax(np.hypot(*(pts - pts[first]).T)))
+            breaks = sorted({first, far})
+        out: List[Point] = []
+        for k, start in enumerate(breaks):
+            end = breaks[(k + 1) % len(breaks)]
+            idx = list(range(start, end + 1)) if end > start else list(range(start, n)) + list(range(0, end + 1))
+            out.extend(simplify_arc([ring[i] for i in idx])[:-1])
+        new_rings.append(out if len(out) >= 3 else None)
+
+    # 4) ประกอบกลับเป็น GeoJSON (วงปิด, ตัดวงที่ยุบหายไป ยกเว้นวงนอกที่ต้องมีเสมอ)
+    features = []
+    for feat, polys in zip(fc.get("features", []), layout):
+        out_polys = []
+        for ids in polys:
+            shell = new_rings[ids[0]] or rings[ids[0]]
+            poly = [shell + shell[:1]]
+            poly += [r + r[:1] for r in (new_rings[i] for i in ids[1:]) if r]
+            out_polys.append([[list(p) for p in r] for r in poly])
+        props = {k: v for k, v in (feat.get("properties") or {}).items() if k in KEEP_PROPERTIES}
+        if len(out_polys) == 1:
+            geom = {"type": "Polygon", "coordinates": out_polys[0]}
+        else:
+            geom = {"type": "MultiPolygon", "coordinates": out_polys}
+        features.append({"type": "Feature", "properties": props, "geometry": geom})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _dumps(fc: dict) -> str:
+    return json.dumps(fc, ensure_ascii=False, separators=(",", ":"))
+
+
+def _write_text(path: Path, data: str) -> None:
+    """เขียนผ่านไฟล์ชั่วคราวแล้ว rename (ผู้อ่านไม่เห็นไฟล์ครึ่ง ๆ)
+
+    ชื่อไฟล์ชั่วคราวไม่ซ้ำกัน (mkstemp) — หลาย worker publish ไฟล์เดียวกันพร้อมกันได้โดยไม่เขียนทับกัน
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def build_levels(fc: dict, out_dir: Path) -> Dict[int, Path]:
+    """สร้างไฟล์ทุก level จากต้นฉบับ แล้วเขียนลง out_dir"""
+    paths = {}
+    for level, (tol, decimals) in LEVELS.items():
+        path = out_dir / level_file(level)
+        _write_text(path, _dumps(simplify_feature_collection(fc, tol, decimals)))
+        paths[level] = path
+    return paths
+
+
+def build_district_levels(
+    fc: dict, out_dir: Path, province_key: str = "province", name_key: str = "name"
+) -> Dict[str, Dict[int, Path]]:
+    """ต้นฉบับขอบเขตอำเภอทั้งประเทศ -> ไฟล์รายจังหวัดทุก level ({จังหวัด: {level: path}})"""
+    groups: Dict[str, List[dict]] = {}
+    for feat in fc.get("features", []):
+        props = feat.get("properties") or {}
+        province, name = props.get(province_key), props.get(name_key)
+        if province is None or name is None:
+            continue
+        groups.setdefault(str(province), []).append(
+            {"type": "Feature", "properties": {"name": str(name)}, "geometry": feat.get("geometry")}
+        )
+    paths: Dict[str, Dict[int, Path]] = {}
+    for province, feats in groups.items():
+        sub = {"type": "FeatureCollection", "features": feats}
+        for level, (tol, decimals) in LEVELS.items():
+            path = out_dir / district_file(province, level)
+            _write_text(path, _dumps(simplify_feature_collection(sub, tol, decimals)))
+            paths.setdefault(province, {})[level] = path
+    return paths
+
+
+def fetch_source(url: str = GEOJSON_URL, timeout: float = FETCH_TIMEOUT) -> dict:
+    with urllib.request.urlopen(url, timeout=timeout) as r:
+        return json.load(r)
+
+
+def read_level(level: int) -> dict:
+    """อ่าน GeoJSON ของ level ที่ต้องการ (bundle -> แคช -> ดาวน์โหลดแล้วสร้างแคช)"""
+    for base in (BUNDLED_DIR, cache_dir()):
+        path = base / level_file(level)
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+    paths = build_levels(fetch_source(), cache_dir())
+    with open(paths[level], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_district_level(province: str, level: int) -> Optional[dict]:
+    """ขอบเขตอำเภอของจังหวัดเดียว (bundle -> แคช); ไม่มีไฟล์ -> None"""
+    for base in (BUNDLED_DIR, cache_dir()):
+        path = base / district_file(province, level)
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+    return None
+
+
+def publish(name: str, fc: dict, out_dir: Path = STATIC_DIR) -> str:
+    """เขียน GeoJSON ลงโฟลเดอร์ static (ถ้ายังไม่มี / เนื้อหาเปลี่ยน) แล้วคืน URL แบบ relative"""
+    data = _dumps(fc)
+    path = out_dir / name
+    if not path.exists() or path.read_text(encoding="utf-8") != data:
+        _write_text(path, data)
+    return f"{STATIC_URL}/{name}"
+
+
+def publish_level(level: int, fc: Optional[dict] = None, out_dir: Path = STATIC_DIR) -> str:
+    return publish(level_file(level), fc if fc is not None else read_level(level), out_dir)
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="สร้างไฟล์ GeoJSON หลายระดับรายละเอียดสำหรับแผนที่")
+    ap.add_argument("--source", type=Path, default=None, help="ไฟล์ GeoJSON ต้นฉบับ (ไม่ระบุ = ดาวน์โหลด)")
+    ap.add_argument("--districts", type=Path, default=None, help="GeoJSON ขอบเขตอำเภอทั้งประเทศ (แยกไฟล์รายจังหวัด)")
+    ap.add_argument("--province-key", default="province", help="property ที่เป็นชื่อจังหวัด (อังกฤษ ตรงกับแผนที่จังหวัด)")
+    ap.add_argument("--name-key", default="name", help="property ที่เป็นชื่ออำเภอ (ตรงกับตารางยอดขายรายอำเภอ)")
+    ap.add_argument("--out", type=Path, default=BUNDLED_DIR)
+    args = ap.parse_args(argv)
+
+    if args.districts:
+        with open(args.districts, encoding="utf-8") as f:
+            fc = json.load(f)
+        paths = build_district_levels(fc, args.out, args.province_key, args.name_key)
+        size = sum(p.stat().st_size for levels in paths.values() for p in levels.values())
+        print(f"อำเภอ {len(paths)} จังหวัด x {len(LEVELS)} level: {args.out / 'districts'} ({size / 1024:,.0f} KB)")
+        return
+    if args.source:
+        with open(args.source, encoding="utf-8") as f:
+            fc = json.load(f)
+    else:
+        fc = fetch_source()
+    for level, path in build_levels(fc, args.out).items():
+        print(f"level {level}: {path} ({path.stat().st_size / 1024:,.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
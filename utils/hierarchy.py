@@ -0,0 +1,112 @@
+# utils/hierarchy.py
+# -*- coding: utf-8 -*-
+"""
+ลำดับชั้นพื้นที่ (ภาค -> จังหวัด, และต่อไป จังหวัด -> อำเภอ) แบบ compile ครั้งเดียว
+
+- Hierarchy: เมทริกซ์สมาชิก (กลุ่ม × ใบ) ค่า 0/1 + รหัสกลุ่มของแต่ละใบ
+  ยอดรวมทุกกลุ่ม × ทุกเดือน = indicator @ values (matrix product ครั้งเดียว)
+  หากลุ่มของใบ = dict lookup + array index (O(1))
+- การแบ่งกลุ่มหลายแบบ (6 ภาค / 4 ภาค / ...) อ่านจาก data/hierarchies.json ไม่ต้องแก้โค้ด
+
+เมทริกซ์เก็บแบบ dense: ใบ ~900 อำเภอ × กลุ่มหลักสิบ ยังเล็กมาก และ numpy matmul เร็วกว่า sparse ที่ขนาดนี้
+"""
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+HIERARCHY_FILE = Path(__file__).resolve().parent.parent / "data" / "hierarchies.json"
+
+
+@dataclass(frozen=True)
+class Hierarchy:
+    name: str
+    label: str
+    groups: Tuple[str, ...]          # เฉพาะกลุ่มที่มีใบอยู่ในข้อมูล (ตามลำดับในไฟล์)
+    leaves: Tuple[str, ...]          # ใบตามลำดับแถวของข้อมูล
+    indicator: np.ndarray            # (G, L) 1.0 = ใบอยู่ในกลุ่ม
+    leaf_group: np.ndarray           # (L,) ดัชนีกลุ่มหลักของใบ (-1 = ไม่อยู่ในกลุ่มใด)
+    group_pos: Dict[str, int]
+    leaf_pos: Dict[str, int]
+
+    def rollup(self, values: np.ndarray) -> np.ndarray:
+        """ยอดรวมต่อกลุ่ม: values (L, ...) -> (G, ...); จำนวนเต็ม (สตางค์) รวมแบบจำนวนเต็ม ไม่ผ่าน float"""
+        values = np.asarray(values)
+        if values.dtype.kind in "iu":
+            return np.tensordot(self.indicator.astype(np.int64), values.astype(np.int64), axes=(1, 0))
+        return np.tensordot(self.indicator, values.astype(float), axes=(1, 0))
+
+    def group_index(self, leaf: Optional[str]) -> int:
+        i = self.leaf_pos.get(leaf) if leaf else None
+        return -1 if i is None else int(self.leaf_group[i])
+
+    def group_of(self, leaf: Optional[str]) -> str:
+        g = self.group_index(leaf)
+        return "" if g < 0 else self.groups[g]
+
+    def members(self, group: str) -> Tuple[str, ...]:
+        g = self.group_pos.get(group)
+        if g is None:
+            return ()
+        return tuple(self.leaves[i] for i in np.flatnonzero(self.indicator[g]))
+
+
+def compile_hierarchy(
+    name: str,
+    groups: Mapping[str, Sequence[str]],
+    leaves: Sequence[str],
+    label: str = "",
+) -> Hierarchy:
+    """compile {กลุ่ม: [ใบ...]} เทียบกับใบในข้อมูล (ใบที่ไม่มีในข้อมูล/กลุ่มที่ว่างถูกข้าม)"""
+    leaves = tuple(str(x) for x in leaves)
+    leaf_pos = {x: i for i, x in enumerate(leaves)}
+    kept: List[str] = []
+    rows: List[np.ndarray] = []
+    for group, members in groups.items():
+        idx = [leaf_pos[m] for m in members if m in leaf_pos]
+        if not idx:
+            continue
+        row = np.zeros(len(leaves))
+        row[idx] = 1.0
+        kept.append(group)
+        rows.append(row)
+    indicator = np.vstack(rows) if rows else np.zeros((0, len(leaves)))
+
+    # กลุ่มหลักของใบ = กลุ่มแรกที่มีใบนั้น
+    leaf_group = np.full(len(leaves), -1, dtype=int)
+    if len(kept):
+        member = indicator.any(axis=0)
+        leaf_group[member] = indicator[:, member].argmax(axis=0)
+
+    return Hierarchy(
+        name=name,
+        label=label or name,
+        groups=tuple(kept),
+        leaves=leaves,
+        indicator=indicator,
+        leaf_group=leaf_group,
+        group_pos={g: i for i, g in enumerate(kept)},
+        leaf_pos=leaf_pos,
+    )
+
+
+def load_hierarchy_specs(path: Path = HIERARCHY_FILE) -> Tuple[str, Dict[str, dict]]:
+    """อ่านไฟล์ลำดับชั้น -> (ชื่อค่าเริ่มต้น, {ชื่อ: {"label", "groups"}})"""
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    hierarchies = spec.get("hierarchies") or {}
+    if not hierarchies:
+        raise ValueError(f"{path.name}: ไม่มี hierarchies")
+    default = spec.get("default") or next(iter(hierarchies))
+    if default not in hierarchies:
+        raise ValueError(f"{path.name}: default '{default}' ไม่อยู่ใน hierarchies")
+    return default, hierarchies
+
+
+def compile_all(specs: Mapping[str, dict], leaves: Sequence[str]) -> Dict[str, Hierarchy]:
+    return {
+        name: compile_hierarchy(name, s["groups"], leaves, s.get("label", ""))
+        for name, s in specs.items()
+    }
@@ -0,0 +1,98 @@
+# utils/ingest.py
+# -*- coding: utf-8 -*-
+"""
+แปลงตารางต้นทาง (CSV) เป็นคลังข้อมูลคอลัมน์ (utils/store.py)
+
+ใช้งาน:
+    python -m utils.ingest                       # อ่าน data/raw/*.csv -> data/store/
+    python -m utils.ingest --province p.csv --channel c.csv --product-type t.csv --store /path/to/store
+    python -m utils.ingest --province p66.csv p67.csv --channel c66.csv c67.csv ...   # หลายปี หลายไฟล์
+    python -m utils.ingest --district d.csv ...  # ยอดรายอำเภอ (ไม่บังคับ; คอลัมน์ จังหวัด, อำเภอ, <เดือน...>)
+
+ตารางถูกแบ่งเป็น partition รายปีงบอัตโนมัติตอนเขียน (utils/store.py)
+จำนวนเงินถูกอ่านจากข้อความเป็นสตางค์ (int64) ตรง ๆ ไม่ผ่าน float (utils/money.py)
+"""
+import argparse
+from pathlib import Path
+from typing import Dict, Sequence, Tuple, Union
+
+import pandas as pd
+
+from utils.money import parse_satang
+from utils.store import store_dir, write_store
+
+RAW_DIR = Path(__file__).resolve().parent.parent / "data" / "raw"
+
+# ตาราง -> (ไฟล์ต้นทางเริ่มต้น, คอลัมน์ที่ใช้เป็น index)
+SOURCES = {
+    "province": ("province.csv", "จังหวัด"),
+    "channel": ("channel.csv", "เดือน"),
+    "product_type": ("product_type.csv", "เดือน"),
+    "district": ("district.csv", ("จังหวัด", "อำเภอ")),
+}
+# ตารางที่ไม่บังคับ (ไม่มีไฟล์ = ข้าม) และตารางที่แกนเดือนเป็น columns
+OPTIONAL = frozenset({"district"})
+MONTHS_IN_COLUMNS = frozenset({"province", "district"})
+
+IndexCol = Union[str, Tuple[str, ...]]
+
+
+def read_source(path: Path, index_col: IndexCol) -> pd.DataFrame:
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    cols = [index_col] if isinstance(index_col, str) else list(index_col)
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path.name} ต้องมีคอลัมน์ {', '.join(repr(c) for c in missing)}")
+    df = df.set_index(cols[0] if len(cols) == 1 else cols)
+    try:
+        satang = parse_satang(df.to_numpy())
+    except ValueError as e:
+        raise ValueError(f"{path.name}: {e}") from None
+    return pd.DataFrame(satang, index=df.index, columns=df.columns)
+
+
+def read_sources(paths: Sequence[Path], index_col: IndexCol, months_in_columns: bool = False) -> pd.DataFrame:
+    """หลายไฟล์ (เช่น ไฟล์ละปี) -> ตารางเดียว ต่อกันตามแกนเดือน (months_in_columns: columns, ไม่งั้น index)"""
+    frames = [read_source(p, index_col) for p in paths]
+    if len(frames) == 1:
+        return frames[0]
+    axis = 1 if months_in_columns else 0
+    df = pd.concat(frames, axis=axis)
+    if axis == 1:
+        return df.loc[:, ~df.columns.duplicated(keep="last")]
+    return df.loc[~df.index.duplicated(keep="last")]
+
+
+def ingest(paths: Dict[str, Union[None, Path, Sequence[Path]]], root: Path) -> Path:
+    tables = {}
+    for name in SOURCES:
+        p = paths.get(name)
+        files = [] if p is None else [p] if isinstance(p, Path) else list(p)
+        if name in OPTIONAL:
+            files = [f for f in files if f.exists()]
+            if not files:
+                continue
+        tables[name] = read_sources(files, SOURCES[name][1], name in MONTHS_IN_COLUMNS)
+    return write_store(tables, root)
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="แปลง CSV ต้นทางเป็นคลังข้อมูล .npy + manifest")
+    ap.add_argument("--province", type=Path, nargs="+", default=[RAW_DIR / SOURCES["province"][0]])
+    ap.add_argument("--channel", type=Path, nargs="+", default=[RAW_DIR / SOURCES["channel"][0]])
+    ap.add_argument("--product-type", type=Path, nargs="+", default=[RAW_DIR / SOURCES["product_type"][0]])
+    ap.add_argument("--district", type=Path, nargs="*", default=[RAW_DIR / SOURCES["district"][0]],
+                    help="ยอดรายอำเภอ (ไม่บังคับ; ไม่มีไฟล์ = ข้าม)")
+    ap.add_argument("--store", type=Path, default=None, help="ไดเรกทอรีคลังข้อมูล (ค่าเริ่มต้น data/store)")
+    args = ap.parse_args(argv)
+
+    snap = ingest(
+        {"province": args.province, "channel": args.channel, "product_type": args.product_type,
+         "district": args.district},
+        args.store or store_dir(),
+    )
+    print(f"เขียน snapshot แล้ว: {snap}")
+
+
+if __name__ == "__main__":
+    main()
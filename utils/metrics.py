@@ -0,0 +1,294 @@
+# utils/metrics.py
+# -*- coding: utf-8 -*-
+"""
+ตัวเลขระดับโปรเซสสำหรับทีมดูแลระบบ ในรูปแบบข้อความของ Prometheus (ไม่ต้องพึ่งบริการภายนอก)
+
+ส่งออกได้สองทาง (เปิดอย่างใดอย่างหนึ่งหรือทั้งคู่ — start_exporter() เรียกจาก app.py ครั้งเดียวต่อโปรเซส):
+- OTOP_METRICS_FILE=/var/lib/node_exporter/otop.prom : แต่ละโปรเซสเขียนทับไฟล์ของตัวเอง otop.<pid>.prom
+  ทุก OTOP_METRICS_INTERVAL วินาที (atomic; ชี้เป็นโฟลเดอร์ -> <โฟลเดอร์>/otop.<pid>.prom) และลบทิ้งตอนปิดโปรเซส
+  ใช้กับ textfile collector ของ node_exporter (อ่านทุก *.prom) หรือ cat ดูเองได้
+- OTOP_METRICS_PORT=9464 : HTTP /metrics ใน thread ของโปรเซสเดียวกัน (ผูก OTOP_METRICS_ADDR, ค่าเริ่มต้น 127.0.0.1)
+  หลาย worker บนเครื่องเดียวกัน: worker ถัดไปใช้พอร์ตว่างถัดไปภายใน OTOP_METRICS_PORT_SPAN พอร์ต
+
+ทุก sample มี label pid="<pid>" — หลาย worker ไม่ทับกัน รวมกันเองด้วย sum() / max() ฝั่ง Prometheus
+
+ตัวเลข (render_metrics):
+- session: ที่ rerun ภายใน SESSION_WINDOW_S วินาทีล่าสุด (นับจาก note_rerun เอง ไม่พึ่ง API ภายในของ streamlit)
+- rerun: ตัวนับสะสม + อัตราต่อวินาทีในหน้าต่าง RATE_WINDOW_S วินาทีล่าสุด
+- หน่วยความจำ: RSS ของโปรเซส และ RSS / session ที่ใช้งาน
+- แคชรูป (utils/figcache.py) และแคชปีงบ (YEAR_DATA ใน utils/data.py): จำนวน, hit / miss / load, eviction,
+  คำขอที่รอรูปเดียวกันที่กำลังสร้าง (coalesced)
+- เวลาโหลด GeoJSON (histogram แยก kind: province / static / district) — วัดใน loader ของ utils/data.py
+- p50 / p95 ต่อคอมโพเนนต์จาก utils/profiler.py (เมื่อ OTOP_PROFILE=1)
+
+counter เป็นค่าสะสมตั้งแต่เริ่มโปรเซส — ให้ Prometheus คำนวณ rate() เอง
+"""
+import atexit
+import contextlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Sequence, Tuple
+
+from utils.procmem import rss_mb
+from utils.settings import METRICS_ADDR, METRICS_FILE, METRICS_INTERVAL, METRICS_PORT, METRICS_PORT_SPAN
+
+log = logging.getLogger(__name__)
+
+SESSION_WINDOW_S = 300       # session ที่ไม่ rerun นานกว่านี้ไม่นับว่าใช้งานอยู่
+RATE_WINDOW_S = 60           # หน้าต่างของ otop_reruns_per_second
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ------------------------------
+# ตัวนับของโมดูลนี้
+# ------------------------------
+class Histogram:
+    """histogram แบบ Prometheus (bucket สะสม) แยกตาม label เดียว"""
+
+    def __init__(self, label: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._data: Dict[str, List[float]] = {}     # ค่า label -> [count ต่อ bucket..., +Inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label: str) -> None:
+        with self._lock:
+            row = self._data.setdefault(label, [0.0] * (len(self.buckets) + 2))
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    row[i] += 1
+            row[-2] += 1
+            row[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, label: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, label)
+
+    def lines(self, name: str) -> List[str]:
+        with self._lock:
+            data = {k: list(v) for k, v in self._data.items()}
+        out = []
+        for value, row in sorted(data.items()):
+            lab = f'{_process_label()},{self.label}="{_escape(value)}"'
+            for b, n in zip(self.buckets, row):
+                out.append(f'{name}_bucket{{{lab},le="{b:g}"}} {n:g}')
+            out.append(f'{name}_bucket{{{lab},le="+Inf"}} {row[-2]:g}')
+            out.append(f"{name}_sum{{{lab}}} {row[-1]:.6f}")
+            out.append(f"{name}_count{{{lab}}} {row[-2]:g}")
+        return out
+
+
+class Reruns:
+    """rerun สะสม + เวลาของ rerun ล่าสุด (อัตราต่อวินาที) + session ที่เห็นล่าสุด"""
+
+    def __init__(self):
+        self.total = 0
+        self._recent: Deque[float] = deque()
+        self._sessions: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def note(self, session: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.total += 1
+            self._recent.append(now)
+            self._sessions[session] = now
+            self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._recent and now - self._recent[0] > RATE_WINDOW_S:
+            self._recent.popleft()
+        stale = [s for s, t in self._sessions.items() if now - t > SESSION_WINDOW_S]
+        for s in stale:
+            del self._sessions[s]
+
+    def snapshot(self) -> Tuple[int, float, int]:
+        """(rerun สะสม, rerun/วินาที, session ที่ใช้งาน)"""
+        with self._lock:
+            self._trim(time.monotonic())
+            return self.total, len(self._recent) / RATE_WINDOW_S, len(self._sessions)
+
+
+RERUNS = Reruns()
+GEOJSON_LOAD_SECONDS = Histogram("kind")
+
+
+def note_rerun() -> None:
+    """เรียกครั้งเดียวต่อ rerun ของทั้งแอป (app.py)"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    RERUNS.note(ctx.session_id if ctx is not None else "")
+
+
+# ------------------------------
+# ข้อความ Prometheus
+# ------------------------------
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _process_label() -> str:
+    return f'pid="{os.getpid()}"'
+
+
+def _metric(out: List[str], name: str, kind: str, help_: str, samples) -> None:
+    out.append(f"# HELP {name} {help_}")
+    out.append(f"# TYPE {name} {kind}")
+    if isinstance(samples, (int, float)):
+        samples = [("", samples)]
+    for labels, value in samples:
+        labels = "{" + _process_label() + ("," + labels[1:] if labels else "}")
+        out.append(f"{name}{labels} {value}" if isinstance(value, int) else f"{name}{labels} {value:.6g}")
+
+
+def render_metrics() -> str:
+    from utils.data import YEAR_DATA
+    from utils.figcache import FIGURE_CACHE
+    from utils.profiler import PROFILE_STATS
+
+    reruns, rate, active = RERUNS.snapshot()
+    resident_mb = rss_mb()
+    fig = FIGURE_CACHE.stats()
+    year = YEAR_DATA.stats()
+
+    out: List[str] = []
+    _metric(out, "otop_sessions_active", "gauge", f"Sessions that reran in the last {SESSION_WINDOW_S}s.", active)
+    _metric(out, "otop_reruns_total", "counter", "Full-app reruns since process start.", reruns)
+    _metric(out, "otop_reruns_per_second", "gauge", f"Full-app reruns per second over the last {RATE_WINDOW_S}s.", rate)
+    if resident_mb is not None:           # อ่านหน่วยความจำไม่ได้ (เช่น Windows) -> ไม่ส่งแทนที่จะส่ง 0
+        rss = int(resident_mb * 2**20)
+        _metric(out, "otop_process_resident_bytes", "gauge", "Resident memory of the process.", rss)
+        _metric(out, "otop_resident_bytes_per_session", "gauge", "Resident memory divided by active sessions.",
+                rss // max(1, active))
+
+    _metric(out, "otop_figure_cache_entries", "gauge", "Figures held in the figure cache.", fig["entries"])
+    _metric(out, "otop_figure_cache_max_entries", "gauge", "Figure cache capacity.", fig["max_entries"])
+    _metric(out, "otop_figure_cache_hits_total", "counter", "Figure cache hits.", fig["hits"])
+    _metric(out, "otop_figure_cache_misses_total", "counter", "Figure cache misses (figures built).", fig["misses"])
+    _metric(out, "otop_figure_cache_evictions_total", "counter", "Figures evicted by the LRU.", fig["evictions"])
+    _metric(out, "otop_figure_cache_coalesced_total", "counter",
+            "Figure requests that waited on an identical in-flight build.", fig["coalesced"])
+
+    _metric(out, "otop_year_cache_entries", "gauge", "Fiscal-year datasets held in memory.", year["entries"])
+    _metric(out, "otop_year_cache_max_entries", "gauge", "Fiscal-year dataset capacity.", year["max_entries"])
+    _metric(out, "otop_year_cache_loads_total", "counter", "Fiscal-year datasets built from the store.", year["loads"])
+    _metric(out, "otop_year_cache_evictions_total", "counter", "Fiscal-year datasets evicted.", year["evictions"])
+
+    out.append("# HELP otop_geojson_load_seconds Time to load GeoJSON (disk, download or static publish).")
+    out.append("# TYPE otop_geojson_load_seconds histogram")
+    out.extend(GEOJSON_LOAD_SECONDS.lines("otop_geojson_load_seconds"))
+
+    summary = PROFILE_STATS.summary()
+    if summary:
+        # ค่าจากหน้าต่างตัวอย่างล่าสุด ไม่ใช่ค่าสะสม -> gauge แยกชื่อต่อ percentile (label quantile สงวนไว้ให้ summary)
+        for q, key in (("p50", "p50_ms"), ("p95", "p95_ms")):
+            samples = [(f'{{component="{_escape(name)}"}}', s[key] / 1000.0) for name, s in summary.items()]
+            _metric(out, f"otop_component_render_{q}_seconds", "gauge",
+                    f"{q.upper()} render time per component over recent samples (utils/profiler.py).", samples)
+    return "\n".join(out) + "\n"
+
+
+# ------------------------------
+# ตัวส่งออก
+# ------------------------------
+def metrics_path(raw: str) -> Path:
+    """ไฟล์ของโปรเซสนี้: otop.prom -> otop.<pid>.prom, โฟลเดอร์ (มีอยู่แล้ว หรือลงท้าย /) -> <โฟลเดอร์>/otop.<pid>.prom"""
+    path = Path(raw)
+    if path.is_dir() or str(raw).endswith(("/", os.sep)):
+        return path / f"otop.{os.getpid()}.prom"
+    return path.with_name(f"{path.stem}.{os.getpid()}{path.suffix or '.prom'}")
+
+
+def _remove_file(path: Path) -> None:
+    with contextlib.suppress(OSError):
+        path.unlink()
+
+
+def write_metrics_file(path: Path) -> None:
+    """เขียนทับแบบ atomic (ผู้อ่านไม่เห็นไฟล์ครึ่ง ๆ)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(render_metrics(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _file_loop(path: Path, interval: float) -> None:
+    while True:
+        try:
+            write_metrics_file(path)
+        except Exception:   # ส่งออกพลาดต้องไม่ทำให้แอปล่ม
+            log.exception("เขียน metrics ลง %s ไม่สำเร็จ", path)
+        time.sleep(interval)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:   # ไม่พ่น access log ทุก scrape
+        pass
+
+
+def serve_metrics(port: int, addr: str = "127.0.0.1", span: int = 1) -> ThreadingHTTPServer:
+    """ผูกพอร์ตว่างแรกใน port .. port + span - 1 (ไม่ว่างเลย -> OSError ของพอร์ตสุดท้าย)"""
+    last = port + max(1, span) - 1
+    for p in range(port, last + 1):
+        try:
+            server = ThreadingHTTPServer((addr, p), _MetricsHandler)
+            break
+        except OSError:
+            if p == last:
+                raise
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="otop-metrics-http", daemon=True).start()
+    return server
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def start_exporter(
+    path: str = METRICS_FILE, port: int = METRICS_PORT, addr: str = METRICS_ADDR, interval: float = METRICS_INTERVAL,
+    span: int = METRICS_PORT_SPAN,
+) -> None:
+    """เริ่มตัวส่งออกที่ตั้งค่าไว้ ครั้งเดียวต่อโปรเซส (เรียกซ้ำได้)"""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    if path:
+        own = metrics_path(path)
+        threading.Thread(
+            target=_file_loop, args=(own, max(1.0, interval)), name="otop-metrics-file", daemon=True
+        ).start()
+        atexit.register(_remove_file, own)
+        log.info("metrics -> %s ทุก %ss", own, interval)
+    if port:
+        try:
+            server = serve_metrics(port, addr, span)
+            log.info("metrics -> http://%s:%d/metrics", addr, server.server_address[1])
+        except OSError as e:   # ทุกพอร์ตในช่วงถูกใช้หมด: worker นี้ส่งออกทาง HTTP ไม่ได้
+            fallback = (f"ส่งออกทาง {metrics_path(path)} เท่านั้น" if path
+                        else "worker นี้ไม่มี metrics — เพิ่ม OTOP_METRICS_PORT_SPAN หรือตั้ง OTOP_METRICS_FILE")
+            log.error("worker pid %d เปิดพอร์ต metrics %s:%d-%d ไม่ได้ (%s); %s",
+                      os.getpid(), addr, port, port + max(1, span) - 1, e, fallback)
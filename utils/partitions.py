@@ -0,0 +1,126 @@
+# utils/partitions.py
+# -*- coding: utf-8 -*-
+"""
+แคชชุดข้อมูลรายปีงบ (แชร์ทุก session ในโปรเซส) สำหรับประวัติหลายปี
+
+- โหลดปีงบเมื่อมี view ต้องใช้ครั้งแรกเท่านั้น (เริ่มเซิร์ฟเวอร์ = โหลดแค่ปีล่าสุด)
+- LRU จำกัดจำนวนปี (OTOP_YEAR_CACHE) และไล่ปีที่ไม่ได้ใช้นานที่สุดออกเมื่อหน่วยความจำของโปรเซส
+  เกิน OTOP_YEAR_MEMORY_MB (ปีที่เพิ่งขอไม่ถูกไล่)
+  ไล่เท่าที่ขนาดโดยประมาณของปีที่ไล่ (sizeof ตอนโหลด) รวมแล้วครอบส่วนที่เกิน — ไม่วัด RSS ซ้ำระหว่างไล่
+  เพราะ allocator มักไม่คืนหน่วยความจำให้ OS ทันที (วัดซ้ำ = ไล่ทุกปีจนเหลือปีเดียว)
+  ไม่มี sizeof -> ไล่ได้ไม่เกินหนึ่งปีต่อการโหลดหนึ่งครั้ง
+- ปีที่ถูกไล่: on_evict ได้รับแจ้ง (utils/data.py ใช้ทิ้งรูปกราฟของปีนั้นจาก FIGURE_CACHE)
+  session ที่ยังถือชุดข้อมูลอยู่ใช้ต่อได้จนจบ rerun; ขอใหม่ครั้งหน้า = โหลดจาก mmap ใหม่
+"""
+import gc
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from utils.procmem import rss_mb
+
+log = logging.getLogger(__name__)
+
+
+class PartitionCache:
+    """LRU ของชุดข้อมูลราย partition + ไล่ออกตามหน่วยความจำ"""
+
+    def __init__(
+        self,
+        max_entries: int,
+        memory_mb: float,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.memory_mb = memory_mb
+        self.on_evict = on_evict
+        self.sizeof = sizeof                   # ขนาดโดยประมาณ (byte) ของค่าหนึ่งตัว — วัดครั้งเดียวตอนโหลด
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()          # ป้องกัน _data
+        self._load_lock = threading.Lock()     # โหลดทีละปี (สอง session ขอปีเดียวกัน = โหลดครั้งเดียว)
+        self.loads = self.evictions = 0
+
+    def get(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        with self._load_lock:
+            with self._lock:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    return self._data[key]
+            value = load()
+            size = self.sizeof(value) if self.sizeof is not None else math.inf
+            with self._lock:
+                self._data[key] = value
+                self._sizes[key] = size
+                self.loads += 1
+            self._shrink(keep=key)
+            return value
+
+    def _pop_oldest(self, keep: Hashable) -> Optional[float]:
+        """ไล่ค่าที่ไม่ได้ใช้นานที่สุด (ยกเว้น keep) -> ขนาดโดยประมาณ (byte) หรือ None ถ้าไม่มีให้ไล่"""
+        with self._lock:
+            victim = next((k for k in self._data if k != keep), None)
+            if victim is None:
+                return None
+            value = self._data.pop(victim)
+            size = self._sizes.pop(victim, math.inf)
+            self.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(victim, value)
+        return size
+
+    def _shrink(self, keep: Hashable) -> None:
+        while len(self._data) > self.max_entries and self._pop_oldest(keep) is not None:
+            pass
+        rss = rss_mb() if self.memory_mb else None
+        if rss is None:                 # ไม่ได้ตั้งงบ หรืออ่านหน่วยความจำของโปรเซสไม่ได้
+            return
+        excess = (rss - self.memory_mb) * 2**20
+        freed = 0.0
+        while freed < excess:
+            size = self._pop_oldest(keep)
+            if size is None:
+                break
+            freed += size
+        if freed:
+            gc.collect()
+            log.info("ไล่ partition ออกเพราะหน่วยความจำเกิน %d MB (เหลือ %d)", self.memory_mb, len(self._data))
+
+    def evict(self, key: Hashable) -> bool:
+        with self._lock:
+            value = self._data.pop(key, None)
+            self._sizes.pop(key, None)
+        if value is None:
+            return False
+        self.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+        return True
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "keys": list(self._data),
+            }
@@ -0,0 +1,174 @@
+# utils/payload.py
+# -*- coding: utf-8 -*-
+"""
+ลดขนาด payload ของ st.plotly_chart (สร้างครั้งเดียวต่อรูปในแคช แล้วใช้ซ้ำทุก rerun)
+
+- array ตัวเลขใน trace -> typed array base64 ({"dtype", "bdata", "shape"}) ที่ plotly.js อ่านได้ตรง ๆ
+  เลือก dtype เล็กสุดที่ไม่เปลี่ยนค่าที่แสดง: i4 (จำนวนเต็ม) -> f4 (ป้าย ,.0f / .2f เหมือน f8 ทุกตัว) -> f8
+- text รายจุดที่เป็นแค่ป้ายของค่าบนแกนค่า (baht_labels / pct_labels) -> texttemplate ฝั่ง client
+  ยกเว้นมีค่าที่ตกบนจุดปัดครึ่งพอดี: d3-format ปัดห่างศูนย์ (toFixed) แต่ป้ายฝั่ง Python ปัด half-even
+- นับขนาด JSON ของแต่ละกราฟ เทียบงบ OTOP_PAYLOAD_BUDGET_KB (เกินงบ -> log warning)
+
+EncodedFigure เป็น go.Figure ที่ to_dict() คืน spec ที่เข้ารหัสแล้ว
+(st.plotly_chart เรียก to_dict() แล้ว to_json(validate=False) จึงส่ง spec นี้ออกไปตรง ๆ)
+"""
+import base64
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.utils import PlotlyJSONEncoder
+
+from utils.formatters import baht_labels, pct_labels
+from utils.settings import PAYLOAD_BUDGET_KB
+
+log = logging.getLogger(__name__)
+
+PAYLOAD_MIN_LENGTH = 8         # array สั้นกว่านี้ส่งเป็น JSON ธรรมดา (base64 ไม่คุ้ม)
+_INT32 = np.iinfo(np.int32)
+
+# key ที่ไม่ใช่ข้อมูลตัวเลขรายจุด (ห้ามแปลง)
+SKIP_KEYS = frozenset({"geojson", "text", "hovertext", "ids", "locations", "labels", "names"})
+
+# texttemplate ที่แทน text รายจุดได้ (ชนิดป้าย, จำนวนทศนิยม -> template)
+TEXT_TEMPLATES = (
+    (baht_labels, 0, "%{value:,.0f}"),
+    (lambda v: pct_labels(v, 2), 2, "%{value:.2f}%"),
+)
+
+
+def _rounding_ties(values: np.ndarray, digits: int) -> np.ndarray:
+    """ค่าที่อยู่กึ่งกลางระหว่างสองป้ายพอดี (เช่น 0.5 ที่ 0 ตำแหน่ง, 0.125 ที่ 2 ตำแหน่ง)
+
+    ค่าฐานสองที่เป็น k + 0.5 ที่ทศนิยม digits ตำแหน่งได้พอดีต้องเป็นพหุคูณคี่ของ 2**-(digits + 1)
+    (คูณด้วยกำลังของ 2 ไม่มีการปัด)
+    """
+    y = np.asarray(values, dtype=float) * 2.0 ** (digits + 1)
+    with np.errstate(invalid="ignore"):
+        return np.isfinite(y) & (y == np.rint(y)) & (np.fmod(y, 2.0) != 0)
+
+
+def _same_labels(a: np.ndarray, b: np.ndarray) -> bool:
+    """b แสดงผลเหมือน a ทุกป้ายใน TEXT_TEMPLATES ทั้งฝั่ง Python และฝั่ง d3 (ไม่เกิดจุดปัดครึ่งใหม่)"""
+    for labels, digits, _ in TEXT_TEMPLATES:
+        if not np.array_equal(labels(a), labels(b)):
+            return False
+        if (_rounding_ties(b, digits) & ~_rounding_ties(a, digits)).any():
+            return False
+    return True
+
+
+# ------------------------------
+# Typed arrays
+# ------------------------------
+def _numeric(value: Any) -> Optional[np.ndarray]:
+    if isinstance(value, np.ndarray):
+        a = value
+    elif isinstance(value, (list, tuple)) and value and all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in value
+    ):
+        a = np.asarray(value, dtype=float)
+    else:
+        return None
+    if a.dtype.kind not in "iuf" or a.size < PAYLOAD_MIN_LENGTH:
+        return None
+    return a
+
+
+def typed_array(a: np.ndarray) -> Dict[str, str]:
+    """ndarray -> typed array ของ plotly.js ด้วย dtype ที่เล็กที่สุดที่ยังไม่เปลี่ยนค่าที่แสดง"""
+    a = np.asarray(a)
+    if a.dtype.kind in "iu" or (np.isfinite(a).all() and np.array_equal(a, np.rint(a))):
+        if a.size == 0 or (a.min() >= _INT32.min and a.max() <= _INT32.max):
+            out = a.astype("<i4")
+        else:
+            out = a.astype("<f8")
+    else:
+        f4 = a.astype("<f4")
+        wide = a.astype(float)
+        ok = np.array_equal(np.isfinite(wide), np.isfinite(f4)) and _same_labels(wide, f4.astype(float))
+        out = f4 if ok else a.astype("<f8")
+    spec = {"dtype": out.dtype.str[1:], "bdata": base64.b64encode(np.ascontiguousarray(out).tobytes()).decode("ascii")}
+    if out.ndim > 1:
+        spec["shape"] = ",".join(str(n) for n in out.shape)
+    return spec
+
+
+def _encode(node: Any) -> Any:
+    if isinstance(node, dict):
+        return {k: (v if k in SKIP_KEYS else _encode(v)) for k, v in node.items()}
+    a = _numeric(node)
+    return node if a is None else typed_array(a)
+
+
+# ------------------------------
+# text รายจุด -> texttemplate
+# ------------------------------
+def _template_text(trace: Dict[str, Any]) -> None:
+    text = trace.get("text")
+    if trace.get("type") != "bar" or text is None or isinstance(text, str) or "texttemplate" in trace:
+        return
+    axis = "x" if trace.get("orientation") == "h" else "y"
+    values = _numeric(trace.get(axis))
+    if values is None or len(text) != values.size:
+        return
+    text = np.asarray(text, dtype=str)
+    for labels, digits, template in TEXT_TEMPLATES:
+        if np.array_equal(labels(values), text) and not _rounding_ties(values, digits).any():
+            del trace["text"]
+            trace["texttemplate"] = template
+            return
+
+
+# ------------------------------
+# Figure
+# ------------------------------
+class EncodedFigure(go.Figure):
+    """go.Figure ที่ถือ spec ที่เข้ารหัสแล้ว (ใช้ส่งให้ st.plotly_chart เท่านั้น ห้ามแก้ไข)"""
+
+    def __init__(self, spec: Dict[str, Any], nbytes: int):
+        super().__init__()
+        self._encoded = spec
+        self._nbytes = nbytes
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._encoded
+
+    def to_plotly_json(self) -> Dict[str, Any]:
+        return self._encoded
+
+
+def payload_bytes(spec: Dict[str, Any]) -> int:
+    return len(json.dumps(spec, cls=PlotlyJSONEncoder, separators=(",", ":")).encode("utf-8"))
+
+
+def figure_nbytes(fig: go.Figure) -> int:
+    """ขนาด JSON ที่ส่งให้ browser: EncodedFigure นับไว้ตอนเข้ารหัสแล้ว, go.Figure ธรรมดา (OTOP_PAYLOAD_ENCODE=0) วัดใหม่"""
+    if isinstance(fig, EncodedFigure):
+        return fig.nbytes
+    return len(pio.to_json(fig, validate=False).encode("utf-8"))
+
+
+def encode_figure(fig: go.Figure, chart: str = "") -> EncodedFigure:
+    """go.Figure -> EncodedFigure (typed arrays + texttemplate) พร้อม log ขนาดเทียบงบ"""
+    spec = fig.to_dict()
+    data = []
+    for trace in spec.get("data", []):
+        _template_text(trace)
+        data.append(_encode(trace))
+    spec["data"] = data
+
+    nbytes = payload_bytes(spec)
+    budget = PAYLOAD_BUDGET_KB * 1024
+    if budget and nbytes > budget:
+        log.warning("payload %s: %.1f KB เกินงบ %d KB", chart or "?", nbytes / 1024, PAYLOAD_BUDGET_KB)
+    else:
+        log.info("payload %s: %.1f KB", chart or "?", nbytes / 1024)
+    return EncodedFigure(spec, nbytes)
@@ -0,0 +1,34 @@
+# utils/procmem.py
+# -*- coding: utf-8 -*-
+"""
+หน่วยความจำของโปรเซส (ใช้ร่วมกันโดย utils/warmup.py, utils/partitions.py, utils/metrics.py)
+
+แยกออกมาเป็นโมดูลเล็กที่ไม่ import อะไรของแอป — ผู้ใช้ระดับล่าง (เช่น PartitionCache)
+จึงไม่ต้องลาก components.charts มาด้วยผ่าน utils.warmup
+
+อ่านไม่ได้ (เช่น Windows ที่ไม่มีทั้ง /proc และโมดูล resource) -> None: ผู้เรียกข้ามการตรวจหน่วยความจำ
+"""
+import os
+import sys
+from typing import Optional
+
+try:
+    import resource
+except ImportError:            # Windows
+    resource = None
+
+# หน่วยของ ru_maxrss: macOS เป็น byte, Linux / BSD อื่นเป็น KB
+_MAXRSS_PER_MB = 2**20 if sys.platform == "darwin" else 2**10
+
+
+def rss_mb() -> Optional[float]:
+    """หน่วยความจำที่โปรเซสใช้อยู่ (MB); อ่าน /proc ถ้ามี ไม่งั้นใช้ค่าสูงสุดจาก getrusage; อ่านไม่ได้ -> None"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / _MAXRSS_PER_MB
@@ -0,0 +1,292 @@
+# utils/profiler.py
+# -*- coding: utf-8 -*-
+"""
+โปรไฟล์เวลาของแต่ละคอมโพเนนต์ต่อ rerun (OTOP_PROFILE) — ดูว่าเวลาของ rerun ไปอยู่ที่ส่วนไหน
+
+- @profiled("ชื่อ"): ห่อ render_* (และ loader) -> หนึ่ง record ต่อการเรียก
+- profile_span("ชื่อ"): แบบ with สำหรับโค้ดที่ไม่ใช่ฟังก์ชัน (เช่น การโหลดใน app.py)
+- record: total_ms, build_ms (สร้างรูป Plotly + เข้ารหัส ตอนแคชรูป miss), compute_ms (ส่วนที่เหลือ:
+  เตรียมข้อมูล + ส่ง element), payload_bytes (JSON ของรูปกราฟที่ส่ง — EncodedFigure.nbytes),
+  hits / misses ของแคช
+- แคชรูปรายงานผ่าน note_figure (utils/figcache.py); loader ที่ทำงานจริง (cache miss) เรียก note_miss
+  span ที่ cached=True และไม่มี miss = hit
+- span ซ้อนกันได้: เหตุการณ์ของแคชนับให้ทุก span ที่เปิดอยู่ใน thread นั้น (thread ของ warm-up ไม่มี span)
+
+ผลลัพธ์:
+- PROFILE_STATS: record ล่าสุดต่อคอมโพเนนต์ (แชร์ทุก session ในโปรเซส) -> p50 / p95 ด้วย summary()
+- last_records(): record ล่าสุดของ session นี้ (แผงวินิจฉัยใน sidebar: components/diagnostics.py)
+- OTOP_PROFILE_LOG: ต่อท้ายไฟล์ JSON lines สำหรับสรุปข้ามโปรเซส / การรีสตาร์ต
+  แต่ละโปรเซสเขียนไฟล์ของตัวเอง (logs/profile.jsonl -> logs/profile.<pid>.jsonl) และหมุนไฟล์ตามขนาดเอง
+  (RotatingFileHandler หมุนไฟล์ที่หลายโปรเซสเขียนร่วมกันไม่ได้อย่างปลอดภัย)
+
+    python -m utils.profiler logs/profile.jsonl      # p50/p95 ต่อคอมโพเนนต์ รวมทุก pid และไฟล์ที่หมุนแล้ว (.1, .2, ...)
+"""
+import argparse
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from utils.settings import PROFILE, PROFILE_LOG, PROFILE_LOG_MB
+
+log = logging.getLogger(__name__)
+
+PROFILE_SAMPLES = 512        # record ล่าสุดที่เก็บต่อคอมโพเนนต์ (ฐานของ p50 / p95)
+PROFILE_LOG_BACKUPS = 5      # จำนวนไฟล์เก่าที่เก็บไว้เมื่อหมุน log
+SESSION_KEY = "_profile_last"
+
+
+class Span:
+    __slots__ = ("name", "cached", "started", "build_ms", "payload_bytes", "hits", "misses")
+
+    def __init__(self, name: str, cached: bool):
+        self.name = name
+        self.cached = cached
+        self.started = time.perf_counter()
+        self.build_ms = 0.0
+        self.payload_bytes = 0
+        self.hits = self.misses = 0
+
+    def cache(self) -> str:
+        if self.misses:
+            return "miss"
+        if self.hits or self.cached:
+            return "hit"
+        return "-"
+
+    def record(self, session: str) -> Dict[str, Any]:
+        total = (time.perf_counter() - self.started) * 1000.0
+        return {
+            "ts": round(time.time(), 3),
+            "session": session,
+            "component": self.name,
+            "total_ms": round(total, 3),
+            "build_ms": round(self.build_ms, 3),
+            "compute_ms": round(max(total - self.build_ms, 0.0), 3),
+            "payload_bytes": self.payload_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "cache": self.cache(),
+        }
+
+
+_local = threading.local()
+
+
+def _stack() -> List[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+# ------------------------------
+# เหตุการณ์จากแคช
+# ------------------------------
+def note_figure(hit: bool, build_ms: float = 0.0, nbytes: int = 0) -> None:
+    """แคชรูปส่งรูปหนึ่งรูป (hit = ได้จากแคช, ไม่งั้นสร้างใหม่ใช้เวลา build_ms)"""
+    for span in getattr(_local, "stack", ()):
+        span.payload_bytes += nbytes
+        span.build_ms += build_ms
+        if hit:
+            span.hits += 1
+        else:
+            span.misses += 1
+
+
+def note_miss() -> None:
+    """loader ทำงานจริง (ไม่ได้ผลจากแคช)"""
+    for span in getattr(_local, "stack", ()):
+        span.misses += 1
+
+
+# ------------------------------
+# ที่เก็บ record
+# ------------------------------
+class ProfileStats:
+    """record ล่าสุดต่อคอมโพเนนต์ (ring buffer) แชร์ทุก session"""
+
+    def __init__(self, samples: int):
+        self.samples = samples
+        self._data: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data.setdefault(record["component"], deque(maxlen=self.samples)).append(record)
+
+    def records(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [r for q in self._data.values() for r in q]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return aggregate(self.records())
+
+
+PROFILE_STATS = ProfileStats(PROFILE_SAMPLES)
+
+
+def aggregate(records: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """record -> {คอมโพเนนต์: n, p50_ms, p95_ms, build_p50_ms, payload_kb (median), hit_rate}"""
+    by_name: Dict[str, List[Dict[str, Any]]] = {}
+    for r in records:
+        by_name.setdefault(r["component"], []).append(r)
+    out = {}
+    for name, rs in sorted(by_name.items()):
+        total = np.array([r["total_ms"] for r in rs])
+        cached = [r["cache"] for r in rs if r["cache"] != "-"]
+        out[name] = {
+            "n": len(rs),
+            "p50_ms": float(np.percentile(total, 50)),
+            "p95_ms": float(np.percentile(total, 95)),
+            "build_p50_ms": float(np.median([r["build_ms"] for r in rs])),
+            "payload_kb": float(np.median([r["payload_bytes"] for r in rs])) / 1024.0,
+            "hit_rate": cached.count("hit") / len(cached) if cached else float("nan"),
+        }
+    return out
+
+
+# ------------------------------
+# log JSON lines (หมุนไฟล์)
+# ------------------------------
+_jsonl = logging.getLogger("otop.profile")
+_jsonl.propagate = False
+
+
+def log_path(path: str) -> Path:
+    """ไฟล์ log ของโปรเซสนี้: logs/profile.jsonl -> logs/profile.<pid>.jsonl"""
+    p = Path(path)
+    return p.with_name(f"{p.stem}.{os.getpid()}{p.suffix}")
+
+
+def _open_log(path: str) -> None:
+    try:
+        p = log_path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            p, maxBytes=max(1, PROFILE_LOG_MB) * 1024 * 1024, backupCount=PROFILE_LOG_BACKUPS, encoding="utf-8"
+        )
+    except OSError as e:
+        log.warning("เปิด log โปรไฟล์ %s ไม่ได้: %s", path, e)
+        return
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _jsonl.addHandler(handler)
+    _jsonl.setLevel(logging.INFO)
+
+
+if PROFILE and PROFILE_LOG:
+    _open_log(PROFILE_LOG)
+
+
+# ------------------------------
+# Session ของ streamlit
+# ------------------------------
+def _script_ctx():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    return get_script_run_ctx(suppress_warning=True)
+
+
+def _finish(span: Span) -> None:
+    ctx = _script_ctx()
+    record = span.record(ctx.session_id[:8] if ctx is not None else "")
+    PROFILE_STATS.add(record)
+    if _jsonl.handlers:
+        _jsonl.info(json.dumps(record, ensure_ascii=False))
+    if ctx is not None:
+        import streamlit as st
+
+        st.session_state.setdefault(SESSION_KEY, {})[span.name] = record
+
+
+def last_records() -> Dict[str, Dict[str, Any]]:
+    """record ล่าสุดของแต่ละคอมโพเนนต์ใน session นี้"""
+    import streamlit as st
+
+    return dict(st.session_state.get(SESSION_KEY, {}))
+
+
+# ------------------------------
+# Span / decorator
+# ------------------------------
+@contextlib.contextmanager
+def profile_span(name: str, cached: bool = False) -> Iterator[Optional[Span]]:
+    if not PROFILE:
+        yield None
+        return
+    stack = _stack()
+    span = Span(name, cached)
+    stack.append(span)
+    try:
+        yield span
+    finally:
+        stack.pop()
+        _finish(span)
+
+
+def profiled(name: str, cached: bool = False) -> Callable:
+    def deco(fn: Callable) -> Callable:
+        if not PROFILE:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profile_span(name, cached):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+# ------------------------------
+# CLI: สรุปจากไฟล์ log
+# ------------------------------
+def read_log(path: Path) -> Iterator[Dict[str, Any]]:
+    """record จากไฟล์ log ของทุกโปรเซส (path และ <stem>.<pid><suffix>) รวมไฟล์ที่หมุนแล้ว (.1 ... .N) ข้ามบรรทัดที่เสีย"""
+    files = [path] + sorted(f for f in path.parent.glob(path.stem + ".*") if path.suffix in f.name)
+    files = list(dict.fromkeys(files))
+    for f in files:
+        if not f.is_file():
+            continue
+        with f.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def format_summary(summary: Dict[str, Dict[str, float]]) -> str:
+    lines = [f"{'component':<24}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'build ms':>10}{'payload KB':>12}{'hit %':>8}"]
+    for name, s in summary.items():
+        hit = "" if s["hit_rate"] != s["hit_rate"] else f"{100 * s['hit_rate']:.0f}"
+        lines.append(
+            f"{name:<24}{s['n']:>7,}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}"
+            f"{s['build_p50_ms']:>10.1f}{s['payload_kb']:>12.1f}{hit:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="สรุป p50/p95 ต่อคอมโพเนนต์จาก log โปรไฟล์ (JSON lines)")
+    ap.add_argument("logs", nargs="+", type=Path)
+    ap.add_argument("--since", type=float, default=0.0, help="เฉพาะ record ที่ ts >= ค่านี้ (epoch วินาที)")
+    args = ap.parse_args(argv)
+    records = [r for p in args.logs for r in read_log(p) if r.get("ts", 0) >= args.since]
+    print(format_summary(aggregate(records)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# utils/ranges.py
+# -*- coding: utf-8 -*-
+"""
+ผลรวมสะสม (prefix sum) ตามแกนเวลา: คำตอบของช่วงเวลาใด ๆ [start, stop) เป็น O(1) ต่อ series
+
+    cum[0] = 0,  cum[i] = values[0] + ... + values[i-1]
+    ยอดรวมช่วง   = cum[stop] - cum[start]
+    ค่าเฉลี่ยช่วง  = ยอดรวมช่วง / (stop - start)
+    การเติบโตช่วง = ยอดรวมช่วง เทียบช่วงก่อนหน้าที่ยาวเท่ากัน (%)
+    ยอดสะสมในช่วง = cum[start+1 : stop+1] - cum[start]   (เช่น YTD ตั้งแต่ต้นปีงบ)
+
+สร้างครั้งเดียวในคิวบ์ (จังหวัด / ช่องทาง / ประเภทสินค้า) — แกนเวลาเป็นแถว (แกนแรก) เสมอ
+ไม่ผูกกับหน่วยเดือน: ข้อมูลรายสัปดาห์ / รายวันใช้คลาสเดียวกันได้ทันที
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RangeSums:
+    cum: np.ndarray                  # (T + 1, ...) แถว 0 = 0
+
+    def __len__(self) -> int:
+        return len(self.cum) - 1
+
+    def _bounds(self, start: int, stop: int):
+        n = len(self)
+        start, stop = max(0, min(start, n)), max(0, min(stop, n))
+        return start, max(start, stop)
+
+    def total(self, start: int, stop: int) -> np.ndarray:
+        """ยอดรวมแถว [start, stop) ของทุก series"""
+        start, stop = self._bounds(start, stop)
+        return self.cum[stop] - self.cum[start]
+
+    def mean(self, start: int, stop: int) -> np.ndarray:
+        start, stop = self._bounds(start, stop)
+        if stop == start:
+            return np.full(self.cum.shape[1:], np.nan)
+        return self.total(start, stop) / (stop - start)
+
+    def growth(self, start: int, stop: int) -> np.ndarray:
+        """% เปลี่ยนแปลงของยอดรวมช่วง เทียบช่วงก่อนหน้าที่ยาวเท่ากัน (ไม่มีช่วงก่อนครบ / ก่อนหน้า = 0 -> NaN)"""
+        start, stop = self._bounds(start, stop)
+        n = stop - start
+        if n == 0 or start - n < 0:
+            return np.full(self.cum.shape[1:], np.nan)
+        cur = self.total(start, stop).astype(float)
+        prev = self.total(start - n, start).astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(prev != 0, (cur - prev) / prev * 100.0, np.nan)
+
+    def running(self, start: int, stop: int) -> np.ndarray:
+        """ยอดสะสมตั้งแต่แถว start ถึงแต่ละแถวใน [start, stop) -> (stop - start, ...)"""
+        start, stop = self._bounds(start, stop)
+        return self.cum[start + 1: stop + 1] - self.cum[start]
+
+
+def build_range_sums(values: np.ndarray, axis: int = 0) -> RangeSums:
+    """values ที่มีแกนเวลาอยู่ที่ axis -> RangeSums (แกนเวลาถูกย้ายมาเป็นแกนแรก)"""
+    v = np.moveaxis(np.asarray(values), axis, 0)
+    dtype = np.int64 if v.dtype.kind in "iu" else np.float64
+    cum = np.zeros((len(v) + 1,) + v.shape[1:], dtype=dtype)
+    np.cumsum(v, axis=0, out=cum[1:])
+    return RangeSums(cum=cum)
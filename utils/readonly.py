@@ -0,0 +1,134 @@
+# utils/readonly.py
+# -*- coding: utf-8 -*-
+"""
+ตัวช่วยทำให้ข้อมูลที่แชร์ข้าม session (st.cache_resource) เป็นแบบอ่านอย่างเดียว
+
+- freeze_array / freeze_frame / freeze_cube: ปิด writeable ของ numpy buffer
+  (เขียนทับค่าแล้วจะเกิด ValueError: assignment destination is read-only ทันที)
+- freeze_json: แปลง GeoJSON เป็น FrozenDict / FrozenList (แก้ไขแล้วเกิด TypeError)
+  แต่ยังเป็น dict/list จริง จึง serialize เป็น JSON และ deepcopy (ที่ Plotly ทำ) ได้ตามปกติ
+- dataset_fingerprint / assert_unmodified: ตรวจโครงสร้าง (เพิ่ม/ลบคอลัมน์, เปลี่ยน index)
+  ที่ read-only buffer จับไม่ได้ แล้ว raise RuntimeError
+"""
+import dataclasses
+from types import MappingProxyType
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+def _readonly(*_args, **_kwargs):
+    raise TypeError("ข้อมูลชุดนี้แชร์ข้าม session และเป็นแบบอ่านอย่างเดียว (ให้ copy ก่อนแก้ไข)")
+
+
+class FrozenDict(dict):
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    update = pop = popitem = clear = setdefault = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        from copy import deepcopy
+        return {k: deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        from copy import deepcopy
+        return [deepcopy(v, memo) for v in self]
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze_json(obj: Any) -> Any:
+    """แปลง dict/list ซ้อนกัน (เช่น GeoJSON) ให้เป็นแบบอ่านอย่างเดียวทั้งก้อน"""
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze_json(v)) for k, v in obj.items())
+    if isinstance(obj, list):
+        return FrozenList(freeze_json(v) for v in obj)
+    return obj
+
+
+def freeze_array(a: np.ndarray) -> np.ndarray:
+    a.flags.writeable = False
+    return a
+
+
+def _readonly_values(a: np.ndarray) -> np.ndarray:
+    # buffer ที่อ่านอย่างเดียวอยู่แล้ว (เช่น np.load(mmap_mode="r")) ใช้ต่อได้เลย ไม่ต้อง copy
+    return a if not a.flags.writeable else freeze_array(a.copy())
+
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """สร้าง DataFrame ใหม่ที่คอลัมน์ตัวเลขชี้ไปยัง buffer แบบอ่านอย่างเดียว (ไม่ copy ซ้ำ)"""
+    kinds = {dt.kind for dt in df.dtypes}
+    if kinds and kinds <= set("biuf"):
+        values = _readonly_values(df.to_numpy())
+        return pd.DataFrame(values, index=df.index, columns=df.columns, copy=False)
+    cols = {}
+    for c in df.columns:
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # categorical: ปิด writeable ของรหัส (categories เป็น Index ซึ่งแก้ไขไม่ได้อยู่แล้ว)
+            cols[c] = pd.Categorical.from_codes(_readonly_values(s.cat.codes.to_numpy()), dtype=s.dtype)
+        elif s.dtype.kind in "biuf":
+            cols[c] = _readonly_values(s.to_numpy())
+        else:
+            cols[c] = s
+    return pd.DataFrame(cols, index=df.index, copy=False)
+
+
+def freeze_cube(obj: Any) -> Any:
+    """ปิด writeable ของทุก array ใน dataclass (SalesCube / SubCube / RegionRollup ...) และห่อ dict ด้วย MappingProxyType"""
+    if not dataclasses.is_dataclass(obj):
+        return obj
+    changes = {}
+    for f in dataclasses.fields(obj):
+        v = getattr(obj, f.name)
+        if isinstance(v, np.ndarray):
+            freeze_array(v)
+        elif isinstance(v, dict):
+            changes[f.name] = MappingProxyType({k: freeze_cube(x) for k, x in v.items()})
+        elif dataclasses.is_dataclass(v):
+            changes[f.name] = freeze_cube(v)
+    return dataclasses.replace(obj, **changes) if changes else obj
+
+
+def _frame_fingerprint(df: pd.DataFrame) -> tuple:
+    return (id(df.index), id(df.columns), df.shape, tuple(df.columns))
+
+
+def dataset_fingerprint(dataset) -> tuple:
+    """ลายนิ้วมือโครงสร้างของชุดข้อมูล (ถูกพอจะคำนวณได้ทุก rerun)"""
+    parts = []
+    for v in dataset:
+        if isinstance(v, pd.DataFrame):
+            parts.append(_frame_fingerprint(v))
+        elif isinstance(v, pd.Series):
+            parts.append((id(v.index), len(v)))
+        elif isinstance(v, (list, tuple)):
+            parts.append(tuple(v))
+        else:
+            parts.append(id(v))
+    return tuple(parts)
+
+
+def assert_unmodified(dataset, fingerprint: tuple) -> None:
+    """raise RuntimeError ถ้าโครงสร้างชุดข้อมูลที่แชร์ถูกเปลี่ยนระหว่าง rerun"""
+    if dataset_fingerprint(dataset) != fingerprint:
+        raise RuntimeError(
+            "ชุดข้อมูลที่แชร์ข้าม session ถูกแก้ไขระหว่าง render "
+            "(ให้ใช้ .copy() ก่อนแก้ DataFrame ในคอมโพเนนต์)"
+        )
@@ -0,0 +1,68 @@
+# utils/settings.py
+# -*- coding: utf-8 -*-
+"""
+ค่าตั้งค่าของแอป (อ่านจาก environment variable ครั้งเดียวตอน import)
+
+- OTOP_LAZY_TABS        : 1 = สร้างเฉพาะส่วนที่กำลังดู (ค่าเริ่มต้น), 0 = ใช้ st.tabs สร้างทุกแท็บ
+- OTOP_FIGURE_CACHE     : จำนวนรูปกราฟสูงสุดในแคชรูป (LRU, รวมทุกกราฟ)
+                          OTOP_WARMUP=1 ขยายเองให้จุทุก view (ข้อมูลจริง ~3,000 รูป / ~270 MB) — ค่านี้เป็นขั้นต่ำ
+- OTOP_PAYLOAD_ENCODE   : 1 = ส่งกราฟเป็น typed array + texttemplate (ค่าเริ่มต้น), 0 = JSON เดิมของ Plotly
+- OTOP_PAYLOAD_BUDGET_KB: งบขนาด payload ต่อกราฟ (เกินแล้ว log warning, 0 = ไม่ตรวจ)
+- OTOP_WARMUP           : 1 = อุ่นแคชรูปทุก (เดือน, จังหวัด) ในเบื้องหลังตอนเริ่มเซิร์ฟเวอร์
+- OTOP_WARMUP_WORKERS   : จำนวน thread ที่ใช้อุ่นแคช
+- OTOP_WARMUP_MEMORY_MB : หยุดอุ่นแคชเมื่อหน่วยความจำของโปรเซสเกินค่านี้
+- OTOP_YEAR_CACHE       : จำนวนปีงบที่เก็บชุดข้อมูล (คิวบ์) ไว้ในหน่วยความจำพร้อมกัน (LRU)
+- OTOP_YEAR_MEMORY_MB   : หน่วยความจำของโปรเซสเกินค่านี้ -> ไล่ปีงบที่ไม่ได้ใช้นานที่สุดออก
+- OTOP_MAP_ENGINE       : mapbox = แผนที่พื้นหลังจาก tile server (ค่าเริ่มต้น), geo = วาดขอบเขตจังหวัดล้วน ไม่ใช้ tile
+- OTOP_PROFILE          : 1 = จับเวลา / payload / cache hit ของทุกคอมโพเนนต์ต่อ rerun (utils/profiler.py)
+                          ค่าเริ่มต้น = ตาม OTOP_DIAGNOSTICS (ปิดใน production); metrics p50/p95 ต่อคอมโพเนนต์ต้องเปิดค่านี้
+- OTOP_PROFILE_LOG      : ไฟล์ JSON lines ที่ต่อท้าย record ของโปรไฟล์ (ว่าง = ไม่เขียนไฟล์; แยกไฟล์ต่อ pid)
+- OTOP_PROFILE_LOG_MB   : ขนาดไฟล์ log โปรไฟล์ก่อนหมุนไฟล์
+- OTOP_DIAGNOSTICS      : 1 = แสดงแผงวินิจฉัย (เวลาต่อคอมโพเนนต์ + p50/p95) ใน sidebar (เปิดโปรไฟล์ด้วย)
+- OTOP_METRICS_FILE     : ไฟล์ที่เขียน metrics แบบ Prometheus text ซ้ำทุกช่วง (ว่าง = ไม่เขียน, utils/metrics.py)
+- OTOP_METRICS_INTERVAL : วินาทีระหว่างการเขียนไฟล์ metrics
+- OTOP_METRICS_PORT     : พอร์ต HTTP ของ /metrics (0 = ไม่เปิด)
+- OTOP_METRICS_ADDR     : address ที่พอร์ต metrics ผูก
+- OTOP_METRICS_PORT_SPAN: จำนวนพอร์ตที่ลองต่อจาก OTOP_METRICS_PORT (หลาย worker: แต่ละตัวได้พอร์ตว่างถัดไป)
+- OTOP_SHARED_DIR       : โฟลเดอร์ของชุดข้อมูลที่คำนวณแล้วแบบแชร์ข้ามโปรเซส (utils/shared.py; ว่าง = แต่ละโปรเซสสร้างเอง)
+                          ทุกโปรเซสบนเครื่องเดียวกันต้องชี้ที่เดียวกัน
+- OTOP_CATALOG_POLL     : วินาทีระหว่างการตรวจ CURRENT ของคลังข้อมูล (snapshot ใหม่ถูกใช้ใน rerun ถัดไป; 0 = อ่านครั้งเดียว)
+"""
+import os
+
+
+def env_flag(name: str, default: bool) -> bool:
+    v = os.environ.get(name)
+    if v is None or v.strip() == "":
+        return default
+    return v.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+LAZY_TABS = env_flag("OTOP_LAZY_TABS", True)
+FIGURE_CACHE_ENTRIES = env_int("OTOP_FIGURE_CACHE", 256)
+PAYLOAD_ENCODE = env_flag("OTOP_PAYLOAD_ENCODE", True)
+PAYLOAD_BUDGET_KB = env_int("OTOP_PAYLOAD_BUDGET_KB", 100)
+WARMUP = env_flag("OTOP_WARMUP", False)
+WARMUP_WORKERS = env_int("OTOP_WARMUP_WORKERS", 2)
+WARMUP_MEMORY_MB = env_int("OTOP_WARMUP_MEMORY_MB", 1024)
+YEAR_CACHE = env_int("OTOP_YEAR_CACHE", 3)
+YEAR_MEMORY_MB = env_int("OTOP_YEAR_MEMORY_MB", 1536)
+MAP_ENGINE = os.environ.get("OTOP_MAP_ENGINE", "mapbox").strip().lower() or "mapbox"
+DIAGNOSTICS = env_flag("OTOP_DIAGNOSTICS", False)
+PROFILE = env_flag("OTOP_PROFILE", DIAGNOSTICS)
+PROFILE_LOG = os.environ.get("OTOP_PROFILE_LOG", "").strip()
+PROFILE_LOG_MB = env_int("OTOP_PROFILE_LOG_MB", 10)
+METRICS_FILE = os.environ.get("OTOP_METRICS_FILE", "").strip()
+METRICS_INTERVAL = env_int("OTOP_METRICS_INTERVAL", 15)
+METRICS_PORT = env_int("OTOP_METRICS_PORT", 0)
+METRICS_PORT_SPAN = env_int("OTOP_METRICS_PORT_SPAN", 8)
+METRICS_ADDR = os.environ.get("OTOP_METRICS_ADDR", "127.0.0.1").strip() or "127.0.0.1"
+SHARED_DIR = os.environ.get("OTOP_SHARED_DIR", "").strip()
+CATALOG_POLL = env_int("OTOP_CATALOG_POLL", 5)
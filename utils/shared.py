@@ -0,0 +1,386 @@
+# utils/shared.py
+# -*- coding: utf-8 -*-
+"""
+ชุดข้อมูลที่คำนวณแล้วแบบแชร์ข้ามโปรเซส (หลายโปรเซส Streamlit หลัง reverse proxy บนเครื่องเดียว)
+
+    dataset = load_or_publish(path, build)   # build() = สร้างชุดข้อมูลตามปกติ (เรียกแค่โปรเซสเดียว)
+
+segment หนึ่งชุด = โฟลเดอร์:
+    meta.json      <- โครงสร้างของอ็อบเจ็กต์ (dataclass / NamedTuple / DataFrame / dict ...) + ตำแหน่งของทุก array
+    arrays.bin     <- ข้อมูลดิบของทุก array ต่อกัน (จัดแนว 64 byte)
+
+- publish: โปรเซสแรกที่ขอ (ถือ file lock) เรียก build() แล้วเขียนลงโฟลเดอร์ชั่วคราว ก่อน os.replace เป็นชื่อจริง
+  -> ผู้อ่านเห็น segment ครบทั้งชุดหรือไม่เห็นเลย; โปรเซสอื่นที่รอ lock อยู่ไม่ build ซ้ำ
+- attach: mmap arrays.bin แบบอ่านอย่างเดียว แล้ว array ทุกตัวเป็น view (np.frombuffer) ไม่ copy —
+  page cache ของ OS ชุดเดียวใช้ร่วมทุกโปรเซส (ผู้ publish เองก็ทิ้งผล build แล้ว attach เหมือนกัน)
+- segment ไม่เปลี่ยนหลังเขียน: ข้อมูลชุดใหม่ = path ใหม่ (ผู้เรียกใส่ data_version ใน path)
+- โปรเซสที่ attach ถือ shared lock บน .<ชื่อ>.use จนกว่า mmap ถูกเก็บกวาด (ไม่มี array ไหนอ้างถึงแล้ว)
+  prune(root, keep) ลบ segment ของ data_version อื่นเฉพาะที่ไม่มีโปรเซสไหนถือ lock นั้นอยู่
+
+ใช้ไฟล์ mmap แทน multiprocessing.shared_memory: อยู่รอดโปรเซสที่สร้าง, ไม่ต้องมี owner คอย unlink
+และโปรเซสที่เริ่มทีหลังหา segment ได้จาก path ตรง ๆ
+class ที่ถอดกลับได้ต้องอยู่ในแพ็กเกจ utils/ เท่านั้น (meta.json ไม่ใช่ pickle — ไม่รันโค้ดตอนอ่าน)
+"""
+import dataclasses
+import importlib
+import json
+import mmap
+import os
+import shutil
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from types import MappingProxyType
+from typing import IO, Any, Callable, Collection, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:   # Windows: ไม่มี flock -> สองโปรเซสอาจ build พร้อมกัน (os.replace ยังรับประกันว่าได้ชุดเดียว)
+    fcntl = None
+
+SHARED_FORMAT = "otop-shared"
+SHARED_VERSION = 1
+ALIGN = 64
+META = "meta.json"
+ARRAYS = "arrays.bin"
+_PACKAGES = ("utils.",)
+
+
+# ------------------------------
+# เข้ารหัส: อ็อบเจ็กต์ -> meta (JSON) + array
+# ------------------------------
+class _Writer:
+    def __init__(self):
+        self.arrays: List[Tuple[int, np.ndarray]] = []
+        self.size = 0
+        self.strings: List[str] = []     # ตารางสตริง: ป้ายเดียวกัน (ชื่อจังหวัดใน index / hierarchy / dict) เก็บครั้งเดียว
+        self._string_pos: Dict[str, int] = {}
+
+    def string(self, s: str) -> int:
+        i = self._string_pos.get(s)
+        if i is None:
+            i = self._string_pos[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def string_table(self) -> dict:
+        """ตารางสตริงเป็น UTF-8 ต่อกัน + ตำแหน่งสิ้นสุดของแต่ละตัว (อยู่ใน arrays.bin ไม่ใช่ JSON)"""
+        encoded = [x.encode("utf-8") for x in self.strings]
+        ends = np.cumsum([len(b) for b in encoded], dtype=np.int64)
+        return {"text": self.add(np.frombuffer(b"".join(encoded), dtype=np.uint8)), "ends": self.add(ends)}
+
+    def add(self, a: np.ndarray) -> list:
+        a = np.ascontiguousarray(a)
+        if a.dtype.hasobject:
+            raise TypeError(f"array ชนิด object แชร์ข้ามโปรเซสไม่ได้ (shape {a.shape})")
+        offset = -(-self.size // ALIGN) * ALIGN
+        self.arrays.append((offset, a))
+        self.size = offset + a.nbytes
+        return [offset, a.dtype.str, list(a.shape)]
+
+
+def _class_name(cls: type) -> str:
+    name = f"{cls.__module__}:{cls.__qualname__}"
+    if not cls.__module__.startswith(_PACKAGES):
+        raise TypeError(f"แชร์ได้เฉพาะ class ใน utils/: {name}")
+    return name
+
+
+def _scalar(x: Any) -> Any:
+    return x.item() if isinstance(x, np.generic) else x
+
+
+def _is_plain(x: Any) -> bool:
+    return x is None or isinstance(x, (bool, int, float))
+
+
+def _encode_scalars(values, w: "_Writer") -> Optional[dict]:
+    """ลำดับของสตริง (หรือ None = -1) -> เลขในตารางสตริง, int ล้วน -> array, ค่า JSON ล้วน -> list ตรง ๆ;
+    อย่างอื่น -> None
+
+    ลำดับยาว (ป้ายจังหวัด, dict ตำแหน่ง) ไปอยู่ใน arrays.bin — meta.json เล็ก ไม่ต้อง parse JSON ก้อนใหญ่ทุกโปรเซส
+    """
+    values = [_scalar(x) for x in values]
+    if values and all(x is None or isinstance(x, str) for x in values) and any(x is not None for x in values):
+        return {"strs": w.add(np.array([-1 if x is None else w.string(x) for x in values], dtype=np.int32))}
+    if all(type(x) is int for x in values):
+        return {"ints": w.add(np.array(values, dtype=np.int64))}
+    if all(_is_plain(x) for x in values):
+        return {"plain": values}
+    return None
+
+
+def _encode_index(index: pd.Index, w: "_Writer") -> dict:
+    if isinstance(index, pd.RangeIndex):
+        return {"range": [index.start, index.stop, index.step], "name": index.name}
+    if isinstance(index, pd.MultiIndex):
+        raise TypeError("MultiIndex ยังไม่รองรับ")
+    labels = _encode_scalars(index, w)
+    if labels is None:
+        raise TypeError(f"ป้าย index ชนิด {index.dtype} แชร์ไม่ได้")
+    return {"labels": labels, "name": index.name}
+
+
+def _encode_frame(df: pd.DataFrame, w: _Writer) -> dict:
+    out = {"index": _encode_index(df.index, w), "columns": _encode_index(df.columns, w)}
+    dtypes = set(df.dtypes)
+    if len(dtypes) == 1 and next(iter(dtypes)).kind in "biuf":
+        out["block"] = w.add(df.to_numpy())     # ตัวเลขชนิดเดียว -> block 2 มิติ (เหมือนตารางในคลังข้อมูล)
+        return out
+    cols = []
+    for c in df.columns:
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            cols.append({"codes": w.add(s.cat.codes.to_numpy()),
+                         "categories": _encode_index(s.cat.categories, w), "ordered": bool(s.cat.ordered)})
+        elif s.dtype.kind in "biuf":
+            cols.append({"values": w.add(s.to_numpy())})
+        else:
+            raise TypeError(f"คอลัมน์ '{c}' ชนิด {s.dtype} แชร์ไม่ได้")
+    out["data"] = cols
+    return out
+
+
+def _encode(obj: Any, w: _Writer) -> dict:
+    obj = _scalar(obj)
+    if isinstance(obj, np.ndarray):
+        return {"array": w.add(obj)}
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return {"value": obj}
+    if isinstance(obj, pd.DataFrame):
+        return {"frame": _encode_frame(obj, w)}
+    if isinstance(obj, pd.Series):
+        return {"series": {"values": w.add(obj.to_numpy()), "index": _encode_index(obj.index, w), "name": obj.name}}
+    if dataclasses.is_dataclass(obj):
+        return {"dataclass": _class_name(type(obj)),
+                "fields": {f.name: _encode(getattr(obj, f.name), w) for f in dataclasses.fields(obj)}}
+    if isinstance(obj, tuple) and hasattr(obj, "_fields"):
+        return {"namedtuple": _class_name(type(obj)), "items": [_encode(x, w) for x in obj]}
+    if isinstance(obj, tuple):
+        return {"tuple": _encode_scalars(obj, w) or [_encode(x, w) for x in obj]}
+    if isinstance(obj, Mapping):
+        # key / value แยกเป็นสองลำดับ — key ที่เป็น int ต้องไม่กลายเป็นสตริงแบบ key ของ JSON
+        keys, values = list(obj.keys()), list(obj.values())
+        return {"dict": [_encode_scalars(keys, w) or [_encode(k, w) for k in keys],
+                         _encode_scalars(values, w) or [_encode(v, w) for v in values]],
+                "frozen": isinstance(obj, MappingProxyType)}
+    raise TypeError(f"ชนิด {type(obj).__name__} แชร์ข้ามโปรเซสไม่ได้")
+
+
+# ------------------------------
+# ถอดรหัส: meta + mmap -> อ็อบเจ็กต์ (array เป็น view อ่านอย่างเดียว)
+# ------------------------------
+def _resolve(name: str) -> type:
+    module, _, qualname = name.partition(":")
+    if not module.startswith(_PACKAGES):
+        raise ValueError(f"segment อ้าง class นอก utils/: {name}")
+    obj = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+class _Reader:
+    def __init__(self, buf, table: dict):
+        self.buf = buf
+        text = self.array(table["text"]).tobytes()
+        starts = [0, *self.array(table["ends"]).tolist()]
+        self.strings = [text[a:b].decode("utf-8") for a, b in zip(starts, starts[1:])]
+
+    def items(self, spec) -> list:
+        if isinstance(spec, list):
+            return [self.decode(x) for x in spec]
+        if "strs" in spec:
+            strings = self.strings
+            return [None if i < 0 else strings[i] for i in self.array(spec["strs"]).tolist()]
+        if "ints" in spec:
+            return self.array(spec["ints"]).tolist()
+        return spec["plain"]
+
+    def array(self, spec: list) -> np.ndarray:
+        offset, dtype, shape = spec
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        if count == 0:
+            a = np.empty(shape, dtype=dtype)
+            a.flags.writeable = False
+            return a
+        return np.frombuffer(self.buf, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+    def index(self, spec: dict) -> pd.Index:
+        if "range" in spec:
+            return pd.RangeIndex(*spec["range"], name=spec["name"])
+        return pd.Index(self.items(spec["labels"]), name=spec["name"])
+
+    def frame(self, spec: dict) -> pd.DataFrame:
+        index, columns = self.index(spec["index"]), self.index(spec["columns"])
+        if "block" in spec:
+            return pd.DataFrame(self.array(spec["block"]), index=index, columns=columns, copy=False)
+        cols = {}
+        for c, col in zip(columns, spec["data"]):
+            if "codes" in col:
+                dtype = pd.CategoricalDtype(self.index(col["categories"]), ordered=col["ordered"])
+                cols[c] = pd.Categorical.from_codes(self.array(col["codes"]), dtype=dtype)
+            else:
+                cols[c] = self.array(col["values"])
+        return pd.DataFrame(cols, index=index, copy=False)
+
+    def decode(self, spec: dict) -> Any:
+        if "array" in spec:
+            return self.array(spec["array"])
+        if "value" in spec:
+            return spec["value"]
+        if "frame" in spec:
+            return self.frame(spec["frame"])
+        if "series" in spec:
+            s = spec["series"]
+            return pd.Series(self.array(s["values"]), index=self.index(s["index"]), name=s["name"], copy=False)
+        if "dataclass" in spec:
+            return _resolve(spec["dataclass"])(**{k: self.decode(v) for k, v in spec["fields"].items()})
+        if "namedtuple" in spec:
+            return _resolve(spec["namedtuple"])(*(self.decode(x) for x in spec["items"]))
+        if "tuple" in spec:
+            return tuple(self.items(spec["tuple"]))
+        if "dict" in spec:
+            keys, values = spec["dict"]
+            d = dict(zip(self.items(keys), self.items(values)))
+            return MappingProxyType(d) if spec["frozen"] else d
+        raise ValueError(f"segment เสีย: ไม่รู้จัก {sorted(spec)}")
+
+
+# ------------------------------
+# publish / attach
+# ------------------------------
+def publish(path: Path, obj: Any) -> Path:
+    """เขียน obj เป็น segment ที่ path (ต้องยังไม่มี) — เขียนในโฟลเดอร์ชั่วคราวแล้วสลับชื่อแบบ atomic"""
+    path = Path(path)
+    w = _Writer()
+    root = _encode(obj, w)
+    meta = {"format": SHARED_FORMAT, "version": SHARED_VERSION, "strings": w.string_table(), "root": root}
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    try:
+        with open(tmp / ARRAYS, "wb") as f:
+            for offset, a in w.arrays:
+                f.seek(offset)
+                a.tofile(f)
+            f.truncate(w.size)
+        with open(tmp / META, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not (path / META).exists():     # ไม่ใช่กรณีโปรเซสอื่น publish ชุดเดียวกันไปก่อน
+            raise
+    return path
+
+
+def _use_lock(path: Path) -> Path:
+    return path.with_name(f".{path.name}.use")
+
+
+def _hold_shared(lock_path: Path) -> Optional[IO]:
+    """shared lock บน lock_path (คืนไฟล์ที่เปิดค้างไว้ — ปิดไฟล์ = ปล่อย lock)"""
+    if fcntl is None:
+        return None
+    while True:
+        f = open(lock_path, "a")
+        fcntl.flock(f, fcntl.LOCK_SH)
+        try:
+            if os.stat(lock_path).st_ino == os.fstat(f.fileno()).st_ino:
+                return f
+        except FileNotFoundError:
+            pass
+        f.close()                   # prune() ลบไฟล์ lock ไประหว่างเปิดกับได้ lock -> เปิดใหม่
+
+
+def attach(path: Path) -> Any:
+    """อ็อบเจ็กต์จาก segment — array ทุกตัวชี้ไปที่ mmap แบบอ่านอย่างเดียว (ไม่ copy)"""
+    path = Path(path)
+    held = _hold_shared(_use_lock(path))
+    try:
+        with open(path / META, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != SHARED_FORMAT or meta.get("version") != SHARED_VERSION:
+            raise ValueError(f"รูปแบบ segment ไม่รองรับ: {meta.get('format')} v{meta.get('version')}")
+        with open(path / ARRAYS, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+    except BaseException:
+        if held is not None:
+            held.close()
+        raise
+    if held is not None:
+        if isinstance(buf, mmap.mmap):
+            weakref.finalize(buf, held.close)     # ถือ lock ตราบที่ยังมี array อ้าง mmap นี้
+        else:
+            held.close()
+    return _Reader(buf, meta["strings"]).decode(meta["root"])
+
+
+def prune(root: Path, keep: Collection[str]) -> List[Path]:
+    """
+    ลบ segment ใต้ root/<data_version>/ ที่ data_version ไม่อยู่ใน keep และไม่มีโปรเซสไหน attach อยู่
+    -> รายการ segment ที่ลบ (ไม่มี flock -> บอกไม่ได้ว่าใครใช้อยู่ จึงไม่ลบอะไร)
+    """
+    root = Path(root)
+    if fcntl is None or not root.is_dir():
+        return []
+    removed = []
+    for version in root.iterdir():
+        if version.name in keep or version.name.startswith(".") or not version.is_dir():
+            continue
+        for seg in version.iterdir():
+            if not seg.name.startswith(".") and (seg / META).exists() and _remove_unused(seg):
+                removed.append(seg)
+        for lock in version.glob(".*.lock"):       # lock ของการ build ที่ไม่มีใครถือแล้ว
+            _remove_unused(lock, lock)
+        try:
+            version.rmdir()                         # ว่างแล้วเท่านั้น (ยังมี segment ที่ใช้อยู่ / กำลัง publish -> คงไว้)
+        except OSError:
+            pass
+    return removed
+
+
+def _remove_unused(target: Path, lock_path: Optional[Path] = None) -> bool:
+    """ลบ target ถ้าได้ exclusive lock (ไม่รอ) บน lock_path (ค่าเริ่มต้น = lock ของผู้ attach)"""
+    lock_path = lock_path or _use_lock(target)
+    with open(lock_path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        if target != lock_path:
+            shutil.rmtree(target, ignore_errors=True)
+        lock_path.unlink(missing_ok=True)
+    return True
+
+
+@contextmanager
+def _exclusive(lock_path: Path) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_or_publish(path: Path, build: Callable[[], Any]) -> Any:
+    """attach segment ที่ path; ยังไม่มี -> โปรเซสเดียว (ถือ lock) build แล้ว publish ก่อน"""
+    path = Path(path)
+    if not (path / META).exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _exclusive(path.with_name(f".{path.name}.lock")):
+            if not (path / META).exists():
+                publish(path, build())
+    try:
+        return attach(path)
+    except FileNotFoundError:       # prune() ของโปรเซสอื่นลบ segment (ข้อมูลชุดเก่า) ไประหว่างตรวจกับ attach
+        return load_or_publish(path, build)
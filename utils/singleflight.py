@@ -0,0 +1,76 @@
+# utils/singleflight.py
+# -*- coding: utf-8 -*-
+"""
+รวมงานซ้ำที่กำลังคำนวณอยู่ (request coalescing): หลาย session ขอ key เดียวกันพร้อมกัน -> คำนวณครั้งเดียว
+
+    flight = SingleFlight()
+    value, shared = flight.do(key, compute)   # shared = True ถ้าได้ผลจากงานของ thread อื่น
+
+- thread แรกของ key (leader) คำนวณ; thread ที่มาระหว่างนั้น (follower) รอแล้วได้ผลเดียวกัน
+- leader ล้มด้วย Exception -> follower ได้ exception เดียวกัน (ไม่คำนวณซ้ำเอง)
+- leader หยุดด้วย BaseException อื่น (StopException / RerunException ของ Streamlit, KeyboardInterrupt)
+  -> เป็นเรื่องของ session นั้นเท่านั้น: follower ไม่ได้รับต่อ แต่ลองใหม่ (คนแรกที่ลองเป็น leader คนใหม่)
+- ไม่ใช่แคช: งานจบแล้ว key ถูกลบทันที ผู้เรียกต้องเก็บผลลงแคชของตัวเองใน compute
+
+st.cache_resource / st.cache_data ของ Streamlit ล็อกราย key อยู่แล้ว — ใช้กับแคชของเราเอง (utils/figcache.py)
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "value", "error", "aborted")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[Exception] = None
+        self.aborted = False            # leader หยุดด้วย BaseException ที่ไม่ใช่ Exception -> follower ลองใหม่
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = self.followers = 0
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.leaders += 1
+                else:
+                    self.followers += 1
+            if leader:
+                break
+            call.done.wait()
+            if call.aborted:
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = compute()
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.aborted = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders, "followers": self.followers}
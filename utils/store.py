@@ -0,0 +1,265 @@
+# utils/store.py
+# -*- coding: utf-8 -*-
+"""
+คลังข้อมูลแบบคอลัมน์บนดิสก์ (.npy + manifest.json) สำหรับโหลดแบบ memory-map
+
+โครงสร้างไดเรกทอรี:
+    data/store/
+      CURRENT                  <- ชื่อ snapshot ที่ใช้งานอยู่ (สลับแบบ atomic)
+      <data_version>/
+        manifest.json          <- schema version, data_version, ปีงบที่มี, ป้าย index/columns ของแต่ละตาราง
+        fy2567/                <- partition รายปีงบประมาณ (แยกตามแกนเดือนของแต่ละตาราง)
+          province.npy         <- จำนวนเงิน 2 มิติ (rows x columns) เป็นสตางค์ int64
+          channel.npy
+          product_type.npy
+          district.npy         <- (ไม่บังคับ) index 2 ระดับ (จังหวัด, อำเภอ) เรียงแถวเป็นกลุ่มตามจังหวัด
+        fy2568/
+          ...
+
+- write_store(): แบ่งตารางตามปีงบ (utils/timedim.py) เขียน snapshot ใหม่ แล้วชี้ CURRENT ไปที่ snapshot นั้น
+- open_store(): อ่านแค่ manifest; ตารางของปีงบใดถูก np.load(..., mmap_mode="r") เมื่อขอ snapshot.tables(ปีงบ)
+  (ไม่ parse ข้อความ, ไม่ copy, ปีที่ไม่มีใครดูไม่ถูกแตะเลย)
+- แต่ละ partition มี data_version ของตัวเอง: ingest ปีใหม่ไม่ทำให้แคชของปีเก่าใช้ไม่ได้
+- ตารางที่ index มี 2 ระดับ (เช่น district) ถูกเรียงให้แถวของกลุ่มเดียวกันติดกัน และ manifest เก็บช่วงแถว
+  ของแต่ละกลุ่ม: snapshot.group(ปีงบ, "district", จังหวัด) อ่านเฉพาะแถวของจังหวัดนั้นจาก mmap
+  (tables() ไม่รวมตารางแบบกลุ่ม — ชุดข้อมูลหลักของปีงบไม่แตะข้อมูลรายอำเภอเลย)
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.money import MONEY_DTYPE, to_satang
+from utils.timedim import parse_month
+
+STORE_FORMAT = "otop-npy"
+STORE_VERSION = 3
+STORE_UNIT = "satang"
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent.parent / "data" / "store"
+
+
+def store_dir() -> Path:
+    """ตำแหน่งคลังข้อมูล (override ได้ด้วย env OTOP_STORE_DIR)"""
+    return Path(os.environ.get("OTOP_STORE_DIR", DEFAULT_STORE_DIR))
+
+
+class StoreSnapshot(NamedTuple):
+    path: Path
+    manifest: dict
+
+    @property
+    def data_version(self) -> str:
+        return self.manifest["data_version"]
+
+    @property
+    def fiscal_years(self) -> Tuple[int, ...]:
+        return tuple(int(y) for y in self.manifest["fiscal_years"])
+
+    def partition_version(self, fiscal_year: int) -> str:
+        return self._partition(fiscal_year)["data_version"]
+
+    def months(self, fiscal_year: int) -> Tuple[str, ...]:
+        return tuple(self._partition(fiscal_year)["months"])
+
+    def tables(self, fiscal_year: int) -> Dict[str, pd.DataFrame]:
+        """ตารางของปีงบ (memory-map; ยังไม่อ่านข้อมูลจนกว่าจะใช้) — ไม่รวมตารางแบบกลุ่ม (ดู group)"""
+        tables = {}
+        for name, meta in self._partition(fiscal_year)["tables"].items():
+            if "groups" in meta:
+                continue
+            values = np.load(self.path / meta["file"], mmap_mode="r", allow_pickle=False)
+            index = pd.Index(meta["index"], name=meta["index_name"])
+            tables[name] = pd.DataFrame(values, index=index, columns=meta["columns"], copy=False)
+        return tables
+
+    def has_groups(self, fiscal_year: int, name: str) -> bool:
+        meta = self._partition(fiscal_year)["tables"].get(name)
+        return meta is not None and "groups" in meta
+
+    def group(self, fiscal_year: int, name: str, key: str) -> Optional[pd.DataFrame]:
+        """แถวของกลุ่มเดียว (เช่น อำเภอของจังหวัดหนึ่ง) จากตารางแบบกลุ่ม: index = ระดับที่สอง; ไม่มี -> None"""
+        meta = self._partition(fiscal_year)["tables"].get(name)
+        if meta is None or key not in meta.get("groups", {}):
+            return None
+        start, stop = meta["groups"][key]
+        values = np.load(self.path / meta["file"], mmap_mode="r", allow_pickle=False)[start:stop]
+        index = pd.Index([i[1] for i in meta["index"][start:stop]], name=meta["index_name"][1])
+        return pd.DataFrame(values, index=index, columns=meta["columns"], copy=False)
+
+    def _partition(self, fiscal_year: int) -> dict:
+        part = self.manifest["partitions"].get(str(fiscal_year))
+        if part is None:
+            raise KeyError(f"ไม่มีข้อมูลปีงบ {fiscal_year} ในคลังข้อมูล (มี {list(self.fiscal_years)})")
+        return part
+
+
+# ------------------------------
+# แบ่ง partition ตามปีงบ
+# ------------------------------
+def _fiscal_years_of(labels) -> Optional[np.ndarray]:
+    """ปีงบของป้ายแต่ละตัว (ไม่ใช่ป้ายเดือนพร้อมปี -> 0); ไม่มีป้ายเดือนเลย -> None"""
+    fys = np.array([(p.fiscal_year or 0) if (p := parse_month(x)) is not None else 0 for x in labels], dtype=int)
+    return fys if (fys > 0).any() else None
+
+
+def split_fiscal_years(df: pd.DataFrame) -> Dict[int, pd.DataFrame]:
+    """ตาราง -> {ปีงบ: ตารางย่อย}; แกนเดือนคือ columns (เช่น province) หรือ index (เช่น channel)"""
+    fys = _fiscal_years_of(df.columns)
+    if fys is not None:
+        return {int(y): df.loc[:, fys == y] for y in np.unique(fys[fys > 0])}
+    fys = _fiscal_years_of(df.index)
+    if fys is not None:
+        return {int(y): df.loc[fys == y] for y in np.unique(fys[fys > 0])}
+    raise ValueError(f"ตาราง '{df.index.name}' ไม่มีแกนเดือน (ต้องมีป้ายเดือนพร้อมปี พ.ศ.)")
+
+
+# ------------------------------
+# เขียน snapshot
+# ------------------------------
+def _as_satang(df: pd.DataFrame) -> pd.DataFrame:
+    if all(dt.kind in "iu" for dt in df.dtypes):
+        return df.astype(MONEY_DTYPE)
+    return pd.DataFrame(to_satang(df.to_numpy(dtype=float)), index=df.index, columns=df.columns)
+
+
+def _grouped(df: pd.DataFrame) -> pd.DataFrame:
+    """index 2 ระดับ -> เรียงแถวให้กลุ่ม (ระดับแรก) ติดกัน โดยคงลำดับที่กลุ่มปรากฏครั้งแรกและลำดับภายในกลุ่ม"""
+    first = df.index.get_level_values(0)
+    order = {g: i for i, g in enumerate(dict.fromkeys(first))}
+    return df.iloc[np.argsort([order[g] for g in first], kind="stable")]
+
+
+def _data_version(tables: Dict[str, pd.DataFrame]) -> str:
+    h = hashlib.sha1()
+    for name in sorted(tables):
+        df = tables[name]
+        h.update(name.encode("utf-8"))
+        h.update(json.dumps([df.index.name, list(map(str, df.index)), list(map(str, df.columns))],
+                            ensure_ascii=False).encode("utf-8"))
+        h.update(np.ascontiguousarray(df.to_numpy(dtype=MONEY_DTYPE)).tobytes())
+    return h.hexdigest()[:12]
+
+
+def write_store(tables: Dict[str, pd.DataFrame], root: Optional[Path] = None) -> Path:
+    """เขียนตาราง (index = มิติหลัก, columns = มิติรอง, ค่าเป็นสตางค์ int64) เป็น snapshot ใหม่ แบ่งตามปีงบ
+
+    ตารางที่เป็น float ถือเป็นบาท และถูกแปลงเป็นสตางค์ก่อนเขียน
+    """
+    root = Path(root or store_dir())
+    tables = {name: _as_satang(df) for name, df in tables.items()}
+    tables = {name: (_grouped(df) if df.index.nlevels == 2 else df) for name, df in tables.items()}
+    version = _data_version(tables)
+    snap = root / version
+    if (snap / "manifest.json").exists():
+        # ข้อมูลเดิมทุก byte (ชื่อ snapshot = hash ของเนื้อหา): ไม่เขียนทับไฟล์ที่โปรเซสอื่น mmap อยู่ แค่ชี้ CURRENT
+        _point_current(root, version)
+        return snap
+
+    parts: Dict[int, Dict[str, pd.DataFrame]] = {}
+    for name, df in tables.items():
+        for fy, sub in split_fiscal_years(df).items():
+            parts.setdefault(fy, {})[name] = sub
+    # ตารางแบบกลุ่ม (รายอำเภอ) ไม่บังคับ: ปีที่ไม่มีก็แค่ drill-down ลงระดับอำเภอไม่ได้
+    required = {name for name, df in tables.items() if df.index.nlevels == 1}
+    incomplete = sorted(fy for fy, t in parts.items() if not required <= set(t))
+    if incomplete:
+        raise ValueError(f"ปีงบ {incomplete} มีข้อมูลไม่ครบทุกตาราง ({sorted(required)})")
+
+    manifest = {
+        "format": STORE_FORMAT,
+        "version": STORE_VERSION,
+        "data_version": version,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "unit": STORE_UNIT,
+        "fiscal_years": sorted(parts),
+        "partitions": {},
+    }
+    # เขียนลงโฟลเดอร์ชั่วคราวชื่อไม่ซ้ำ แล้วสลับชื่อเป็น <version> ทีเดียว (ingest พร้อมกันไม่ชนกัน)
+    root.mkdir(parents=True, exist_ok=True)
+    work = Path(tempfile.mkdtemp(prefix=f".{version}.", dir=root))
+    work.chmod(0o755)                               # mkdtemp สร้างแบบ 0700 — โปรเซสของผู้ใช้อื่นต้องอ่านได้
+    for fy in sorted(parts):
+        part_dir = work / f"fy{fy}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        entry = {"data_version": _data_version(parts[fy]), "months": [], "tables": {}}
+        for name, df in parts[fy].items():
+            values = np.ascontiguousarray(df.to_numpy(dtype=MONEY_DTYPE))
+            np.save(part_dir / f"{name}.npy", values, allow_pickle=False)
+            meta = entry["tables"][name] = {
+                "file": f"fy{fy}/{name}.npy",
+                "dtype": str(values.dtype),
+                "shape": list(values.shape),
+                "index_name": df.index.name,
+                "index": [str(i) for i in df.index],
+                "columns": [str(c) for c in df.columns],
+            }
+            if df.index.nlevels == 2:
+                keys = [str(g) for g in df.index.get_level_values(0)]
+                meta["index_name"] = [str(n) for n in df.index.names]
+                meta["index"] = [[str(a), str(b)] for a, b in df.index]
+                meta["groups"] = {}
+                for i, g in enumerate(keys):
+                    meta["groups"].setdefault(g, [i, i])[1] = i + 1
+        first = next(df for name, df in parts[fy].items() if name in required)
+        entry["months"] = [str(c) for c in (first.columns if _fiscal_years_of(first.columns) is not None else first.index)]
+        manifest["partitions"][str(fy)] = entry
+    with open(work / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    if snap.exists() and not (snap / "manifest.json").exists():
+        shutil.rmtree(snap)                         # เศษจากการเขียนที่ล้มกลางทาง (ไม่มีใครอ่านได้เพราะไม่มี manifest)
+    try:
+        os.replace(work, snap)
+    except OSError:
+        shutil.rmtree(work, ignore_errors=True)
+        if not (snap / "manifest.json").exists():   # ไม่ใช่กรณี ingest อื่นเขียนชุดเดียวกันเสร็จก่อน
+            raise
+
+    _point_current(root, version)
+    return snap
+
+
+def _point_current(root: Path, version: str) -> None:
+    """สลับ CURRENT แบบ atomic (ผู้อ่านเห็นแค่ snapshot เก่าหรือใหม่ ไม่มีครึ่ง ๆ กลาง ๆ)"""
+    fd, tmp = tempfile.mkstemp(prefix=".CURRENT.", dir=root)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(version + "\n")
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, root / "CURRENT")
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+# ------------------------------
+# อ่าน snapshot (memory-map)
+# ------------------------------
+def current_version(root: Optional[Path] = None) -> str:
+    root = Path(root or store_dir())
+    try:
+        return (root / "CURRENT").read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"ไม่พบคลังข้อมูลที่ {root} — รัน `python -m utils.ingest` เพื่อสร้างก่อน"
+        ) from None
+
+
+def open_store(root: Optional[Path] = None, version: Optional[str] = None) -> StoreSnapshot:
+    root = Path(root or store_dir())
+    snap = root / (version or current_version(root))
+    with open(snap / "manifest.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != STORE_FORMAT or manifest.get("version") != STORE_VERSION:
+        raise ValueError(f"รูปแบบคลังข้อมูลไม่รองรับ: {manifest.get('format')} v{manifest.get('version')}")
+
+    if not manifest.get("fiscal_years"):
+        raise ValueError(f"คลังข้อมูล {snap.name} ไม่มี partition ปีงบใดเลย")
+    return StoreSnapshot(path=snap, manifest=manifest)
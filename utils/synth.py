@@ -0,0 +1,263 @@
+# utils/synth.py
+# -*- coding: utf-8 -*-
+"""
+ข้อมูล OTOP สังเคราะห์ที่สมจริงทางสถิติ สำหรับทดสอบขนาด / โหลด / วางแผนความจุ (ไม่มีข้อมูลจริงหลุดออกไป)
+
+ใช้งาน:
+    python -m utils.synth --provinces 10000 --months 240 --store /tmp/otop-synth     # เขียนคลังข้อมูลพร้อมใช้
+    python -m utils.synth --provinces 77 --months 36 --districts 12 --csv-dir /tmp/raw  # CSV แบบเดียวกับ data/raw
+    OTOP_STORE_DIR=/tmp/otop-synth streamlit run app.py
+
+รูปร่างที่เรียนจากข้อมูลจริง (fit_shapes):
+- ขนาดจังหวัด: log-normal ของยอดรวมรายปี (หางยาว — ไม่กี่จังหวัดครองยอดส่วนใหญ่)
+- ฤดูกาล: สัดส่วนตามเดือนของปี ระดับประเทศ และของแต่ละจังหวัดจริง
+- ความผันผวนรายเดือน: ส่วนต่าง log ระหว่างค่าจริงกับ (ขนาด x ฤดูกาลระดับประเทศ)
+- สัดส่วนช่องทาง / ประเภทสินค้า ตามเดือนของปี
+
+ความสอดคล้องแบบเดียวกับข้อมูลจริง (สตางค์ int64 แบ่งแบบจำนวนเต็มพอดี — allocate):
+    ผลรวมช่องทาง = ผลรวมประเภทสินค้า = ผลรวมจังหวัด ทุกเดือน
+    ผลรวมอำเภอ = ยอดจังหวัด, ผลรวมรายวัน = ยอดรายเดือน
+
+ความละเอียด: คลังข้อมูลและแอปเป็นรายเดือน (utils/timedim.py) — รายอำเภอเขียนเป็นตาราง district
+(utils/store.py) ส่วนรายวันสร้างเป็นตารางแยก (จังหวัด x วันที่ ISO) สำหรับระบบอื่น / ทดสอบโหลด
+แล้วรวมเป็นรายเดือนก่อนเข้าคลัง
+"""
+import argparse
+import calendar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.money import MONEY_DTYPE, format_satang
+from utils.store import StoreSnapshot, open_store, write_store
+from utils.timedim import BE_OFFSET, build_timedim, period_from_ordinal
+
+# น้ำหนักยอดขายตามวันในสัปดาห์ (จันทร์..อาทิตย์) — งานแสดงสินค้า / ตลาดนัดหนักช่วงสุดสัปดาห์
+WEEKDAY_WEIGHTS = np.array([0.85, 0.85, 0.9, 0.95, 1.05, 1.25, 1.15])
+
+
+@dataclass(frozen=True)
+class Shapes:
+    provinces: Tuple[str, ...]        # ชื่อจังหวัดจริง (ใช้เป็นชื่อของแถวแรก ๆ -> แผนที่ยังจับคู่ได้)
+    province_season: np.ndarray      # (P_real, 12) ตัวคูณตามเดือนของปี (เฉลี่ย 1)
+    season: np.ndarray               # (12,) ระดับประเทศ (เฉลี่ย 1)
+    log_size_mu: float               # log ยอดรวมรายเดือนเฉลี่ยของจังหวัด (สตางค์)
+    log_size_sigma: float
+    real_log_size: np.ndarray        # (P_real,) ของจังหวัดจริง
+    noise_sigma: float               # ความผันผวนรายเดือน (log)
+    channels: Tuple[str, ...]
+    channel_share: np.ndarray        # (12, C)
+    products: Tuple[str, ...]
+    product_share: np.ndarray        # (12, K)
+    end_ordinal: int                 # เดือนล่าสุดของข้อมูลจริง
+    index_names: Tuple[str, str]     # ("จังหวัด", "เดือน")
+
+
+# ------------------------------
+# เรียนรูปร่างจากข้อมูลจริง
+# ------------------------------
+def real_tables(snapshot: Optional[StoreSnapshot] = None) -> Dict[str, pd.DataFrame]:
+    """ตารางหลักทุกปีงบในคลัง ต่อกันตามแกนเดือน (สตางค์)"""
+    snapshot = snapshot or open_store()
+    parts = [snapshot.tables(fy) for fy in snapshot.fiscal_years]
+    return {
+        "province": pd.concat([p["province"] for p in parts], axis=1),
+        "channel": pd.concat([p["channel"] for p in parts], axis=0),
+        "product_type": pd.concat([p["product_type"] for p in parts], axis=0),
+    }
+
+
+def _by_month_of_year(labels: Sequence, values: np.ndarray) -> np.ndarray:
+    """ค่าเฉลี่ยตามเดือนของปีของ values (..., M) -> (..., 12); เดือนที่ไม่มีข้อมูลใช้ค่าเฉลี่ยรวม"""
+    moy = np.array([p.month for p in build_timedim(labels).periods]) - 1
+    out = np.repeat(values.mean(axis=-1, keepdims=True), 12, axis=-1).astype(float)
+    for k in range(12):
+        if (moy == k).any():
+            out[..., k] = values[..., moy == k].mean(axis=-1)
+    return out
+
+
+def _unit_mean(a: np.ndarray) -> np.ndarray:
+    return a / np.maximum(a.mean(axis=-1, keepdims=True), 1e-12)
+
+
+def _shares(df: pd.DataFrame) -> np.ndarray:
+    v = df.to_numpy(dtype=float)
+    share = v / np.maximum(v.sum(axis=1, keepdims=True), 1.0)
+    out = _by_month_of_year(df.index, share.T).T
+    return out / out.sum(axis=1, keepdims=True)
+
+
+def fit_shapes(tables: Dict[str, pd.DataFrame]) -> Shapes:
+    df1 = tables["province"]
+    v = np.maximum(df1.to_numpy(dtype=float), 1.0)
+    season_p = _unit_mean(_by_month_of_year(df1.columns, v))                # (P, 12)
+    season = _unit_mean(_by_month_of_year(df1.columns, v.sum(axis=0)))      # (12,)
+    log_size = np.log(v.mean(axis=1))
+    moy = np.array([p.month for p in build_timedim(df1.columns).periods]) - 1
+    # เทียบกับฤดูกาลระดับประเทศ (ข้อมูลจริงมีปีเดียว: ฤดูกาลรายจังหวัดจะกลืนส่วนต่างไปหมด)
+    resid = np.log(v) - log_size[:, None] - np.log(season[moy])[None]
+    return Shapes(
+        provinces=tuple(str(p) for p in df1.index),
+        province_season=season_p,
+        season=season,
+        log_size_mu=float(log_size.mean()),
+        log_size_sigma=float(log_size.std()),
+        real_log_size=log_size,
+        noise_sigma=float(np.clip(resid.std(), 0.02, 0.5)),
+        channels=tuple(str(c) for c in tables["channel"].columns),
+        channel_share=_shares(tables["channel"]),
+        products=tuple(str(c) for c in tables["product_type"].columns),
+        product_share=_shares(tables["product_type"]),
+        end_ordinal=int(build_timedim(df1.columns).ordinals[-1]),
+        index_names=(str(df1.index.name), str(tables["channel"].index.name)),
+    )
+
+
+# ------------------------------
+# สร้างข้อมูล
+# ------------------------------
+def allocate(totals: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """แบ่ง totals (N,) จำนวนเต็มตามน้ำหนัก (N, K) แบบเศษเหลือมากสุด — ผลรวมแต่ละแถวเท่า totals พอดี"""
+    totals = np.asarray(totals, dtype=MONEY_DTYPE)
+    w = np.asarray(weights, dtype=float)
+    w = w / w.sum(axis=1, keepdims=True)
+    raw = totals[:, None] * w
+    out = np.floor(raw).astype(MONEY_DTYPE)
+    short = totals - out.sum(axis=1)
+    order = np.argsort(-(raw - out), axis=1, kind="stable")
+    bump = np.arange(w.shape[1])[None, :] < short[:, None]
+    np.put_along_axis(out, order, np.take_along_axis(out, order, axis=1) + bump, axis=1)
+    return out
+
+
+def _province_names(shapes: Shapes, n: int) -> list:
+    real = shapes.provinces
+    return [real[k] if k < len(real) else f"{real[k % len(real)]} #{k // len(real)}" for k in range(n)]
+
+
+def _days(periods) -> Tuple[list, np.ndarray]:
+    """วันที่ ISO ของทุกเดือน + ดัชนีเดือนของแต่ละวัน"""
+    labels, month_of_day = [], []
+    for m, p in enumerate(periods):
+        year = p.year_be - BE_OFFSET
+        _, n_days = calendar.monthrange(year, p.month)
+        labels += [f"{year:04d}-{p.month:02d}-{d:02d}" for d in range(1, n_days + 1)]
+        month_of_day += [m] * n_days
+    return labels, np.array(month_of_day)
+
+
+def generate(
+    shapes: Shapes,
+    n_provinces: int,
+    n_months: int,
+    seed: int = 0,
+    growth: float = 0.05,
+    districts: int = 0,
+    daily: bool = False,
+) -> Dict[str, pd.DataFrame]:
+    """
+    ตาราง {"province", "channel", "product_type"} (+ "district" เมื่อ districts > 0, + "daily" เมื่อ daily)
+    เป็นสตางค์ int64 ขนาด n_provinces จังหวัด x n_months เดือน ย้อนหลังจากเดือนล่าสุดของข้อมูลจริง
+    districts = จำนวนอำเภอเฉลี่ยต่อจังหวัด; ผลลัพธ์ deterministic ตาม seed
+    """
+    rng = np.random.default_rng(seed)
+    n_real = len(shapes.provinces)
+    periods = [period_from_ordinal(o) for o in range(shapes.end_ordinal - n_months + 1, shapes.end_ordinal + 1)]
+    labels = [p.label() for p in periods]
+    moy = np.array([p.month for p in periods]) - 1
+    years_back = (shapes.end_ordinal - np.array([p.ordinal for p in periods])) / 12.0
+
+    # ขนาด (หางยาว) + ฤดูกาล + แนวโน้มรายจังหวัด + ความผันผวนรายเดือน
+    log_size = rng.normal(shapes.log_size_mu, shapes.log_size_sigma, n_provinces)
+    log_size[:min(n_real, n_provinces)] = shapes.real_log_size[:n_provinces]
+    season = np.empty((n_provinces, 12))
+    season[:n_real] = shapes.province_season[:n_provinces]
+    if n_provinces > n_real:
+        jitter = rng.lognormal(0.0, 0.1, (n_provinces - n_real, 12))
+        season[n_real:] = _unit_mean(shapes.season[None] * jitter)
+    trend = (1.0 + growth + rng.normal(0.0, 0.03, (n_provinces, 1))) ** -years_back[None]
+    noise = rng.lognormal(-0.5 * shapes.noise_sigma ** 2, shapes.noise_sigma, (n_provinces, n_months))
+    province = np.rint(np.exp(log_size)[:, None] * season[:, moy] * trend * noise).astype(MONEY_DTYPE)
+
+    names = _province_names(shapes, n_provinces)
+    row_name, month_name = shapes.index_names
+    out = {"province": pd.DataFrame(province, index=pd.Index(names, name=row_name), columns=labels)}
+
+    national = province.sum(axis=0)
+    for key, cols, share in (("channel", shapes.channels, shapes.channel_share),
+                             ("product_type", shapes.products, shapes.product_share)):
+        w = share[moy] * rng.lognormal(0.0, 0.05, (n_months, len(cols)))
+        out[key] = pd.DataFrame(allocate(national, w), index=pd.Index(labels, name=month_name), columns=list(cols))
+
+    if districts > 0:
+        out["district"] = _districts(rng, province, names, labels, districts, row_name)
+    if daily:
+        day_labels, month_of_day = _days(periods)
+        dow = np.array([calendar.weekday(*map(int, d.split("-"))) for d in day_labels])
+        values = np.empty((n_provinces, len(day_labels)), dtype=MONEY_DTYPE)
+        for m in range(n_months):
+            cols = np.flatnonzero(month_of_day == m)
+            w = WEEKDAY_WEIGHTS[dow[cols]][None] * rng.lognormal(0.0, 0.2, (n_provinces, len(cols)))
+            values[:, cols] = allocate(province[:, m], w)
+        out["daily"] = pd.DataFrame(values, index=pd.Index(names, name=row_name), columns=day_labels)
+    return out
+
+
+def _districts(rng, province: np.ndarray, names: list, labels: list, mean_count: int, row_name: str) -> pd.DataFrame:
+    """แบ่งยอดจังหวัดเป็นอำเภอ: จำนวนอำเภอ ~ 1 + Poisson, สัดส่วน Dirichlet (อำเภอเมืองใหญ่กว่า) ขยับเล็กน้อยรายเดือน"""
+    rows, index = [], []
+    for p, name in enumerate(names):
+        n = 1 + rng.poisson(max(mean_count - 1, 0))
+        base = rng.dirichlet(np.full(n, 1.5))
+        w = base[None] * rng.lognormal(0.0, 0.1, (len(labels), n))
+        rows.append(allocate(province[p], w).T)
+        index += [(name, f"อำเภอ{name}{j + 1}") for j in range(n)]
+    return pd.DataFrame(
+        np.vstack(rows), index=pd.MultiIndex.from_tuples(index, names=[row_name, "อำเภอ"]), columns=labels,
+    )
+
+
+# ------------------------------
+# เขียนผลลัพธ์
+# ------------------------------
+def write_csv(tables: Dict[str, pd.DataFrame], out_dir: Path) -> Dict[str, Path]:
+    """CSV รูปแบบเดียวกับ data/raw (จำนวนเงินเป็นบาท 2 ตำแหน่ง) — อ่านกลับด้วย utils.ingest ได้ทันที"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name, df in tables.items():
+        text = pd.DataFrame(format_satang(df.to_numpy()), index=df.index, columns=df.columns)
+        paths[name] = out_dir / f"{name}.csv"
+        text.reset_index().to_csv(paths[name], index=False)
+    return paths
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="สร้างข้อมูล OTOP สังเคราะห์จากรูปร่างของข้อมูลจริง")
+    ap.add_argument("--provinces", type=int, default=77)
+    ap.add_argument("--months", type=int, default=12)
+    ap.add_argument("--districts", type=int, default=0, help="จำนวนอำเภอเฉลี่ยต่อจังหวัด (0 = ไม่สร้าง)")
+    ap.add_argument("--daily", action="store_true", help="สร้างตารางรายวันด้วย (เขียนเป็น CSV เท่านั้น)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--growth", type=float, default=0.05, help="การเติบโตเฉลี่ยต่อปี")
+    ap.add_argument("--store", type=Path, default=None, help="เขียนเป็นคลังข้อมูล (ใช้กับ OTOP_STORE_DIR)")
+    ap.add_argument("--csv-dir", type=Path, default=None, help="เขียนเป็น CSV รูปแบบ data/raw")
+    args = ap.parse_args(argv)
+    if args.store is None and args.csv_dir is None:
+        ap.error("ต้องระบุ --store หรือ --csv-dir อย่างน้อยหนึ่งอย่าง")
+
+    tables = generate(fit_shapes(real_tables()), args.provinces, args.months, seed=args.seed,
+                      growth=args.growth, districts=args.districts, daily=args.daily)
+    if args.csv_dir:
+        for name, path in write_csv(tables, args.csv_dir).items():
+            print(f"{name}: {path}")
+    if args.store:
+        snap = write_store({k: v for k, v in tables.items() if k != "daily"}, args.store)
+        print(f"เขียน snapshot แล้ว: {snap}")
+
+
+if __name__ == "__main__":
+    main()
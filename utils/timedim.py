@@ -0,0 +1,179 @@
+# utils/timedim.py
+# -*- coding: utf-8 -*-
+"""
+มิติเวลา (เดือน) ของทุกตาราง: แปลงป้ายเดือนภาษาไทยเป็นลำดับงวด (ordinal) ครั้งเดียว
+
+    "ตุลาคม 2566" / "ต.ค. 2566" / "ต.ค. 66" / "ตุลาคม"  ->  Period(year_be=2566, month=10)
+
+- TimeDim: ป้าย -> แถว และ ordinal -> แถว แบบ dict (O(1)), ปีงบประมาณของแต่ละแถว,
+  ขอบเขตปีงบ และการเลื่อนงวด (lag / lead) ตามปฏิทินจริง (เดือนที่ขาดหาย = ไม่มีงวดก่อนหน้า)
+- ตารางต่างกัน (จังหวัด / ช่องทาง / ประเภทสินค้า) จับคู่เดือนกันด้วย ordinal ไม่ใช่การเทียบสตริง
+
+ปีงบประมาณ (พ.ศ.) เริ่มเดือนตุลาคม: ตุลาคม 2566 - กันยายน 2567 = ปีงบ 2567
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+THAI_MONTHS = (
+    "มกราคม", "กุมภาพันธ์", "มีนาคม", "เมษายน", "พฤษภาคม", "มิถุนายน",
+    "กรกฎาคม", "สิงหาคม", "กันยายน", "ตุลาคม", "พฤศจิกายน", "ธันวาคม",
+)
+THAI_MONTHS_ABBR = (
+    "ม.ค.", "ก.พ.", "มี.ค.", "เม.ย.", "พ.ค.", "มิ.ย.",
+    "ก.ค.", "ส.ค.", "ก.ย.", "ต.ค.", "พ.ย.", "ธ.ค.",
+)
+FISCAL_YEAR_START_MONTH = 10   # ตุลาคม
+BE_OFFSET = 543                # พ.ศ. - ค.ศ.
+
+_MONTH_NO: Dict[str, int] = {
+    **{name: i + 1 for i, name in enumerate(THAI_MONTHS)},
+    **{abbr: i + 1 for i, abbr in enumerate(THAI_MONTHS_ABBR)},
+    **{abbr.replace(".", ""): i + 1 for i, abbr in enumerate(THAI_MONTHS_ABBR)},
+}
+_LABEL_RE = re.compile(r"^\s*(\S+?)\s*(\d{2}|\d{4})?\s*$")
+
+
+class Period(NamedTuple):
+    year_be: Optional[int]     # None = ป้ายที่มีแต่ชื่อเดือน
+    month: int                 # 1..12
+
+    @property
+    def ordinal(self) -> Optional[int]:
+        """ลำดับงวดต่อเนื่อง (ค.ศ. × 12 + เดือน - 1)"""
+        return None if self.year_be is None else (self.year_be - BE_OFFSET) * 12 + self.month - 1
+
+    @property
+    def fiscal_year(self) -> Optional[int]:
+        if self.year_be is None:
+            return None
+        return self.year_be + 1 if self.month >= FISCAL_YEAR_START_MONTH else self.year_be
+
+    def label(self) -> str:
+        name = THAI_MONTHS[self.month - 1]
+        return name if self.year_be is None else f"{name} {self.year_be}"
+
+
+def parse_month(label) -> Optional[Period]:
+    """ป้ายเดือนภาษาไทย -> Period (ไม่ใช่ป้ายเดือน -> None); ปี 2 หลักถือเป็น พ.ศ. 25xx"""
+    m = _LABEL_RE.match(str(label))
+    if not m:
+        return None
+    month = _MONTH_NO.get(m.group(1))
+    if month is None:
+        return None
+    year = m.group(2)
+    if year is None:
+        return Period(None, month)
+    y = int(year)
+    return Period(2500 + y if y < 100 else y, month)
+
+
+def period_from_ordinal(ordinal: int) -> Period:
+    return Period(ordinal // 12 + BE_OFFSET, ordinal % 12 + 1)
+
+
+def month_columns(labels: Sequence) -> List[str]:
+    """คอลัมน์ที่เป็นป้ายเดือนพร้อมปี (ไม่มีเลย -> คืนทุกคอลัมน์ตามเดิม)"""
+    cols = [str(c) for c in labels if (p := parse_month(c)) is not None and p.year_be is not None]
+    return cols if cols else [str(c) for c in labels]
+
+
+# ------------------------------
+# TimeDim
+# ------------------------------
+@dataclass(frozen=True)
+class TimeDim:
+    labels: Tuple[str, ...]
+    periods: Tuple[Optional[Period], ...]
+    ordinals: np.ndarray             # (T,) -1 = ป้ายที่ไม่มีปี
+    fiscal_years: np.ndarray         # (T,) ปีงบ พ.ศ. (0 = ไม่ทราบ)
+    fy_ids: np.ndarray               # (T,) เลขกลุ่มปีงบเรียงตามแถว (ใช้กับ YTD)
+    prev: np.ndarray                 # (T,) แถวของงวดก่อนหน้า (-1 = ไม่มี)
+    label_pos: Dict[str, int]
+    ordinal_pos: Dict[int, int]
+    month_last: Dict[int, int]       # เลขเดือน -> แถวล่าสุดของเดือนนั้น (ใช้กับป้ายที่ไม่มีปี)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def index(self, month: Union[str, Period, None]) -> Optional[int]:
+        """ป้าย (ของตารางใดก็ได้) / Period -> แถวของตารางนี้"""
+        if month is None:
+            return None
+        if isinstance(month, str):
+            i = self.label_pos.get(month)
+            if i is not None:
+                return i
+            month = parse_month(month)
+            if month is None:
+                return None
+        if month.year_be is not None and self.ordinal_pos:
+            return self.ordinal_pos.get(month.ordinal)
+        # ป้ายไม่มีปี (ฝั่งใดฝั่งหนึ่ง): จับคู่ด้วยเดือน ใช้แถวล่าสุดของเดือนนั้น
+        return self.month_last.get(month.month)
+
+    def shift(self, i: int, k: int) -> Optional[int]:
+        """เลื่อน k งวดตามปฏิทิน (k < 0 = lag, k > 0 = lead) -> แถว หรือ None"""
+        o = int(self.ordinals[i])
+        if o < 0:
+            j = i + k
+            return j if 0 <= j < len(self.labels) else None
+        return self.ordinal_pos.get(o + k)
+
+    def lag(self, i: int, k: int = 1) -> Optional[int]:
+        return self.shift(i, -k)
+
+    def lead(self, i: int, k: int = 1) -> Optional[int]:
+        return self.shift(i, k)
+
+    def fiscal_year_of(self, i: int) -> int:
+        return int(self.fiscal_years[i])
+
+    def fiscal_year_slice(self, i: int) -> slice:
+        """ช่วงแถวตั้งแต่ต้นปีงบของแถว i ถึงแถว i (ใช้กับกราฟ YTD)"""
+        same = np.flatnonzero(self.fy_ids[: i + 1] == self.fy_ids[i])
+        return slice(int(same[0]), i + 1)
+
+    def fiscal_year_bounds(self, fiscal_year: int) -> Optional[slice]:
+        rows = np.flatnonzero(self.fiscal_years == fiscal_year)
+        return slice(int(rows[0]), int(rows[-1]) + 1) if len(rows) else None
+
+    @property
+    def fiscal_year_list(self) -> Tuple[int, ...]:
+        return tuple(int(y) for y in dict.fromkeys(self.fiscal_years.tolist()) if y)
+
+
+def build_timedim(labels: Sequence) -> TimeDim:
+    labels = tuple(str(x) for x in labels)
+    periods = tuple(parse_month(x) for x in labels)
+    ordinals = np.array([-1 if p is None or p.ordinal is None else p.ordinal for p in periods], dtype=int)
+    fiscal_years = np.array([(p.fiscal_year or 0) if p is not None else 0 for p in periods], dtype=int)
+
+    # กลุ่มปีงบตามแถว: ถ้าทราบปีงบใช้ปีงบ, ถ้าไม่ทราบ (ป้ายไม่มีปี) ขึ้นกลุ่มใหม่ทุกครั้งที่เจอเดือนตุลาคม
+    if (fiscal_years > 0).all():
+        fy_ids = fiscal_years - (fiscal_years[0] if len(fiscal_years) else 0)
+    else:
+        starts = np.array([p is not None and p.month == FISCAL_YEAR_START_MONTH for p in periods], dtype=bool)
+        if len(starts):
+            starts[0] = False
+        fy_ids = np.cumsum(starts)
+
+    ordinal_pos = {int(o): i for i, o in enumerate(ordinals) if o >= 0}
+    prev = np.array(
+        [ordinal_pos.get(int(o) - 1, -1) if o >= 0 else i - 1 for i, o in enumerate(ordinals)],
+        dtype=int,
+    )
+    return TimeDim(
+        labels=labels,
+        periods=periods,
+        ordinals=ordinals,
+        fiscal_years=fiscal_years,
+        fy_ids=fy_ids,
+        prev=prev,
+        label_pos={x: i for i, x in enumerate(labels)},
+        ordinal_pos=ordinal_pos,
+        month_last={p.month: i for i, p in enumerate(periods) if p is not None},
+    )
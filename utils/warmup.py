@@ -0,0 +1,142 @@
+# utils/warmup.py
+# -*- coding: utf-8 -*-
+"""
+อุ่นแคชรูปกราฟตอนเริ่มเซิร์ฟเวอร์ (เปิดด้วย OTOP_WARMUP=1)
+
+ไล่ทุกคู่ (เดือน, จังหวัด) ที่ sidebar เลือกได้ — เดือนล่าสุดก่อน, "ภาพรวม" ก่อน แล้วตามยอดขายมาก -> น้อย —
+สร้างรูปกราฟลง FIGURE_CACHE ด้วย thread pool ในเบื้องหลัง (ผู้ใช้คนแรกของแต่ละ view จึงได้รูปจากแคช)
+
+ก่อนเริ่มขยาย FIGURE_CACHE ให้จุรูปไม่ซ้ำของทุก view (warm_figure_count / CACHE_HEADROOM;
+ข้อมูลจริง 12 เดือน x 77 จังหวัด = 924 view ~3,000 รูป) — OTOP_FIGURE_CACHE เป็นขั้นต่ำ
+รูประดับเดือน / ระดับจังหวัดถูกสร้างครั้งเดียว view ถัดไปเป็น cache hit; status.figures นับเฉพาะรูปที่สร้างจริง
+
+หยุดเองเมื่อ
+- หน่วยความจำของโปรเซสเกิน OTOP_WARMUP_MEMORY_MB (ค่าเริ่มต้นพอสำหรับทุก view ของข้อมูลจริง)
+- แคชรูปใกล้เต็ม (อุ่นต่อจะไปไล่รูปที่เพิ่งสร้างออกเอง)
+
+KPI อ่านค่าจากคิวบ์ตรง ๆ อยู่แล้ว ไม่มีอะไรต้องอุ่น
+"""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+import streamlit as st
+
+from components.charts import warm_figure_count, warm_views
+from components.mapbox import warm_map
+from utils.cube import SalesCube
+from utils.figcache import FIGURE_CACHE, builds_in_thread
+from utils.procmem import rss_mb
+from utils.settings import WARMUP_MEMORY_MB, WARMUP_WORKERS
+
+log = logging.getLogger(__name__)
+
+OVERALL = "ภาพรวม"
+CACHE_HEADROOM = 0.9  # ใช้แคชได้ไม่เกิน 90% ระหว่างอุ่น (เหลือที่ให้ view อื่นของผู้ใช้)
+
+
+@dataclass
+class WarmupStatus:
+    total: int
+    done: int = 0
+    figures: int = 0                # รูปที่สร้างจริง (ไม่นับ cache hit)
+    state: str = "running"          # running / finished / stopped / failed
+    reason: str = ""
+    started: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    def advance(self, figures: int) -> None:
+        with self._lock:
+            self.done += 1
+            self.figures += figures
+
+    def end(self, state: str, reason: str = "") -> None:
+        with self._lock:
+            if self.state == "running":
+                self.state, self.reason, self.finished = state, reason, time.time()
+
+
+def views(cube: SalesCube) -> Iterator[Tuple[str, str]]:
+    """คู่ (เดือน, จังหวัด) ตามลำดับความนิยมโดยประมาณ"""
+    for m in reversed(range(len(cube.months))):
+        month = cube.months[m]
+        yield month, OVERALL
+        for p in cube.order_desc[m]:
+            yield month, cube.provinces[p]
+
+
+def _budget_exceeded(memory_mb: float) -> str:
+    rss = rss_mb()
+    if rss is not None and rss > memory_mb:
+        return f"หน่วยความจำเกิน {memory_mb:,.0f} MB"
+    if len(FIGURE_CACHE) >= FIGURE_CACHE.max_entries * CACHE_HEADROOM:
+        return f"แคชรูปใกล้เต็ม ({len(FIGURE_CACHE)}/{FIGURE_CACHE.max_entries})"
+    return ""
+
+
+def run_warmup(
+    cube: SalesCube,
+    geojson=None,
+    template: str = "plotly_white",
+    workers: int = WARMUP_WORKERS,
+    memory_mb: float = WARMUP_MEMORY_MB,
+    status: Optional[WarmupStatus] = None,
+) -> WarmupStatus:
+    """อุ่นแคชแบบ blocking (start_warmup เรียกใน thread เบื้องหลัง)"""
+    todo: List[Tuple[str, str]] = list(views(cube))
+    status = status or WarmupStatus(total=len(todo))
+    FIGURE_CACHE.reserve(math.ceil(warm_figure_count(cube, len(cube.provinces) + 1) / CACHE_HEADROOM))
+
+    def one(view: Tuple[str, str]) -> None:
+        month, province = view
+        before = builds_in_thread()
+        warm_views(cube, month, province, template)
+        if province == OVERALL:
+            warm_map(cube, geojson, month)
+        status.advance(builds_in_thread() - before)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="otop-warmup") as pool:
+            # ส่งงานทีละชุดเท่าจำนวน worker เพื่อตรวจงบก่อนส่งชุดถัดไป
+            step = max(1, workers)
+            for i in range(0, len(todo), step):
+                reason = _budget_exceeded(memory_mb)
+                if reason:
+                    status.end("stopped", reason)
+                    break
+                list(pool.map(one, todo[i:i + step]))
+                if status.done % max(1, status.total // 10) < step:
+                    log.info("warm-up %d/%d views, %d figures", status.done, status.total, status.figures)
+    except Exception as e:  # อุ่นแคชพลาดต้องไม่ทำให้แอปล่ม
+        log.exception("warm-up failed")
+        status.end("failed", repr(e))
+    status.end("finished")
+    log.info("warm-up %s after %d/%d views (%s)", status.state, status.done, status.total, status.reason or "ครบ")
+    return status
+
+
+def start_warmup(cube: SalesCube, geojson=None, template: str = "plotly_white") -> WarmupStatus:
+    """เริ่มอุ่นแคชใน daemon thread แล้วคืน status ทันที"""
+    status = WarmupStatus(total=sum(1 for _ in views(cube)))
+    threading.Thread(
+        target=run_warmup,
+        kwargs=dict(cube=cube, geojson=geojson, template=template, status=status),
+        name="otop-warmup",
+        daemon=True,
+    ).start()
+    return status
+
+
+@st.cache_resource(show_spinner=False)
+def warmup_once(_cube: SalesCube, data_version: str, _geojson, template: str) -> WarmupStatus:
+    """เริ่มอุ่นแคชครั้งเดียวต่อโปรเซสต่อ data_version (ทุก session ได้ status ตัวเดียวกัน)"""
+    return start_warmup(_cube, _geojson, template)
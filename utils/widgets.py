@@ -0,0 +1,58 @@
+# utils/widgets.py
+# -*- coding: utf-8 -*-
+"""
+key ของ widget แบบ deterministic ต่อตัวคุมเชิงตรรกะ + จำกัดจำนวน key ต่อ session
+
+- widget_key(scope, name): key เดิมทุก rerun -> Streamlit diff widget ตัวเดิม (ไม่สร้างใหม่ทุกรอบ
+  และ session state ไม่งอกตามจำนวน rerun) — scope = fragment / prefix ที่ตัวคุมอยู่
+- bind(key, value): ค่าตรรกะที่แชร์ (เช่น time_range ที่ตัวคุมหลายชุดใช้ร่วม) เปลี่ยนจากที่อื่น
+  -> เขียนลง widget ก่อนสร้าง (widget ที่มี key ไม่สนใจ value= หลังสร้างครั้งแรก)
+  ค่าตรรกะไม่เปลี่ยน -> ไม่แตะ widget (ผู้ใช้อาจเพิ่งเลื่อนมันในรอบนี้)
+  widget ที่ bind แล้วห้ามส่ง value= / index= (เขียน state + ส่งค่าเริ่มต้น = Streamlit เตือนค่าซ้ำซ้อน)
+- bind_default(key, value): สำหรับ widget ที่ต้องส่ง value= (select_slider แบบช่วง ใช้ value บอกโหมด)
+  ค่าตรรกะเปลี่ยน -> ลบ state ของ widget แทนการเขียน แล้ว widget เริ่มใหม่จาก value= ที่ส่ง (ค่าเดียวกัน)
+- registry (session state) เก็บ key ตามลำดับใช้ล่าสุด เกิน MAX_WIDGET_KEYS -> ลบ key เก่าสุด
+  ออกจาก session state (session ของจอ kiosk ที่เปิดทิ้งไว้จึงไม่โตไม่สิ้นสุด)
+"""
+from collections import OrderedDict
+from typing import Any
+
+import streamlit as st
+
+REGISTRY_KEY = "_widget_keys"
+MAX_WIDGET_KEYS = 64
+
+
+def _registry() -> "OrderedDict[str, Any]":
+    reg = st.session_state.get(REGISTRY_KEY)
+    if reg is None:
+        reg = st.session_state[REGISTRY_KEY] = OrderedDict()
+    return reg
+
+
+def widget_key(scope: str, name: str) -> str:
+    key = f"{name}_{scope}"
+    reg = _registry()
+    if key not in reg:
+        reg[key] = ()           # () = ยังไม่เคย bind, (ค่า,) = ค่าตรรกะที่ bind ครั้งล่าสุด
+    reg.move_to_end(key)
+    while len(reg) > MAX_WIDGET_KEYS:
+        old, _ = reg.popitem(last=False)
+        st.session_state.pop(old, None)
+    return key
+
+
+def bind(key: str, value: Any) -> None:
+    """ค่าของ widget = value เมื่อค่าตรรกะเปลี่ยนตั้งแต่ bind ครั้งก่อน หรือ widget ยังไม่มี state"""
+    reg = _registry()
+    if key not in st.session_state or reg.get(key) != (value,):
+        st.session_state[key] = value
+    reg[key] = (value,)
+
+
+def bind_default(key: str, value: Any) -> None:
+    """เหมือน bind แต่ให้ widget รับค่าจาก value= ของตัวเอง (ผู้เรียกต้องส่ง value=value)"""
+    reg = _registry()
+    if reg.get(key) != (value,) and st.session_state.get(key) != value:
+        st.session_state.pop(key, None)
+    reg[key] = (value,)